@@ -0,0 +1,615 @@
+"""Facebook 非同步 DevTools 爬取引擎
+
+直接以 Chrome DevTools Protocol（CDP）控制瀏覽器，不經過 Selenium：
+所有分頁共用一條 WebSocket 連線（flatten 模式的 session），前往、捲動、展開「查看更多」、
+擷取貼文的流程與 FacebookPageScraper.scrape_posts 相同，但每個步驟都是協程，
+等待瀏覽器端條件（WAIT_SCRIPT）時不會佔住執行緒，單一事件迴圈即可同時爬取多個粉絲專頁。
+
+先以遠端偵錯模式啟動瀏覽器（登入狀態可由 Cookie 保存區帶入）：
+    chrome --remote-debugging-port=9222 --headless=new
+
+同時爬取多個粉絲專頁：
+    python facebook_cdp_engine.py https://www.facebook.com/cnn https://www.facebook.com/bbc --max-posts 20 --email you@example.com
+
+不需瀏覽器的本機替身端點見 facebook_cdp_standin.py。
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+import urllib.request
+
+try:
+    from websockets.asyncio.client import connect as websocket_connect
+    from websockets.exceptions import ConnectionClosed
+except ImportError:  # 選用套件：只有非同步引擎需要
+    websocket_connect = None
+    ConnectionClosed = None
+
+from facebook_columnar_export import require_pyarrow
+from facebook_fan_page_scraper import (FacebookPageScraper, RESET_INCREMENTAL_TAGS_SCRIPT, CLOSE_OVERLAY_SCRIPT,
+                                       LEAN_BLOCKED_URLS, LEAN_PAGE_SCRIPT, LEAN_VIEWPORT)
+from facebook_post_extractor import IN_BROWSER_EXTRACT_SCRIPT
+from facebook_post_store import TRUNCATION_MARKERS
+from facebook_post_window import PostTimeWindow
+from facebook_wait_engine import POST_CONTAINER_SELECTOR, WAIT_SCRIPT
+from facebook_scrape_steps import (scrape_steps, RESET_TAGS, INSTALL_EXPANDER, EXTRACT, EXPAND, SCROLL, SETTLE,
+                                   SCROLL_METRICS, WAIT_GROWTH, WAIT_NETWORK)
+from facebook_scroll_controller import SCROLL_METRICS_SCRIPT
+from facebook_see_more_expander import INSTALL_EXPANDER_SCRIPT, POLL_EXPANDER_SCRIPT, SET_EXPANDER_PAUSED_SCRIPT
+from facebook_scraper_metrics import ScrapeMetrics, payload_bytes, script_label
+from facebook_cookie_vault import CookieVault, to_cdp_cookie
+from facebook_scraper_logging import get_logger
+
+logger = get_logger("cdp")
+
+
+DEFAULT_ENDPOINT = "http://127.0.0.1:9222"
+
+# 單一 CDP 指令的預設逾時（秒）；瀏覽器端等待腳本另外加上其自身的上限時間
+COMMAND_TIMEOUT = 30.0
+
+# 擷取結果可能超過 websockets 預設的 1 MB 訊息上限
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+# 非同步腳本的完成回調名稱（對應 Selenium execute_async_script 的最後一個參數）
+ASYNC_CALLBACK = "__fpsResolve"
+
+
+def require_websockets():
+    if websocket_connect is None:
+        raise RuntimeError("非同步 DevTools 引擎需要 websockets 套件：pip install \"websockets>=13.0\"")
+
+
+def wrap_script(script, args=(), is_async=False):
+    """將 Selenium 風格的腳本（使用 arguments 與 return）包裝成 Runtime.evaluate 的運算式
+
+    非同步腳本以 Promise 包裝，完成回調作為最後一個參數傳入，對應 execute_async_script。
+    """
+    args_json = json.dumps(list(args), ensure_ascii=False)
+    if is_async:
+        return (f"new Promise(function({ASYNC_CALLBACK}) {{ (function() {{\n{script}\n}})"
+                f".apply(null, {args_json}.concat([{ASYNC_CALLBACK}])); }})")
+    return f"(function() {{\n{script}\n}}).apply(null, {args_json})"
+
+
+def unwrap_script(expression):
+    """wrap_script 的反向操作，返回 (腳本, 參數列表, 是否非同步)；無法辨識時返回 (運算式, [], False)"""
+    is_async = expression.startswith(f"new Promise(function({ASYNC_CALLBACK})")
+    start = expression.find("(function() {\n")
+    end = expression.rfind("\n}).apply(null, ")
+    if start < 0 or end < 0:
+        return expression, [], False
+    script = expression[start + len("(function() {\n"):end]
+    args_json = expression[end + len("\n}).apply(null, "):]
+    suffix = f".concat([{ASYNC_CALLBACK}])); }})" if is_async else ")"
+    if args_json.endswith(suffix):
+        args_json = args_json[:-len(suffix)]
+    try:
+        return script, json.loads(args_json), is_async
+    except ValueError:
+        return expression, [], False
+
+
+class CDPError(RuntimeError):
+    """CDP 指令回傳錯誤，或頁面腳本拋出例外"""
+
+    def __init__(self, method, message, code=None):
+        super().__init__(f"{method}: {message}")
+        self.method = method
+        self.code = code
+
+
+class CDPConnection:
+    """一條到瀏覽器的 DevTools WebSocket 連線
+
+    指令以遞增的 id 送出，由背景讀取工作依 id 喚醒等待中的協程；
+    事件依 (方法, sessionId) 交給 expect_event 登記的等待者。所有分頁共用同一條連線。
+    """
+
+    def __init__(self, url, max_message_bytes=MAX_MESSAGE_BYTES):
+        self.url = url
+        self.max_message_bytes = max_message_bytes
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self._websocket = None
+        self._reader = None
+        self._ids = itertools.count(1)
+        self._pending = {}  # {id: (方法, Future)}
+        self._event_waiters = {}  # {(方法, sessionId): [Future]}
+
+    async def connect(self):
+        require_websockets()
+        self._websocket = await websocket_connect(self.url, max_size=self.max_message_bytes, ping_interval=None)
+        self._reader = asyncio.ensure_future(self._read_loop())
+        return self
+
+    @property
+    def is_open(self):
+        return self._websocket is not None and self._reader is not None and not self._reader.done()
+
+    async def send(self, method, params=None, session_id=None, timeout=COMMAND_TIMEOUT):
+        """送出一個指令並等待結果"""
+        if not self.is_open:
+            raise ConnectionError("DevTools 連線已關閉")
+        message_id = next(self._ids)
+        message = {'id': message_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = (method, future)
+        try:
+            data = json.dumps(message, ensure_ascii=False)
+            self.bytes_sent += len(data)
+            await self._websocket.send(data)
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message_id, None)
+
+    def expect_event(self, method, session_id=None):
+        """登記等待一個事件，返回 Future（在送出會觸發事件的指令之前呼叫，才不會錯過事件）"""
+        future = asyncio.get_running_loop().create_future()
+        self._event_waiters.setdefault((method, session_id), []).append(future)
+        return future
+
+    async def _read_loop(self):
+        error = None
+        try:
+            async for data in self._websocket:
+                self.bytes_received += len(data)
+                message = json.loads(data)
+                if 'id' in message:
+                    method, future = self._pending.get(message['id'], (None, None))
+                    if future is None or future.done():
+                        continue
+                    if 'error' in message:
+                        future.set_exception(CDPError(method, message['error'].get('message'),
+                                                      message['error'].get('code')))
+                    else:
+                        future.set_result(message.get('result', {}))
+                else:
+                    waiters = self._event_waiters.pop((message.get('method'), message.get('sessionId')), [])
+                    for future in waiters:
+                        if not future.done():
+                            future.set_result(message.get('params', {}))
+        except ConnectionClosed as e:
+            error = e
+        finally:
+            closed = ConnectionError(f"DevTools 連線已中斷: {error}" if error else "DevTools 連線已關閉")
+            for _, future in list(self._pending.values()):
+                if not future.done():
+                    future.set_exception(closed)
+            for waiters in self._event_waiters.values():
+                for future in waiters:
+                    if not future.done():
+                        future.set_exception(closed)
+            self._event_waiters.clear()
+
+    async def close(self):
+        if self._websocket is not None:
+            await self._websocket.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+        self._websocket = None
+
+
+class CDPPage:
+    """一個分頁（target）的 session，提供與 WebDriver 相同語意的腳本執行
+
+    每個指令的次數與延遲記錄在 metrics，格式與 InstrumentedDriver 相同，因此效能摘要可以直接比較。
+    """
+
+    def __init__(self, connection, target_id, session_id, metrics=None):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+        self.metrics = metrics
+        self.current_url = "about:blank"
+
+    async def send(self, method, params=None, timeout=COMMAND_TIMEOUT, script=None):
+        started_at = time.perf_counter()
+        error = False
+        try:
+            return await self.connection.send(method, params, self.session_id, timeout)
+        except Exception:
+            error = True
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_command(method, script_label(script) if script else None,
+                                            time.perf_counter() - started_at, error)
+
+    async def _evaluate(self, script, args, is_async, timeout):
+        result = await self.send("Runtime.evaluate", {
+            'expression': wrap_script(script, args, is_async),
+            'returnByValue': True,
+            'awaitPromise': is_async,
+        }, timeout=timeout, script=script)
+        if 'exceptionDetails' in result:
+            details = result['exceptionDetails']
+            message = (details.get('exception') or {}).get('description') or details.get('text')
+            raise CDPError("Runtime.evaluate", message)
+        value = (result.get('result') or {}).get('value')
+        if self.metrics is not None:
+            self.metrics.increment('script_result_bytes', payload_bytes(value))
+        return value
+
+    async def execute_script(self, script, *args):
+        """對應 WebDriver execute_script：腳本以 return 回傳結果"""
+        return await self._evaluate(script, args, False, COMMAND_TIMEOUT)
+
+    async def execute_async_script(self, script, *args, timeout=COMMAND_TIMEOUT):
+        """對應 WebDriver execute_async_script：腳本呼叫最後一個參數回傳結果"""
+        return await self._evaluate(script, args, True, timeout)
+
+    async def navigate(self, url, timeout=COMMAND_TIMEOUT):
+        """前往網址並等待頁面 load 事件（逾時仍繼續，由呼叫端等待貼文出現）"""
+        loaded = self.connection.expect_event("Page.loadEventFired", self.session_id)
+        result = await self.send("Page.navigate", {'url': url}, timeout=timeout)
+        if result.get('errorText'):
+            loaded.cancel()
+            raise CDPError("Page.navigate", result['errorText'])
+        self.current_url = url
+        try:
+            await asyncio.wait_for(loaded, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class CDPBrowser:
+    """透過一條 DevTools 連線管理多個分頁"""
+
+    def __init__(self, endpoint=DEFAULT_ENDPOINT, lean_mode=False):
+        """
+        :param endpoint: 瀏覽器的遠端偵錯位址（http://主機:埠）或 browser WebSocket 網址（ws://...）
+        :param lean_mode: 每個分頁封鎖圖片／影片／字型、停用動畫並固定視窗大小（與精簡模式相同）
+        """
+        self.endpoint = endpoint
+        self.lean_mode = lean_mode
+        self.connection = None
+        self.version = {}
+        self.pages = []
+
+    async def discover_websocket_url(self):
+        """由 /json/version 取得 browser 層級的 WebSocket 網址"""
+        if self.endpoint.startswith(("ws://", "wss://")):
+            return self.endpoint
+
+        def fetch():
+            with urllib.request.urlopen(self.endpoint.rstrip("/") + "/json/version", timeout=10) as response:
+                return json.loads(response.read().decode('utf-8'))
+
+        self.version = await asyncio.get_running_loop().run_in_executor(None, fetch)
+        return self.version['webSocketDebuggerUrl']
+
+    async def connect(self):
+        self.connection = await CDPConnection(await self.discover_websocket_url()).connect()
+        return self
+
+    async def set_cookies(self, cookies):
+        """將 Selenium 格式的 Cookie（例如 CookieVault 保存的登入狀態）設定到瀏覽器"""
+        if cookies:
+            await self.connection.send("Storage.setCookies", {'cookies': [to_cdp_cookie(c) for c in cookies]})
+
+    async def new_page(self, metrics=None):
+        """開啟新分頁並附加 session"""
+        target = await self.connection.send("Target.createTarget", {'url': "about:blank"})
+        attached = await self.connection.send("Target.attachToTarget",
+                                              {'targetId': target['targetId'], 'flatten': True})
+        page = CDPPage(self.connection, target['targetId'], attached['sessionId'], metrics)
+        await page.send("Page.enable")
+        if self.lean_mode:
+            await page.send("Network.enable")
+            await page.send("Network.setBlockedURLs", {'urls': LEAN_BLOCKED_URLS})
+            await page.send("Page.addScriptToEvaluateOnNewDocument", {'source': LEAN_PAGE_SCRIPT})
+            width, height = LEAN_VIEWPORT
+            await page.send("Emulation.setDeviceMetricsOverride",
+                            {'width': width, 'height': height, 'deviceScaleFactor': 1, 'mobile': False})
+        self.pages.append(page)
+        return page
+
+    async def close_page(self, page):
+        if page in self.pages:
+            self.pages.remove(page)
+        if self.connection is not None and self.connection.is_open:
+            try:
+                await self.connection.send("Target.closeTarget", {'targetId': page.target_id}, timeout=5)
+            except Exception as e:
+                logger.debug("關閉分頁失敗: %s", e)
+
+    async def close(self):
+        for page in list(self.pages):
+            await self.close_page(page)
+        if self.connection is not None:
+            await self.connection.close()
+            self.connection = None
+
+
+class CDPPageScraper:
+    """以協程執行單一粉絲專頁的前往／捲動／展開／擷取流程
+
+    與 FacebookPageScraper.scrape_posts 的流程與停止條件相同（捲動控制器、常駐展開器、
+    瀏覽器端等待、瀏覽器端擷取、PostStore 合併與自動保存），設定、擷取計畫、效能統計與
+    輸出檔案沿用傳入的 FacebookPageScraper，因此結果可用 save_to_csv 等既有方法保存。
+    """
+
+    def __init__(self, page, scraper=None, label=None):
+        """
+        :param page: CDPPage
+        :param scraper: 提供設定與輸出的 FacebookPageScraper（不會啟動其瀏覽器），None 時建立預設的
+        :param label: 記錄訊息前綴（例如粉絲專頁網址）
+        """
+        self.page = page
+        self.scraper = scraper or FacebookPageScraper("", "")
+        self.label = label or ""
+        self.wait_stats = {}  # {種類: {'count', 'seconds', 'timeouts'}}，格式與 WaitEngine.summary 相同
+        self.expander_stats = None
+        self._reported_clicks = 0
+        if self.page.metrics is None:
+            self.page.metrics = self.scraper.metrics
+
+    @property
+    def metrics(self):
+        return self.scraper.metrics
+
+    async def wait(self, kind, timeout, **options):
+        """在瀏覽器端等待條件成立（參數與 WaitEngine 相同），等待期間事件迴圈可處理其他分頁"""
+        started_at = time.perf_counter()
+        options.update({
+            'timeout_ms': int(timeout * 1000),
+            'poll_ms': 30,
+            'quiet_ms': 150,
+            'idle_ms': 300,
+            'markers': list(TRUNCATION_MARKERS),
+            'container_selector': POST_CONTAINER_SELECTOR,
+        })
+        try:
+            result = await self.page.execute_async_script(WAIT_SCRIPT, kind, options,
+                                                          timeout=timeout + COMMAND_TIMEOUT)
+            satisfied = bool(result and result.get('ok'))
+        except (CDPError, asyncio.TimeoutError):
+            satisfied = False
+
+        entry = self.wait_stats.setdefault(kind, {'count': 0, 'seconds': 0.0, 'timeouts': 0})
+        entry['count'] += 1
+        entry['seconds'] += time.perf_counter() - started_at
+        if not satisfied:
+            entry['timeouts'] += 1
+        return satisfied
+
+    async def navigate(self, page_url):
+        """前往粉絲專頁、等待第一篇貼文並關閉遮蔽彈窗"""
+        self.scraper.page_url = page_url
+        with self.metrics.phase("navigate"):
+            try:
+                logger.info("🌐 %s 正在前往粉絲專頁", self.label or page_url)
+                await self.page.navigate(page_url)
+                if not await self.wait('selector', 10.0, selector=POST_CONTAINER_SELECTOR):
+                    logger.warning("⚠️ %s 等待貼文載入逾時，繼續嘗試爬取", self.label)
+                with self.metrics.phase("overlay"):
+                    overlays = await self.page.execute_script(CLOSE_OVERLAY_SCRIPT)
+                if overlays:
+                    logger.warning("⚠️ %s 仍檢測到 %s 個可能的遮蔽層", self.label, overlays)
+                await self.wait('network', 1.0)
+                return True
+            except Exception as e:
+                logger.error("❌ %s 前往粉絲專頁失敗: %s", self.label, e)
+                return False
+
+    async def extract(self, incremental=None):
+        """在瀏覽器內擷取貼文欄位（只回傳精簡 JSON），轉為與 extract_posts_with_bs 相同的貼文字典"""
+        if incremental is None:
+            incremental = self.scraper.incremental_extraction
+        plan = self.scraper.get_extraction_plan()
+        with self.metrics.phase("browser_extract"):
+            records = await self.page.execute_script(IN_BROWSER_EXTRACT_SCRIPT, bool(incremental),
+                                                     list(plan.fields))
+        posts = []
+        with self.metrics.phase("parse"):
+            for record in records or []:
+                try:
+                    post = plan.from_browser_record(record)
+                except Exception as e:
+                    logger.warning("轉換瀏覽器擷取資料時發生錯誤: %s", e)
+                    continue
+                if post:
+                    posts.append(post)
+        return posts
+
+    async def extract_and_merge(self, store):
+        return self.scraper.smart_merge_posts(store, await self.extract())
+
+    async def install_expander(self):
+        window = self.scraper.post_window
+        self.expander_stats = await self.page.execute_script(
+            INSTALL_EXPANDER_SCRIPT, list(TRUNCATION_MARKERS), POST_CONTAINER_SELECTOR,
+            {'debounce_ms': 50, 'retry_ms': 2000, 'max_attempts': 3,
+             'paused': window is not None and window.until_minutes is not None})
+        if self.expander_stats.get('fresh'):
+            self._reported_clicks = 0
+        self.scraper.expansion_paused = bool(self.expander_stats.get('paused'))
+        return self.expander_stats
+
+    async def expand(self, store):
+        """輪詢常駐展開器，有新點擊時等待展開並重新擷取，返回 (新點擊數, 是否已重新擷取)
+
+        與 expand_with_observer 相同：沒有新點擊時不等待，仍待重試的按鈕不會讓每一步都等待。
+        """
+        paused = self.scraper.window_expansion_change()
+        if paused is not None:
+            with self.metrics.phase("click"):
+                await self.page.execute_script(SET_EXPANDER_PAUSED_SCRIPT, paused)
+        if self.scraper.expansion_paused:
+            return 0, False
+        with self.metrics.phase("click"):
+            stats = await self.page.execute_script(POLL_EXPANDER_SCRIPT)
+            if stats is None:
+                stats = await self.install_expander()
+            self.expander_stats = stats
+            new_clicks = max(0, stats['clicked'] - self._reported_clicks)
+            self._reported_clicks = stats['clicked']
+            if new_clicks == 0:
+                return 0, False
+            await self.wait('expansion', 1.5)
+        await self.extract_and_merge(store)
+        return new_clicks, True
+
+    async def scroll_metrics(self):
+        try:
+            metrics = await self.page.execute_script(SCROLL_METRICS_SCRIPT)
+            if isinstance(metrics, (list, tuple)) and len(metrics) == 3:
+                return metrics
+        except CDPError:
+            pass
+        return [None, None, None]
+
+    async def execute_step(self, command, *args):
+        """以 DevTools 協定執行 scrape_steps 傳出的瀏覽器指令（對應 FacebookPageScraper.execute_scrape_step）"""
+        store = self.scraper.post_store
+        if command == SCROLL:
+            with self.metrics.phase("scroll"):
+                await self.page.execute_script(f"window.scrollBy(0, {args[0]});")
+        elif command == SETTLE:
+            with self.metrics.phase("scroll"):
+                await self.wait('settle', args[0])
+        elif command == EXPAND:
+            return await self.expand(store)
+        elif command == EXTRACT:
+            await self.extract_and_merge(store)
+        elif command == SCROLL_METRICS:
+            return await self.scroll_metrics()
+        elif command == WAIT_GROWTH:
+            with self.metrics.phase("scroll"):
+                await self.wait('growth', args[0])
+        elif command == WAIT_NETWORK:
+            with self.metrics.phase("scroll"):
+                await self.wait('network', args[0])
+        elif command == RESET_TAGS:
+            await self.page.execute_script(RESET_INCREMENTAL_TAGS_SCRIPT)
+        elif command == INSTALL_EXPANDER:
+            await self.install_expander()
+        else:
+            raise ValueError(f"未知的爬取指令: {command}")
+        return None
+
+    async def scrape_posts(self, max_posts, progress_callback=None, since=None, until=None):
+        """爬取指定數量的完整貼文，流程、時間範圍與停止條件同 FacebookPageScraper.scrape_posts（共用 scrape_steps）"""
+        steps = scrape_steps(self.scraper, max_posts, progress_callback, since, until, label=self.label)
+        result = None
+        while True:
+            try:
+                command = steps.send(result)
+            except StopIteration as stop:
+                return stop.value
+            result = await self.execute_step(*command)
+
+
+async def scrape_many(targets, max_posts=10, endpoint=DEFAULT_ENDPOINT, concurrency=4, cookies=None,
+                      lean_mode=False, scraper_factory=None, progress_callback=None):
+    """在同一個事件迴圈中同時爬取多個粉絲專頁，每個專頁一個分頁
+
+    :param targets: 粉絲專頁網址列表
+    :param concurrency: 同時開啟的分頁數上限
+    :param cookies: 要帶入瀏覽器的登入 Cookie（Selenium 格式）
+    :param scraper_factory: 建立每個專頁設定與輸出用 FacebookPageScraper 的函數 (網址)，None 表示預設設定
+    :param progress_callback: 進度回調函數 (網址, 進度, 完整貼文數)
+    :return: ({網址: 貼文列表}, {網址: FacebookPageScraper})；失敗的專頁貼文為空列表
+    """
+    browser = await CDPBrowser(endpoint, lean_mode=lean_mode).connect()
+    semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+    scrapers = {}
+
+    async def run(url):
+        scraper = scrapers[url] = scraper_factory(url) if scraper_factory else FacebookPageScraper("", "")
+        async with semaphore:
+            page = await browser.new_page(scraper.metrics)
+            try:
+                page_scraper = CDPPageScraper(page, scraper, label=url)
+                if not await page_scraper.navigate(url):
+                    return []
+                callback = (lambda progress, count: progress_callback(url, progress, count)) \
+                    if progress_callback else None
+                return await page_scraper.scrape_posts(max_posts, callback)
+            finally:
+                await browser.close_page(page)
+
+    try:
+        await browser.set_cookies(cookies)
+        outcomes = await asyncio.gather(*(run(url) for url in targets), return_exceptions=True)
+    finally:
+        await browser.close()
+
+    results = {}
+    for url, outcome in zip(targets, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.error("❌ %s 爬取失敗: %s", url, outcome)
+            outcome = []
+        results[url] = outcome
+    return results, scrapers
+
+
+def output_filename(output_dir, page_url, extension="csv"):
+    name = page_url.rstrip("/").split("/")[-1] or "page"
+    return os.path.join(output_dir, f"{name}.{extension}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="以 DevTools 協定同時爬取多個 Facebook 粉絲專頁")
+    parser.add_argument("page_urls", nargs="+")
+    parser.add_argument("--endpoint", default=DEFAULT_ENDPOINT,
+                        help="瀏覽器遠端偵錯位址（以 --remote-debugging-port 啟動）或 ws:// 網址")
+    parser.add_argument("--max-posts", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4, help="同時爬取的分頁數")
+    parser.add_argument("--email", help="從 Cookie 保存區帶入此帳號的登入狀態")
+    parser.add_argument("--cookie-dir", default="facebook_cookies")
+    parser.add_argument("--lean", action="store_true", help="精簡模式：不載入圖片影片字型、停用動畫")
+    parser.add_argument("--output-dir", default=".", help="每個專頁輸出一個CSV")
+    parser.add_argument("--format", choices=["csv", "parquet", "arrow"], default="csv",
+                        help="輸出格式（parquet / arrow 為欄位式檔案，需安裝 pyarrow）")
+    parser.add_argument("--metrics", help="將所有分頁合併的效能報告存成 JSON")
+    parser.add_argument("--since", help="只爬取此日期之後的貼文（YYYY-MM-DD 或 YYYY-MM-DD HH:MM）")
+    parser.add_argument("--until", help="只爬取此日期之前的貼文（只有日期時包含當天）")
+    parser.add_argument("--since-last-run", action="store_true", help="只爬取上次執行之後的新貼文（依每個專頁的檢查點）")
+    args = parser.parse_args()
+    try:
+        PostTimeWindow(args.since, args.until)
+        if args.format != "csv":
+            require_pyarrow()
+    except (ValueError, RuntimeError) as e:
+        parser.error(str(e))
+
+    cookies = None
+    if args.email:
+        cookies = CookieVault(args.cookie_dir).load(args.email)
+        if not cookies:
+            logger.warning("⚠️ 找不到 %s 的有效 Cookie，將以未登入狀態爬取", args.email)
+
+    def create_scraper(page_url):
+        scraper = FacebookPageScraper("", "")
+        scraper.since_last_run = args.since_last_run
+        scraper.post_since = args.since
+        scraper.post_until = args.until
+        return scraper
+
+    started_at = time.perf_counter()
+    results, scrapers = asyncio.run(scrape_many(
+        args.page_urls, args.max_posts, args.endpoint, args.concurrency, cookies, args.lean, create_scraper))
+    elapsed = time.perf_counter() - started_at
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for url, posts in results.items():
+        if posts:
+            scrapers[url].save_to_csv(output_filename(args.output_dir, url, args.format))
+    total = sum(len(posts) for posts in results.values())
+    logger.info("📈 %s 個專頁共 %s 篇貼文，%.1f 秒（%.1f 篇/分鐘）",
+                len(results), total, elapsed, total / elapsed * 60 if elapsed else 0)
+    if args.metrics:
+        ScrapeMetrics.combine([scraper.metrics for scraper in scrapers.values()]).save_report(
+            args.metrics, extra={'pages': {url: len(posts) for url, posts in results.items()}})
+
+
+if __name__ == '__main__':
+    main()
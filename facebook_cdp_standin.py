@@ -0,0 +1,352 @@
+"""本機替身 DevTools 端點
+
+模擬一個支援遠端偵錯的瀏覽器，讓 facebook_cdp_engine 不需真實瀏覽器與網路也能完整執行：
+HTTP /json/version 回傳 WebSocket 網址，WebSocket 上支援引擎用到的 Target／Page／Runtime 指令。
+每個分頁是一個合成的動態消息：捲動接近底部時載入下一批貼文，部分貼文截斷並附「查看更多」，
+由展開器腳本點擊後才顯示完整內容。Runtime.evaluate 依腳本內容辨識引擎的腳本並回傳對應結果，
+等待腳本依 latency 延遲回應，可用來觀察多個分頁共用一個事件迴圈時的並行效果。
+
+    python facebook_cdp_standin.py --port 9333 --posts 200 --latency 0.05
+    python facebook_cdp_engine.py https://www.facebook.com/a https://www.facebook.com/b --endpoint http://127.0.0.1:9333
+"""
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import random
+import re
+from datetime import datetime, timedelta
+
+try:
+    from websockets.asyncio.server import serve as websocket_serve
+    from websockets.datastructures import Headers
+    from websockets.http11 import Response
+except ImportError:  # 選用套件：只有非同步引擎需要
+    websocket_serve = None
+
+from facebook_cdp_engine import CLOSE_OVERLAY_SCRIPT, require_websockets, unwrap_script
+from facebook_fan_page_scraper import RESET_INCREMENTAL_TAGS_SCRIPT
+from facebook_post_extractor import IN_BROWSER_EXTRACT_SCRIPT
+from facebook_scroll_controller import SCROLL_METRICS_SCRIPT
+from facebook_see_more_expander import INSTALL_EXPANDER_SCRIPT, POLL_EXPANDER_SCRIPT, SET_EXPANDER_PAUSED_SCRIPT
+from facebook_wait_engine import WAIT_SCRIPT
+from facebook_scraper_benchmark import FILLER_WORDS
+from facebook_scraper_logging import get_logger
+
+logger = get_logger("standin")
+
+
+BROWSER_PATH = "/devtools/browser/standin"
+
+SCROLL_BY_PATTERN = re.compile(r"^\s*window\.scrollBy\(0,\s*(-?\d+)\);?\s*$")
+
+
+def synthetic_post_record(index, rng, truncated=False, posted_at=None):
+    """產生單一篇合成貼文的瀏覽器端擷取結果（與 IN_BROWSER_EXTRACT_SCRIPT 的回傳格式相同）"""
+    text = f"#{index} " + "".join(rng.choice(FILLER_WORDS) for _ in range(rng.randint(20, 120)))
+    if posted_at is None:
+        posted_at = datetime(2024, (index % 12) + 1, (index % 27) + 1, rng.randint(0, 23), rng.randint(0, 59))
+    period = "上午" if posted_at.hour < 12 else "下午"
+    post_time = f"{posted_at.year}年{posted_at.month}月{posted_at.day}日 {period}{(posted_at.hour - 1) % 12 + 1}:{posted_at.minute:02d}"
+    return {
+        'full_text': text,
+        'truncated': truncated,
+        'likes': str(rng.randint(0, 5000)),
+        'counts': [str(rng.randint(0, 500)), str(rng.randint(0, 200))],
+        'ltr_time': post_time,
+        'fallback_times': [post_time, post_time, "測試粉絲專頁", None, None],
+        'post_url': f"/testpage/posts/{index}",
+    }
+
+
+class StandInFeed:
+    """一個分頁中的合成動態消息與頁面狀態
+
+    貼文由新到舊排列，每篇相隔約 post_interval_hours 小時；第一篇是較舊的置頂貼文。
+    """
+
+    def __init__(self, url, post_count=200, batch_size=5, post_height=420, viewport_height=768,
+                 truncated_ratio=0.2, post_interval_hours=6, now=None):
+        seed = int(hashlib.sha1(url.encode('utf-8')).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        now = (now or datetime.now()).replace(second=0, microsecond=0)
+        self.url = url
+        self.records = []
+        for i in range(post_count):
+            if i == 0:
+                posted_at = now - timedelta(days=90)
+            else:
+                posted_at = now - timedelta(hours=post_interval_hours * i, minutes=rng.randint(0, 59))
+            self.records.append(synthetic_post_record(i, rng, rng.random() < truncated_ratio, posted_at))
+        self.batch_size = batch_size
+        self.post_height = post_height
+        self.viewport_height = viewport_height
+        self.loaded = min(post_count, batch_size * 2)
+        self.scroll_top = 0
+        self.expanded = set()
+        self.signatures = {}  # {索引: 最後一次擷取時的簽章}，對應 data-fps-sig
+        self.expander = None
+
+    @property
+    def scroll_height(self):
+        return self.loaded * self.post_height + 200
+
+    def scroll_by(self, distance):
+        bottom = max(0, self.scroll_height - self.viewport_height)
+        self.scroll_top = max(0, min(bottom, self.scroll_top + distance))
+        # 接近底部時載入下一批貼文（無限捲動）
+        if self.scroll_top + self.viewport_height >= self.scroll_height - self.viewport_height:
+            self.loaded = min(len(self.records), self.loaded + self.batch_size)
+
+    def post_text(self, index):
+        record = self.records[index]
+        if record['truncated'] and index not in self.expanded:
+            return record['full_text'][:60] + "……查看更多"
+        return record['full_text']
+
+    def extract(self, incremental, fields):
+        results = []
+        for index in range(self.loaded):
+            text = self.post_text(index)
+            if incremental:
+                if self.signatures.get(index) == len(text):
+                    continue
+                self.signatures[index] = len(text)
+            record = self.records[index]
+            result = {}
+            if 'post_text' in fields:
+                result['messages'] = [text]
+            if 'likes' in fields:
+                result['likes'] = record['likes']
+            if 'comments' in fields or 'shares' in fields:
+                result['counts'] = list(record['counts'])
+            if 'post_time' in fields:
+                result['ltr_time'] = record['ltr_time']
+                result['fallback_times'] = list(record['fallback_times'])
+            if 'post_url' in fields:
+                result['post_url'] = record['post_url']
+            results.append(result)
+        return results
+
+    def expander_stats(self):
+        expander = self.expander
+        return {'clicked': expander['clicked'], 'expanded': expander['clicked'], 'failed': 0, 'pending': 0,
+                'deferred': 0, 'scanned': expander['scanned'], 'paused': expander['paused']}
+
+    def flush_expander(self):
+        """展開器點擊可視範圍附近所有尚未展開的截斷貼文（點擊後立即展開）"""
+        expander = self.expander
+        if expander['paused']:
+            return
+        first = self.scroll_top // self.post_height
+        last = (self.scroll_top + self.viewport_height) // self.post_height + 1
+        for index in range(max(0, first - 1), min(self.loaded, last + 1)):
+            expander['scanned'] += 1
+            if self.records[index]['truncated'] and index not in self.expanded:
+                self.expanded.add(index)
+                expander['clicked'] += 1
+
+
+class StandInDevTools:
+    """替身端點：依 sessionId 將指令分派到各分頁的 StandInFeed"""
+
+    def __init__(self, host="127.0.0.1", port=9333, post_count=200, latency=0.02):
+        """
+        :param post_count: 每個分頁的動態消息共有幾篇貼文
+        :param latency: 等待腳本與頁面載入的模擬延遲（秒）
+        """
+        self.host = host
+        self.port = port
+        self.post_count = post_count
+        self.latency = latency
+        self.targets = {}  # {targetId: StandInFeed 或 None（尚未前往任何網址）}
+        self.sessions = {}  # {sessionId: targetId}
+        self.cookies = []
+        self.commands = 0
+        self._ids = itertools.count(1)
+        self._server = None
+        self._scripts = {
+            IN_BROWSER_EXTRACT_SCRIPT: self._extract,
+            RESET_INCREMENTAL_TAGS_SCRIPT: self._reset_tags,
+            SCROLL_METRICS_SCRIPT: lambda feed: [feed.scroll_height, feed.scroll_top, feed.viewport_height],
+            INSTALL_EXPANDER_SCRIPT: self._install_expander,
+            POLL_EXPANDER_SCRIPT: self._poll_expander,
+            SET_EXPANDER_PAUSED_SCRIPT: self._set_expander_paused,
+            CLOSE_OVERLAY_SCRIPT: lambda feed: 0,
+        }
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    # ---- 頁面腳本 ----
+
+    def _extract(self, feed, incremental=False, fields=None):
+        return feed.extract(incremental, fields or [])
+
+    def _reset_tags(self, feed):
+        count = len(feed.signatures)
+        feed.signatures.clear()
+        return count
+
+    def _install_expander(self, feed, markers=None, selector=None, options=None):
+        if feed.expander is not None:
+            return feed.expander_stats()
+        feed.expander = {'clicked': 0, 'scanned': 0, 'paused': bool((options or {}).get('paused'))}
+        feed.flush_expander()
+        stats = feed.expander_stats()
+        stats['fresh'] = True
+        return stats
+
+    def _poll_expander(self, feed):
+        if feed.expander is None:
+            return None
+        feed.flush_expander()
+        return feed.expander_stats()
+
+    def _set_expander_paused(self, feed, paused=False):
+        if feed.expander is None:
+            return None
+        feed.expander['paused'] = bool(paused)
+        feed.flush_expander()
+        return feed.expander_stats()
+
+    async def _wait(self, feed, kind, options):
+        await asyncio.sleep(self.latency)
+        if kind == 'growth':
+            feed.scroll_by(feed.viewport_height)
+        return {'ok': True, 'elapsed_ms': int(self.latency * 1000), 'containers': feed.loaded, 'pending': 0}
+
+    async def evaluate(self, feed, expression):
+        script, args, _ = unwrap_script(expression)
+        if script == WAIT_SCRIPT:
+            return await self._wait(feed, args[0], args[1] if len(args) > 1 else {})
+        handler = self._scripts.get(script)
+        if handler is not None:
+            return handler(feed, *args)
+        match = SCROLL_BY_PATTERN.match(script)
+        if match:
+            feed.scroll_by(int(match.group(1)))
+        return None
+
+    # ---- CDP 指令 ----
+
+    async def handle(self, method, params, session_id, send_event):
+        self.commands += 1
+        if method == "Target.createTarget":
+            target_id = f"target-{next(self._ids)}"
+            self.targets[target_id] = None
+            return {'targetId': target_id}
+        if method == "Target.attachToTarget":
+            if params['targetId'] not in self.targets:
+                raise KeyError("No target with given id found")
+            session = f"session-{next(self._ids)}"
+            self.sessions[session] = params['targetId']
+            return {'sessionId': session}
+        if method == "Target.closeTarget":
+            self.targets.pop(params['targetId'], None)
+            return {'success': True}
+        if method == "Storage.setCookies":
+            self.cookies.extend(params.get('cookies', []))
+            return {}
+        if method == "Browser.getVersion":
+            return {'product': "StandIn/1.0", 'protocolVersion': "1.3"}
+
+        target_id = self.sessions.get(session_id)
+        if target_id not in self.targets:
+            raise KeyError("Session with given id not found")
+        if method == "Page.navigate":
+            self.targets[target_id] = StandInFeed(params['url'], self.post_count)
+
+            async def load():
+                await asyncio.sleep(self.latency)
+                await send_event("Page.loadEventFired", {'timestamp': 0}, session_id)
+
+            asyncio.ensure_future(load())
+            return {'frameId': target_id, 'loaderId': f"loader-{next(self._ids)}"}
+        if method == "Runtime.evaluate":
+            feed = self.targets[target_id] or StandInFeed("about:blank", 0)
+            value = await self.evaluate(feed, params['expression'])
+            return {'result': {'type': 'undefined'} if value is None else {'type': 'object', 'value': value}}
+        # Page.enable、Network.*、Emulation.* 等設定類指令不影響替身頁面
+        return {}
+
+    async def _connection(self, websocket):
+        async def send_event(method, params, session_id=None):
+            message = {'method': method, 'params': params}
+            if session_id:
+                message['sessionId'] = session_id
+            await websocket.send(json.dumps(message, ensure_ascii=False))
+
+        async def respond(message):
+            reply = {'id': message['id']}
+            if message.get('sessionId'):
+                reply['sessionId'] = message['sessionId']
+            try:
+                reply['result'] = await self.handle(message['method'], message.get('params') or {},
+                                                    message.get('sessionId'), send_event)
+            except Exception as e:
+                reply['error'] = {'code': -32000, 'message': str(e)}
+            await websocket.send(json.dumps(reply, ensure_ascii=False))
+
+        # 與真實瀏覽器相同，不同 session 的指令可以交錯處理（等待腳本不會擋住其他分頁）
+        tasks = set()
+        async for data in websocket:
+            task = asyncio.ensure_future(respond(json.loads(data)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    def _http(self, connection, request):
+        if request.path.startswith("/json/version"):
+            body = json.dumps({
+                'Browser': "StandIn/1.0",
+                'Protocol-Version': "1.3",
+                'webSocketDebuggerUrl': f"ws://{self.host}:{self.port}{BROWSER_PATH}",
+            }).encode('utf-8')
+            headers = Headers([("Content-Type", "application/json"), ("Content-Length", str(len(body)))])
+            return Response(200, "OK", headers, body)
+        if request.path != BROWSER_PATH:
+            return connection.respond(404, "Not Found\n")
+        return None
+
+    async def start(self):
+        require_websockets()
+        self._server = await websocket_serve(self._connection, self.host, self.port,
+                                             process_request=self._http, max_size=None)
+        if not self.port:
+            self.port = next(iter(self._server.sockets)).getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+async def serve(host, port, post_count, latency):
+    standin = await StandInDevTools(host, port, post_count, latency).start()
+    logger.info("🧪 替身 DevTools 端點已啟動: %s（每個分頁 %s 篇貼文，模擬延遲 %.3f 秒）",
+                standin.url, post_count, latency)
+    try:
+        await asyncio.Future()
+    finally:
+        await standin.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本機替身 DevTools 端點（測試 facebook_cdp_engine 用）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9333)
+    parser.add_argument("--posts", type=int, default=200, help="每個分頁的動態消息共有幾篇貼文")
+    parser.add_argument("--latency", type=float, default=0.02, help="等待腳本與頁面載入的模擬延遲（秒）")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.posts, args.latency))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+import bisect
+import hashlib
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from facebook_post_store import post_identity_digest
+from facebook_scraper_logging import get_logger
+
+logger = get_logger("checkpoint")
+
+
+# 檔案格式（little-endian）：
+#   檔頭 32 位元組：魔術字 b"FPSC"、版本 (H)、保留 (H)、識別碼數量 (I)、
+#                   最新貼文時間（自 epoch 起的分鐘數，0 表示未知）(q)、更新時間 (d)、執行次數 (I)
+#   之後為排序好的 8 位元組貼文識別碼（post_identity_digest），載入時一次讀入 array 不需逐筆解析
+CHECKPOINT_MAGIC = b"FPSC"
+CHECKPOINT_VERSION = 1
+CHECKPOINT_HEADER = struct.Struct("<4sHHIqdI")
+
+POST_TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def normalize_page_url(page_url):
+    """同一個粉絲專頁的不同寫法（大小寫、結尾斜線、查詢參數）對應同一個檢查點"""
+    parts = urlsplit(page_url.strip())
+    host = parts.netloc.lower()
+    if host.startswith(("m.", "web.")):
+        host = "www." + host.split(".", 1)[1]
+    return f"{host}{parts.path.rstrip('/').lower()}"
+
+
+def post_time_minutes(post_time):
+    """將 YYYY-MM-DD HH:MM 格式的貼文時間轉為自 epoch 起的分鐘數，無法解析時返回 None"""
+    try:
+        return int(datetime.strptime(post_time, POST_TIME_FORMAT).timestamp() // 60)
+    except (TypeError, ValueError):
+        return None
+
+
+class PageCheckpoint:
+    """單一粉絲專頁已爬取過的貼文識別碼（排序的 8 位元組整數）與最新貼文時間"""
+
+    def __init__(self, page_url, digests=None, newest_minutes=0, updated_at=0.0, run_count=0):
+        self.page_url = page_url
+        self.digests = digests if digests is not None else array('Q')
+        self.newest_minutes = newest_minutes
+        self.updated_at = updated_at
+        self.run_count = run_count
+
+    def __len__(self):
+        return len(self.digests)
+
+    def contains_digest(self, digest):
+        index = bisect.bisect_left(self.digests, digest)
+        return index < len(self.digests) and self.digests[index] == digest
+
+    def __contains__(self, post):
+        digest = post_identity_digest(post)
+        return digest is not None and self.contains_digest(digest)
+
+    @property
+    def newest_post_time(self):
+        """上次爬取到的最新貼文時間（YYYY-MM-DD HH:MM），沒有記錄時返回 None"""
+        if not self.newest_minutes:
+            return None
+        return datetime.fromtimestamp(self.newest_minutes * 60).strftime(POST_TIME_FORMAT)
+
+    def is_covered(self, post):
+        """貼文是否已在之前的爬取範圍內：識別碼已知，或發布時間不晚於上次的最新貼文"""
+        if post in self:
+            return True
+        minutes = post_time_minutes(post.get('post_time'))
+        return bool(self.newest_minutes) and minutes is not None and minutes <= self.newest_minutes
+
+    def add(self, posts):
+        """加入本次爬取的貼文，返回新增的識別碼數量"""
+        new_digests = set()
+        for post in posts:
+            digest = post_identity_digest(post)
+            if digest is not None and not self.contains_digest(digest):
+                new_digests.add(digest)
+            minutes = post_time_minutes(post.get('post_time'))
+            if minutes is not None and minutes > self.newest_minutes:
+                self.newest_minutes = minutes
+        if new_digests:
+            self.digests = array('Q', sorted(set(self.digests).union(new_digests)))
+        return len(new_digests)
+
+
+class CheckpointStore:
+    """每個粉絲專頁一個二進位檔案的檢查點保存區
+
+    檔案只包含固定長度的檔頭與排序好的識別碼，數萬篇貼文也只有數百 KB，啟動時可一次讀入。
+    寫入時先寫暫存檔再取代，避免寫到一半損壞。
+    """
+
+    def __init__(self, directory="facebook_checkpoints"):
+        self.directory = directory
+
+    def path_for(self, page_url):
+        digest = hashlib.sha256(normalize_page_url(page_url).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.directory, f"{digest}.ckpt")
+
+    def load(self, page_url):
+        """載入粉絲專頁的檢查點，不存在或損壞時返回空的檢查點"""
+        path = self.path_for(page_url)
+        if not os.path.exists(path):
+            return PageCheckpoint(page_url)
+
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(CHECKPOINT_HEADER.size)
+                magic, version, _, count, newest_minutes, updated_at, run_count = CHECKPOINT_HEADER.unpack(header)
+                if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION:
+                    raise ValueError("不是爬取檢查點檔案")
+                digests = array('Q')
+                digests.frombytes(f.read(count * 8))
+                if len(digests) != count:
+                    raise ValueError("識別碼數量不符")
+            if sys.byteorder == "big":
+                digests.byteswap()
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning("⚠️ 檢查點檔案損壞，將重新建立: %s（%s）", path, e)
+            return PageCheckpoint(page_url)
+
+        return PageCheckpoint(page_url, digests, newest_minutes, updated_at, run_count)
+
+    def save(self, checkpoint):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(checkpoint.page_url)
+        checkpoint.updated_at = time.time()
+        checkpoint.run_count += 1
+        digests = checkpoint.digests
+        if sys.byteorder == "big":
+            digests = array('Q', digests)
+            digests.byteswap()
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, 0, len(digests),
+                                           checkpoint.newest_minutes, checkpoint.updated_at,
+                                           checkpoint.run_count))
+            f.write(digests.tobytes())
+        os.replace(temp_path, path)
+        return path
+
+    def delete(self, page_url):
+        path = self.path_for(page_url)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class KnownPostTracker:
+    """依貼文在動態消息中第一次出現的順序，追蹤連續已爬取過的貼文數
+
+    置頂或少數順序錯亂的舊貼文不會讓連續數達到門檻；連續 stop_after 篇都已在上次的爬取範圍內時，
+    表示已捲動到上次爬取過的位置，可以停止。
+    known_count / new_count 只是停止判斷的統計：發布時間不晚於上次最新貼文的貼文也算在上次的範圍內，
+    但只有識別碼在檢查點中的貼文不會再輸出（見 observe 的返回值）。
+    """
+
+    def __init__(self, checkpoint, stop_after=5):
+        self.checkpoint = checkpoint
+        self.stop_after = stop_after
+        self.known_count = 0
+        self.new_count = 0
+        self.streak = 0
+        self._seen = set()
+
+    @property
+    def reached(self):
+        return self.streak >= self.stop_after
+
+    def observe(self, posts):
+        """處理一批擷取到的貼文，返回其中已爬取過（不需再輸出）的貼文"""
+        known = []
+        for post in posts:
+            digest = post_identity_digest(post)
+            if digest is None:
+                continue
+            if self.checkpoint.contains_digest(digest):
+                known.append(post)
+            if digest in self._seen:
+                continue
+            self._seen.add(digest)
+            if self.checkpoint.is_covered(post):
+                self.known_count += 1
+                self.streak += 1
+            else:
+                self.new_count += 1
+                self.streak = 0
+        return known
@@ -0,0 +1,191 @@
+"""Facebook 爬取結果的欄位式匯出（Parquet / Arrow IPC）
+
+CSV 只有字串，分析時每次載入都要重新解析按讚數與時間。欄位式檔案直接保存型別：
+likes / comments / shares 為整數（"1.2K"、"3.4萬" 等寫法會換算，無法辨識時為 null），
+post_time / scraped_at 為時間戳記（"未知時間" 為 null），文字欄位為字串。
+
+寫入時每累積 row_group_size 篇貼文就轉成一個 RecordBatch 寫出（Parquet 的一個 row group），
+搭配 iter_result_rows 逐筆讀取日誌，合併數個月的資料也只需固定大小的記憶體。
+
+輸出格式依副檔名決定：.parquet 為 Parquet，.arrow / .feather / .ipc 為 Arrow IPC 檔案。
+需安裝選用套件 pyarrow；合併與轉換請使用 facebook_output_journal.py：
+    python facebook_output_journal.py merged_posts.parquet
+"""
+import os
+import re
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 選用套件：只有欄位式匯出需要
+    pa = None
+    pq = None
+
+from facebook_time_parser import OUTPUT_FORMAT
+
+COLUMNAR_EXTENSIONS = {
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+COUNT_FIELDS = ('likes', 'comments', 'shares')
+TEXT_FIELDS = ('post_text', 'post_url')
+SCRAPED_AT_FORMAT = "%Y-%m-%d %H:%M:%S"
+TIMESTAMP_FORMATS = {
+    'post_time': OUTPUT_FORMAT,
+    'scraped_at': SCRAPED_AT_FORMAT,
+}
+
+DEFAULT_ROW_GROUP_SIZE = 10000
+DEFAULT_COMPRESSION = "zstd"
+
+# 例如 "1,234"、"1.2K"、"3M"、"1.2萬"、"讚 56"
+COUNT_PATTERN = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*([kmb千萬万億亿])?", re.IGNORECASE)
+COUNT_MULTIPLIERS = {
+    'k': 1_000, 'm': 1_000_000, 'b': 1_000_000_000,
+    '千': 1_000, '萬': 10_000, '万': 10_000, '億': 100_000_000, '亿': 100_000_000,
+}
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Parquet / Arrow 匯出需要 pyarrow 套件：pip install \"pyarrow>=14.0\"")
+
+
+def columnar_format(filename):
+    """依副檔名判斷欄位式格式（"parquet" 或 "arrow"），不是欄位式檔案時返回 None"""
+    if not filename:
+        return None
+    return COLUMNAR_EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+
+
+def parse_count(value):
+    """將按讚、留言、分享數的文字轉為整數，無法辨識時返回 None"""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    match = COUNT_PATTERN.search(str(value))
+    if not match:
+        return None
+    number, unit = match.groups()
+    number = number.replace(",", "")
+    try:
+        if unit:
+            return int(round(float(number) * COUNT_MULTIPLIERS[unit.lower()]))
+        return int(float(number))
+    except ValueError:
+        return None
+
+
+def parse_timestamp(value, fmt):
+    """依固定格式解析時間，"未知時間" 或無法解析時返回 None"""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.strptime(value, fmt)
+    except (TypeError, ValueError):
+        return None
+
+
+def post_schema():
+    """欄位順序與 CSV 相同（FIELDNAMES），時間為不含時區的本地時間"""
+    require_pyarrow()
+    return pa.schema([
+        ('post_text', pa.string()),
+        ('likes', pa.int64()),
+        ('comments', pa.int64()),
+        ('shares', pa.int64()),
+        ('post_time', pa.timestamp('s')),
+        ('post_url', pa.string()),
+        ('scraped_at', pa.timestamp('s')),
+    ])
+
+
+class ColumnarPostWriter:
+    """以 row group 為單位串流寫入 Parquet 或 Arrow IPC 檔案
+
+    貼文先依欄位放入緩衝，每 row_group_size 篇轉成一個 RecordBatch 寫出並清空緩衝。
+    Parquet 的文字欄位啟用字典編碼（重複的貼文內容只存一次，字典過大時 Parquet 會自動改回一般編碼）；
+    Arrow IPC 每個 batch 各自壓縮。
+    """
+
+    def __init__(self, filename, fmt=None, row_group_size=DEFAULT_ROW_GROUP_SIZE,
+                 compression=DEFAULT_COMPRESSION):
+        require_pyarrow()
+        self.filename = filename
+        self.format = fmt or columnar_format(filename)
+        if self.format not in ("parquet", "arrow"):
+            raise ValueError(f"不支援的欄位式格式: {filename}（請使用 .parquet 或 .arrow）")
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.schema = post_schema()
+        self.rows_written = 0
+        self.row_groups = 0
+        self._columns = {name: [] for name in self.schema.names}
+        self._buffered = 0
+        self._writer = None
+
+    def open(self):
+        if self._writer is None:
+            if self.format == "parquet":
+                self._writer = pq.ParquetWriter(self.filename, self.schema,
+                                                compression=self.compression,
+                                                use_dictionary=list(TEXT_FIELDS))
+            else:
+                options = pa.ipc.IpcWriteOptions(compression=self.compression)
+                self._writer = pa.ipc.new_file(self.filename, self.schema, options=options)
+        return self
+
+    def write(self, post):
+        """加入單篇貼文（CSV 列、日誌記錄或爬取結果的 dict）"""
+        columns = self._columns
+        columns['post_text'].append(post.get('post_text') or "")
+        for field in COUNT_FIELDS:
+            columns[field].append(parse_count(post.get(field)))
+        for field, fmt in TIMESTAMP_FORMATS.items():
+            columns[field].append(parse_timestamp(post.get(field), fmt))
+        columns['post_url'].append(post.get('post_url') or None)
+        self._buffered += 1
+        if self._buffered >= self.row_group_size:
+            self.flush()
+
+    def write_many(self, posts):
+        for post in posts:
+            self.write(post)
+
+    def flush(self):
+        """將緩衝的貼文寫成一個 row group"""
+        if not self._buffered:
+            return
+        self.open()
+        batch = pa.record_batch([self._columns[name] for name in self.schema.names],
+                                schema=self.schema)
+        self._writer.write_batch(batch)
+        self.rows_written += self._buffered
+        self.row_groups += 1
+        self._columns = {name: [] for name in self.schema.names}
+        self._buffered = 0
+
+    def close(self):
+        # 沒有任何貼文時仍寫出只有欄位定義的檔案
+        self.open()
+        self.flush()
+        self._writer.close()
+        self._writer = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_posts(posts, filename, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """將貼文寫成欄位式檔案（格式依副檔名），返回寫入的貼文數"""
+    with ColumnarPostWriter(filename, row_group_size=row_group_size) as writer:
+        writer.write_many(posts)
+    return writer.rows_written
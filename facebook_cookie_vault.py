@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import pickle
+from datetime import datetime, timedelta
+
+from facebook_scraper_logging import get_logger
+
+logger = get_logger("cookies")
+
+
+COOKIE_DOMAIN_URL = "https://www.facebook.com"
+
+# 不支援 CDP 時，add_cookie 前必須先位於同網域；使用內容極小的網址以減少載入時間
+COOKIE_BOOTSTRAP_URL = "https://www.facebook.com/robots.txt"
+
+# 登入後才會出現的 Cookie（使用者ID）
+SESSION_COOKIE = "c_user"
+
+
+def to_cdp_cookie(cookie):
+    """將 Selenium 的 Cookie 格式轉換為 CDP Network.setCookies 的格式"""
+    cdp_cookie = {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "domain": cookie.get("domain") or ".facebook.com",
+        "path": cookie.get("path") or "/",
+        "secure": cookie.get("secure", True),
+        "httpOnly": cookie.get("httpOnly", False),
+    }
+    if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+        cdp_cookie["sameSite"] = cookie["sameSite"]
+    if cookie.get("expiry"):
+        cdp_cookie["expires"] = cookie["expiry"]
+    return cdp_cookie
+
+
+class CookieVault:
+    """每個帳號一個 JSON 檔案的登入狀態保存區
+
+    取代單一的 facebook_cookies.pkl：不同帳號的 Cookie 互不覆蓋，
+    檔案為純文字 JSON（不使用 pickle 反序列化），寫入時先寫暫存檔再取代，避免寫到一半損壞。
+    """
+
+    def __init__(self, directory="facebook_cookies", expiry_days=7):
+        """
+        :param directory: 保存 Cookie 的目錄
+        :param expiry_days: Cookie有效期限（天）
+        """
+        self.directory = directory
+        self.expiry_days = expiry_days
+
+    def path_for(self, email):
+        """帳號對應的 Cookie 檔案（檔名為帳號雜湊，不直接暴露帳號）"""
+        digest = hashlib.sha256(email.strip().lower().encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def save(self, email, cookies, saved_time=None):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(email)
+        data = {
+            'email': email,
+            'saved_time': saved_time or datetime.now().isoformat(),
+            'cookies': cookies,
+        }
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+        return path
+
+    def load(self, email):
+        """載入帳號的 Cookie，不存在、過期或損壞時返回 None"""
+        path = self.path_for(email)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            saved_time = datetime.fromisoformat(data['saved_time'])
+        except (ValueError, KeyError, OSError) as e:
+            logger.info("Cookie檔案損壞，已刪除: %s", e)
+            self.delete(email)
+            return None
+
+        if datetime.now() - saved_time > timedelta(days=self.expiry_days):
+            logger.info("Cookies已過期，需要重新登入")
+            self.delete(email)
+            return None
+
+        if data.get('email') != email:
+            logger.info("Cookies帳號不匹配當前帳號")
+            return None
+
+        return data['cookies']
+
+    def delete(self, email):
+        path = self.path_for(email)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def migrate_legacy_pickle(self, pickle_path, email):
+        """將舊版 facebook_cookies.pkl 轉存為 JSON，成功後刪除舊檔
+
+        只轉存屬於同一帳號的 Cookie；返回是否有轉存。
+        """
+        if not pickle_path or not os.path.exists(pickle_path):
+            return False
+        if os.path.exists(self.path_for(email)):
+            return False
+
+        try:
+            with open(pickle_path, 'rb') as f:
+                cookie_data = pickle.load(f)
+        except Exception as e:
+            logger.warning("讀取舊版cookies檔案失敗: %s", e)
+            return False
+
+        if cookie_data.get('email') != email:
+            return False
+
+        # 保留原本的保存時間，有效期限不因轉存而延長
+        path = self.save(email, cookie_data['cookies'], saved_time=cookie_data['saved_time'])
+        os.remove(pickle_path)
+        logger.info("✅ 已將舊版cookies檔案轉存至: %s", path)
+        return True
@@ -2,20 +2,183 @@ import time
 import random
 import csv
 import json
-import pickle
 import re
-from datetime import datetime, timedelta
-from bs4 import BeautifulSoup
+from datetime import datetime
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4 import FeatureNotFound
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.edge.options import Options as EdgeOptions
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 import os
 import threading
+from facebook_post_extractor import PostExtractionPlan, IN_BROWSER_EXTRACT_SCRIPT
+from facebook_post_store import PostStore, is_truncated_text
+from facebook_time_parser import FacebookTimeParser
+from facebook_checkpoint_store import CheckpointStore, KnownPostTracker
+from facebook_post_window import PostTimeWindow, format_minutes
+from facebook_scrape_steps import (scrape_steps, run_steps, RESET_TAGS, INSTALL_EXPANDER, EXTRACT, EXPAND,
+                                   SCROLL, SETTLE, SCROLL_METRICS, WAIT_GROWTH, WAIT_NETWORK)
+from facebook_network_capture import NetworkFeedCapture, FeedResponseDecoder, apply_capture_options
+from facebook_columnar_export import columnar_format, write_posts
+from facebook_output_journal import OutputJournal, find_result_files, stream_merge_files
+from facebook_wait_engine import WaitEngine, POST_CONTAINER_SELECTOR, WAIT_SCRIPT
+from facebook_scroll_controller import SCROLL_METRICS_SCRIPT
+from facebook_see_more_expander import (SeeMoreExpander, INSTALL_EXPANDER_SCRIPT, POLL_EXPANDER_SCRIPT,
+                                        SET_EXPANDER_PAUSED_SCRIPT)
+from facebook_scraper_metrics import (ScrapeMetrics, InstrumentedDriver, is_instrumented,
+                                      measure_phase, register_scripts)
+from facebook_scraper_logging import get_logger
+from facebook_cookie_vault import (CookieVault, COOKIE_DOMAIN_URL, COOKIE_BOOTSTRAP_URL,
+                                   SESSION_COOKIE, to_cdp_cookie)
+
+
+logger = get_logger("scraper")
+
+# 可選的HTML解析引擎：
+#   html.parser - Python內建解析器（最慢，但不需額外套件）
+#   lxml        - 以lxml建立完整文件樹
+#   strainer    - 以lxml搭配SoupStrainer，只建立貼文容器的子樹（預設，最快）
+PARSER_ENGINES = ("html.parser", "lxml", "strainer")
+
+# 貼文擷取引擎：
+#   bs - 取回 page_source 後在 Python 以 BeautifulSoup 解析（預設）
+#   js - 在瀏覽器內以 execute_script 擷取欄位，只回傳精簡 JSON；失敗時退回 bs
+#   network - 從動態消息的網路回應（GraphQL JSON）解出貼文，不需展開「查看更多」也不解析HTML；
+#             瀏覽器需以效能記錄啟動（initialize_driver 會自動設定），無法讀取時退回 bs
+EXTRACTION_ENGINES = ("bs", "js", "network")
+
+POST_CONTAINER_ATTRS = {"class": "x1n2onr6 x1ja2u2z"}
+
+# 增量擷取：只回傳新出現或文字長度有變動的貼文容器，並在瀏覽器端標記已處理的容器
+INCREMENTAL_EXTRACT_SCRIPT = """
+var containers = document.querySelectorAll('div[class="x1n2onr6 x1ja2u2z"]');
+var changed = [];
+for (var i = 0; i < containers.length; i++) {
+    var node = containers[i];
+    var signature = String((node.textContent || '').length);
+    if (node.getAttribute('data-fps-sig') !== signature) {
+        node.setAttribute('data-fps-sig', signature);
+        changed.push(node.outerHTML);
+    }
+}
+return changed;
+"""
+
+RESET_INCREMENTAL_TAGS_SCRIPT = """
+var tagged = document.querySelectorAll('[data-fps-sig]');
+for (var i = 0; i < tagged.length; i++) {
+    tagged[i].removeAttribute('data-fps-sig');
+}
+return tagged.length;
+"""
+
+# 精簡模式封鎖的資源（圖片、影片、字型）；貼文擷取只需要 DOM 文字
+LEAN_BLOCKED_URLS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.ico", "*.bmp",
+    "*.mp4", "*.webm", "*.m4a", "*.m4v", "*.mp3",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*scontent*.fbcdn.net/*", "*video*.fbcdn.net/*",
+]
+
+# 精簡模式固定的視窗大小
+LEAN_VIEWPORT = (1024, 768)
+
+# 每個新文件載入前執行：停用動畫與轉場、擴大資源計時緩衝區（預設只保留250筆）
+LEAN_PAGE_SCRIPT = """
+(function() {
+    if (window.performance && performance.setResourceTimingBufferSize) {
+        performance.setResourceTimingBufferSize(100000);
+    }
+    var css = '*, *::before, *::after { animation: none !important; transition: none !important; ' +
+              'scroll-behavior: auto !important; caret-color: transparent !important; }';
+    document.addEventListener('DOMContentLoaded', function() {
+        var style = document.createElement('style');
+        style.textContent = css;
+        document.head.appendChild(style);
+    });
+})();
+"""
+
+# 以 Performance API 統計目前頁面的資源傳輸量與載入時間
+RESOURCE_STATS_SCRIPT = """
+var entries = performance.getEntriesByType('resource');
+var stats = {requests: entries.length, transfer_bytes: 0, decoded_bytes: 0, by_type: {}};
+for (var i = 0; i < entries.length; i++) {
+    var entry = entries[i];
+    var type = entry.initiatorType || 'other';
+    var bucket = stats.by_type[type] || (stats.by_type[type] = {requests: 0, transfer_bytes: 0});
+    bucket.requests++;
+    bucket.transfer_bytes += entry.transferSize || 0;
+    stats.transfer_bytes += entry.transferSize || 0;
+    stats.decoded_bytes += entry.decodedBodySize || 0;
+}
+var navigation = performance.getEntriesByType('navigation')[0];
+if (navigation) {
+    stats.transfer_bytes += navigation.transferSize || 0;
+    stats.dom_content_loaded_ms = Math.round(navigation.domContentLoadedEventEnd);
+    stats.load_ms = Math.round(navigation.loadEventEnd);
+}
+if (performance.memory) {
+    stats.js_heap_bytes = performance.memory.usedJSHeapSize;
+}
+stats.dom_nodes = document.getElementsByTagName('*').length;
+return stats;
+"""
+
+# 登入狀態判斷：出現登入表單或位於登入/驗證頁為未登入；出現登入後才有的頁面元素為已登入
+LOGIN_STATE_SCRIPT = """
+var path = location.pathname;
+if (document.querySelector('input[name="email"]') || path.indexOf('/login') === 0 || path.indexOf('/checkpoint') === 0) {
+    return 'logged_out';
+}
+if (document.readyState !== 'loading' && document.querySelector(
+        '[role="banner"], [role="navigation"], [data-testid="blue_bar_profile_link"]')) {
+    return 'logged_in';
+}
+return null;
+"""
+
+# 與 close_overlay_dialogs 的 JavaScript 部分相同：送出 ESC、隱藏對話框，回傳仍可見的遮蔽層數
+CLOSE_OVERLAY_SCRIPT = """
+document.body && document.body.click();
+for (var i = 0; i < 3; i++) {
+    document.dispatchEvent(new KeyboardEvent('keydown', {key: 'Escape', bubbles: true}));
+    document.dispatchEvent(new KeyboardEvent('keyup', {key: 'Escape', bubbles: true}));
+}
+document.querySelectorAll('[role="dialog"], [data-testid="modal"], .modal').forEach(function(modal) {
+    if (modal.style) { modal.style.display = 'none'; }
+});
+var visibleCount = 0;
+document.querySelectorAll('[role="dialog"], [data-testid="modal"], .modal, .overlay').forEach(function(overlay) {
+    var style = window.getComputedStyle(overlay);
+    if (style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0') {
+        visibleCount++;
+    }
+});
+return visibleCount;
+"""
+
+
+# 讓 WebDriver 指令統計依腳本名稱分開計算
+register_scripts({
+    "incremental_extract": INCREMENTAL_EXTRACT_SCRIPT,
+    "reset_incremental_tags": RESET_INCREMENTAL_TAGS_SCRIPT,
+    "in_browser_extract": IN_BROWSER_EXTRACT_SCRIPT,
+    "resource_stats": RESOURCE_STATS_SCRIPT,
+    "login_state": LOGIN_STATE_SCRIPT,
+    "close_overlay": CLOSE_OVERLAY_SCRIPT,
+    "scroll_metrics": SCROLL_METRICS_SCRIPT,
+    "wait": WAIT_SCRIPT,
+    "install_expander": INSTALL_EXPANDER_SCRIPT,
+    "poll_expander": POLL_EXPANDER_SCRIPT,
+    "set_expander_paused": SET_EXPANDER_PAUSED_SCRIPT,
+})
 
 
 class FacebookPageScraper:
@@ -29,14 +192,53 @@ class FacebookPageScraper:
         self.email = email
         self.password = password
         self.use_edge = use_edge
+        self.lean_mode = False  # 精簡模式：無頭、封鎖圖片影片字型、停用動畫、固定視窗大小
+        self.page_url = None  # 目前的粉絲專頁網址（navigate_to_page 時設定）
+        self.since_last_run = False  # 只爬取上次執行之後的新貼文（依每個粉絲專頁的檢查點）
+        self.checkpoint_dir = "facebook_checkpoints"  # 檢查點保存目錄
+        self.known_posts_to_stop = 5  # 連續遇到幾篇上次已爬取過的貼文就停止捲動
+        self.checkpoint = None  # 本次爬取使用的檢查點
+        self.known_tracker = None
+        self.post_since = None  # 只爬取此時間之後的貼文（datetime、date 或 YYYY-MM-DD [HH:MM]），None 表示不限制
+        self.post_until = None  # 只爬取此時間之前的貼文（只有日期時包含當天）
+        self.window_posts_to_stop = 3  # 連續遇到幾篇早於 post_since 的貼文就停止捲動（容許置頂或順序錯亂的舊貼文）
+        self.post_window = None  # 本次爬取的時間範圍
+        self.expansion_paused = False  # 目前捲動位置不在時間範圍內，暫停展開「查看更多」
+        self.tabs_per_browser = 1  # 同一個瀏覽器同時開啟的粉絲專頁分頁數（大於1時以分頁多工爬取）
         self.driver = None
+        self.overlays_handled = False  # 此瀏覽器已完整處理過遮蔽彈窗，之後前往頁面只需一次 JavaScript 檢查
         self.scraped_posts = []
+        self.post_store = PostStore()  # 目前爬取中的貼文索引
         self.stop_scraping = False
         self.auto_save_interval = 5  # 每抓取5篇貼文自動保存一次
         self.partial_files = []  # 儲存部分檔案的列表
+        self.use_output_journal = True  # 自動保存寫入單一只附加日誌，而非每批次一個CSV
+        self.journal_compress = False  # 日誌是否以gzip壓縮
+        self.journal = None  # 本次執行的輸出日誌
         self.save_callback = None  # 保存狀態回調函數
-        self.cookie_file = "facebook_cookies.pkl"  # Cookie檔案路徑
+        self.cookie_file = "facebook_cookies.pkl"  # 舊版Cookie檔案路徑（首次登入時自動轉存）
+        self.cookie_vault_dir = "facebook_cookies"  # 每個帳號一個JSON的Cookie保存目錄
         self.cookie_expiry_days = 7  # Cookie有效期限（天）
+        self.login_timeout = 30  # 等待登入結果的最長秒數
+        self.fast_typing = False  # 帳號密碼一次輸入，不模擬人類打字
+        self.login_metrics = {}  # 各登入方式最近一次的耗時
+        self.wait_engine = None  # 以頁面訊號取代固定等待的等待引擎
+        self.scroll_controller = None  # 最近一次爬取的捲動控制器（可檢視 decisions）
+        self.use_see_more_expander = True  # 使用常駐頁面的「查看更多」展開器，而非每步掃描整份文件
+        self.see_more_expander = None
+        self.resource_stats = None  # 最近一次爬取結束時頁面的資源傳輸統計
+        self.metrics = ScrapeMetrics()  # 各階段耗時與 WebDriver 指令統計
+        self.instrument_webdriver = True  # 是否記錄每個 WebDriver 指令的次數、延遲與傳輸量
+        self.time_parser = FacebookTimeParser()  # 時間解析引擎（可注入固定的 now 以便測試）
+        self.incremental_extraction = True  # 只解析新出現或有變動的貼文容器
+        self.parser_engine = "strainer"  # HTML解析引擎，見 PARSER_ENGINES
+        self.extraction_fields = None  # 只擷取指定欄位（POST_FIELDS 子集），None表示全部
+        self.extraction_engine = "bs"  # 貼文擷取引擎，見 EXTRACTION_ENGINES
+        self.network_capture = None  # network 引擎的網路回應擷取器
+        self.network_decoder = None  # network 引擎目前粉絲專頁的回應解碼結果
+        self.network_fixture_path = None  # network 引擎擷取到的回應另存為回應錄製檔（離線解碼用）
+        self._extraction_plan = None
+        self._extraction_plan_fields = None
 
     def initialize_driver(self):
         """初始化網頁瀏覽器驅動"""
@@ -52,6 +254,12 @@ class FacebookPageScraper:
                     "useAutomationExtension", False)
                 options.add_argument(
                     "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36 Edg/91.0.864.59")
+                if self.lean_mode:
+                    self.apply_lean_options(options)
+                if self.tabs_per_browser > 1:
+                    self.apply_background_tab_options(options)
+                if self.extraction_engine == "network":
+                    apply_capture_options(options)
 
                 self.driver = webdriver.Edge(options=options)
             else:
@@ -64,6 +272,12 @@ class FacebookPageScraper:
                     "useAutomationExtension", False)
                 options.add_argument(
                     "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+                if self.lean_mode:
+                    self.apply_lean_options(options)
+                if self.tabs_per_browser > 1:
+                    self.apply_background_tab_options(options)
+                if self.extraction_engine == "network":
+                    apply_capture_options(options)
 
                 # 檢查是否有chromedriver
                 chromedriver_path = os.path.join(
@@ -74,15 +288,79 @@ class FacebookPageScraper:
                 else:
                     self.driver = webdriver.Chrome(options=options)
 
+            self.instrument_driver()
+            self.overlays_handled = False
+
             # 移除webdriver痕跡
             self.driver.execute_script(
                 "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            if self.lean_mode:
+                self.apply_lean_devtools_settings()
             return True
 
         except Exception as e:
-            print(f"瀏覽器初始化失敗: {e}")
+            logger.error("瀏覽器初始化失敗: %s", e)
             return False
 
+    def instrument_driver(self):
+        """以 InstrumentedDriver 包裝目前的瀏覽器驅動（已包裝時不重複包裝）"""
+        if self.instrument_webdriver and self.driver is not None and not is_instrumented(self.driver):
+            self.driver = InstrumentedDriver(self.driver, self.metrics)
+        return self.driver
+
+    def save_metrics_report(self, filename=None, extra=None):
+        """將本次爬取的效能統計存成 JSON 報告，返回檔名"""
+        try:
+            filename = self.metrics.save_report(filename, extra)
+            logger.info("📊 效能報告已儲存至: %s", filename)
+            return filename
+        except Exception as e:
+            logger.warning("儲存效能報告時發生錯誤: %s", e)
+            return None
+
+    def apply_lean_options(self, options):
+        """精簡模式的瀏覽器啟動參數：無頭、不載入圖片、固定視窗大小、減少背景工作"""
+        width, height = LEAN_VIEWPORT
+        options.add_argument("--headless=new")
+        options.add_argument(f"--window-size={width},{height}")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--force-prefers-reduced-motion")
+        options.add_argument("--mute-audio")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-gpu")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+        })
+
+    def apply_background_tab_options(self, options):
+        """分頁多工時避免瀏覽器降低背景分頁的計時器與繪製頻率（否則輪到前景前不會載入新貼文）"""
+        options.add_argument("--disable-background-timer-throttling")
+        options.add_argument("--disable-backgrounding-occluded-windows")
+        options.add_argument("--disable-renderer-backgrounding")
+
+    def apply_lean_devtools_settings(self):
+        """透過 DevTools 協定封鎖圖片、影片與字型請求，固定視窗大小並停用動畫"""
+        width, height = LEAN_VIEWPORT
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+            self.driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+                "width": width, "height": height, "deviceScaleFactor": 1, "mobile": False})
+            self.driver.execute_cdp_cmd("Emulation.setEmulatedMedia", {
+                "features": [{"name": "prefers-reduced-motion", "value": "reduce"}]})
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": LEAN_PAGE_SCRIPT})
+            logger.info("🪶 精簡模式：已封鎖圖片、影片與字型，停用動畫")
+        except Exception as e:
+            logger.warning("⚠️ 精簡模式設定失敗（將以一般模式載入資源）: %s", e)
+
+    def get_resource_stats(self):
+        """取得目前頁面的資源請求數、傳輸位元組與載入時間（Performance API）"""
+        try:
+            return self.driver.execute_script(RESOURCE_STATS_SCRIPT)
+        except Exception as e:
+            logger.warning("取得資源統計時發生錯誤: %s", e)
+            return None
+
     def simulate_human_typing(self, element, text):
         """模擬人類打字模式"""
         for char in text:
@@ -93,41 +371,94 @@ class FacebookPageScraper:
             if random.random() < 0.1:
                 time.sleep(random.uniform(0.3, 0.7))
 
+    def type_text(self, element, text):
+        """輸入文字：fast_typing 時一次送出，否則模擬人類打字"""
+        if self.fast_typing:
+            element.send_keys(text)
+        else:
+            self.simulate_human_typing(element, text)
+
+    def _record_login_metric(self, method, started_at, success):
+        """記錄登入耗時（秒），取代過去固定等待時間的總和"""
+        elapsed = time.perf_counter() - started_at
+        self.login_metrics[method] = {
+            'success': success,
+            'seconds': round(elapsed, 3),
+            'recorded_at': datetime.now().isoformat(),
+        }
+        logger.info("⏱️ %s登入耗時 %.2f 秒", 'Cookie' if method == 'cookies' else '帳號密碼', elapsed)
+
+    def wait_for_login_state(self, timeout=None):
+        """等待頁面呈現登入狀態，返回 "logged_in"、"logged_out"，逾時返回 None
+
+        以條件判斷取代固定等待：出現登入表單即為未登入；
+        有 c_user Cookie 且出現登入後才有的頁面元素即為已登入。
+        """
+        timeout = self.login_timeout if timeout is None else timeout
+
+        def login_state(driver):
+            state = driver.execute_script(LOGIN_STATE_SCRIPT)
+            if state == "logged_in" and not driver.get_cookie(SESSION_COOKIE):
+                return False
+            return state or False
+
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(login_state)
+        except TimeoutException:
+            return None
+
+    def login_with_cookies(self):
+        """只使用已保存的登入狀態（Cookie）登入，不輸入帳號密碼
+
+        Cookie 在前往頁面前注入，整個流程只需要一次頁面載入。
+        """
+        started_at = time.perf_counter()
+        try:
+            logger.info("嘗試使用已保存的登入狀態...")
+            if not self.load_cookies():
+                return False
+
+            self.driver.get(COOKIE_DOMAIN_URL)
+            state = self.wait_for_login_state()
+            if state == "logged_in":
+                self._record_login_metric('cookies', started_at, True)
+                logger.info("✅ 使用Cookie登入成功！")
+                logger.info("🔧 Cookie登入後檢查彈窗...")
+                self.close_overlay_dialogs()
+                return True
+
+            logger.info("Cookie已失效" if state == "logged_out" else "等待登入狀態逾時")
+            self._record_login_metric('cookies', started_at, False)
+            return False
+
+        except Exception as e:
+            logger.error("❌ Cookie登入過程發生錯誤: %s", e)
+            return False
+
     def login(self):
         """登入Facebook（支援Cookie快速登入）"""
         try:
             # 先嘗試使用Cookie登入
-            print("嘗試使用已保存的登入狀態...")
-            if self.load_cookies():
-                # 重新載入頁面以應用cookies
-                self.driver.refresh()
-                time.sleep(3)
-
-                # 檢查是否成功登入
-                if self.is_logged_in():
-                    print("✅ 使用Cookie登入成功！")
-                    print("🔧 Cookie登入後檢查彈窗...")
-                    time.sleep(1)  # 短暫等待
-                    self.close_overlay_dialogs()
-                    return True
-                else:
-                    print("Cookie登入失敗，嘗試傳統登入...")
+            if self.login_with_cookies():
+                return True
+            logger.info("Cookie登入失敗，嘗試傳統登入...")
 
             # 傳統登入流程
-            print("正在前往Facebook登入頁面...")
+            started_at = time.perf_counter()
+            logger.info("正在前往Facebook登入頁面...")
             self.driver.get("https://www.facebook.com/login")
 
             # 等待並填入email
             email_input = WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.NAME, "email"))
             )
-            self.simulate_human_typing(email_input, self.email)
+            self.type_text(email_input, self.email)
 
             # 等待並填入密碼
             password_input = WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.NAME, "pass"))
             )
-            self.simulate_human_typing(password_input, self.password)
+            self.type_text(password_input, self.password)
 
             # 點擊登入按鈕
             login_button = self.driver.find_element(
@@ -138,254 +469,116 @@ class FacebookPageScraper:
                 .click()\
                 .perform()
 
-            print("登入中，請稍等...")
-            time.sleep(15)
+            logger.info("登入中，請稍等...")
+            # 等待伺服器發出登入 Cookie（或被導向驗證頁面），而非固定等待15秒
+            try:
+                WebDriverWait(self.driver, self.login_timeout, poll_frequency=0.2).until(
+                    lambda driver: driver.get_cookie(SESSION_COOKIE)
+                    or "/checkpoint" in driver.current_url
+                )
+            except TimeoutException:
+                pass
 
             # 檢查是否成功登入
-            if "facebook.com" in self.driver.current_url and "login" not in self.driver.current_url:
-                print("✅ 帳號密碼登入成功！")
+            if self.wait_for_login_state() == "logged_in":
+                self._record_login_metric('password', started_at, True)
+                logger.info("✅ 帳號密碼登入成功！")
 
                 # 保存cookies供下次使用
                 self.save_cookies()
 
                 # 立即處理登入後的彈窗
-                print("🔧 處理登入後可能的彈窗...")
-                time.sleep(1)  # 短暫等待
+                logger.info("🔧 處理登入後可能的彈窗...")
                 self.close_overlay_dialogs()
 
                 return True
             else:
-                print("❌ 登入失敗，請檢查帳號密碼")
+                self._record_login_metric('password', started_at, False)
+                logger.error("❌ 登入失敗，請檢查帳號密碼（或帳號需要額外驗證）")
                 return False
 
         except Exception as e:
-            print(f"❌ 登入過程發生錯誤: {e}")
+            logger.error("❌ 登入過程發生錯誤: %s", e)
             return False
 
+    def get_cookie_vault(self):
+        return CookieVault(self.cookie_vault_dir, self.cookie_expiry_days)
+
     def save_cookies(self):
-        """保存當前的cookies到檔案"""
+        """保存當前的cookies到帳號的 Cookie 保存區"""
         try:
-            cookies = self.driver.get_cookies()
-            cookie_data = {
-                'cookies': cookies,
-                'saved_time': datetime.now().isoformat(),
-                'email': self.email  # 保存帳號以便驗證
-            }
+            path = self.get_cookie_vault().save(self.email, self.driver.get_cookies())
 
-            with open(self.cookie_file, 'wb') as f:
-                pickle.dump(cookie_data, f)
-
-            print(f"✅ Cookies已保存到: {self.cookie_file}")
+            logger.info("✅ Cookies已保存到: %s", path)
             if self.save_callback:
                 self.save_callback(f"已保存登入狀態，下次可快速登入")
 
             return True
 
         except Exception as e:
-            print(f"保存cookies時發生錯誤: {e}")
+            logger.warning("保存cookies時發生錯誤: %s", e)
             return False
 
     def load_cookies(self):
-        """從檔案載入cookies"""
+        """從 Cookie 保存區載入cookies並注入瀏覽器（不會前往頁面）"""
         try:
-            if not os.path.exists(self.cookie_file):
-                print("找不到cookies檔案")
-                return False
-
-            with open(self.cookie_file, 'rb') as f:
-                cookie_data = pickle.load(f)
+            vault = self.get_cookie_vault()
+            vault.migrate_legacy_pickle(self.cookie_file, self.email)
 
-            # 檢查cookies是否過期
-            saved_time = datetime.fromisoformat(cookie_data['saved_time'])
-            if datetime.now() - saved_time > timedelta(days=self.cookie_expiry_days):
-                print("Cookies已過期，需要重新登入")
-                os.remove(self.cookie_file)  # 刪除過期的cookies
+            cookies = vault.load(self.email)
+            if not cookies:
+                logger.info("找不到此帳號的cookies")
                 return False
 
-            # 檢查帳號是否匹配
-            if cookie_data.get('email') != self.email:
-                print("Cookies帳號不匹配當前帳號")
-                return False
-
-            # 先訪問Facebook主頁
-            self.driver.get("https://www.facebook.com")
-            time.sleep(2)
-
-            # 載入cookies
-            for cookie in cookie_data['cookies']:
-                try:
-                    self.driver.add_cookie(cookie)
-                except Exception as e:
-                    print(f"載入單個cookie失敗: {e}")
-                    continue
-
-            print("✅ Cookies載入成功")
+            self.inject_cookies(cookies)
+            logger.info("✅ Cookies載入成功")
             return True
 
         except Exception as e:
-            print(f"載入cookies時發生錯誤: {e}")
+            logger.warning("載入cookies時發生錯誤: %s", e)
             # 如果載入失敗，刪除問題cookies檔案
-            if os.path.exists(self.cookie_file):
-                os.remove(self.cookie_file)
+            self.get_cookie_vault().delete(self.email)
             return False
 
-    def is_logged_in(self):
-        """檢查是否已經登入"""
-        try:
-            # 檢查頁面上是否有登入成功的標誌
-            self.driver.get("https://www.facebook.com")
-            time.sleep(3)
-
-            # 如果頁面包含登入表單，說明未登入
-            login_elements = self.driver.find_elements(By.NAME, "email")
-            if login_elements:
-                return False
+    def inject_cookies(self, cookies):
+        """將cookies注入瀏覽器
 
-            # 檢查是否有用戶菜單或其他登入成功的標誌
-            user_menu = self.driver.find_elements(
-                By.CSS_SELECTOR, "[data-testid='blue_bar_profile_link']")
-            if user_menu:
-                return True
+        Edge/Chrome 透過 CDP Network.setCookies 直接寫入，不需要先載入 Facebook 頁面；
+        不支援 CDP 時退回先開啟輕量的同網域網址再逐一 add_cookie。
+        """
+        try:
+            self.driver.execute_cdp_cmd(
+                "Network.setCookies", {"cookies": [to_cdp_cookie(cookie) for cookie in cookies]})
+            return
+        except Exception as e:
+            logger.warning("CDP注入cookies失敗，改用逐一載入: %s", e)
 
-            # 檢查網址是否還在login頁面
-            if "login" in self.driver.current_url:
-                return False
+        self.driver.get(COOKIE_BOOTSTRAP_URL)
+        for cookie in cookies:
+            try:
+                self.driver.add_cookie(cookie)
+            except Exception as e:
+                logger.warning("載入單個cookie失敗: %s", e)
+                continue
 
-            return True
+    def is_logged_in(self):
+        """檢查目前頁面是否為已登入狀態"""
+        try:
+            if "facebook.com" not in self.driver.current_url:
+                self.driver.get(COOKIE_DOMAIN_URL)
+            return self.wait_for_login_state() == "logged_in"
 
         except Exception as e:
-            print(f"檢查登入狀態時發生錯誤: {e}")
+            logger.warning("檢查登入狀態時發生錯誤: %s", e)
             return False
 
-    def parse_facebook_time(self, time_string):
-        """將Facebook各種時間格式轉換為統一格式 YYYY-MM-DD HH:MM"""
-        if not time_string or time_string == "未知時間":
-            return "未知時間"
+    def parse_facebook_time(self, time_string, now=None):
+        """將Facebook各種時間格式轉換為統一格式 YYYY-MM-DD HH:MM（使用快取的解析引擎）"""
+        return self.time_parser.parse(time_string, now)
 
-        try:
-            from datetime import datetime, timedelta
-            import re
-
-            current_time = datetime.now()
-            time_string = time_string.strip()
-
-            # 處理相對時間格式
-            # 匹配「X小時」、「X分鐘」等格式
-            relative_pattern = r'(\d+)\s*(小時|分鐘|秒)'
-            relative_match = re.search(relative_pattern, time_string)
-            if relative_match:
-                number = int(relative_match.group(1))
-                unit = relative_match.group(2)
-
-                if unit == "小時":
-                    target_time = current_time - timedelta(hours=number)
-                elif unit == "分鐘":
-                    target_time = current_time - timedelta(minutes=number)
-                elif unit == "秒":
-                    target_time = current_time - timedelta(seconds=number)
-
-                return target_time.strftime("%Y-%m-%d %H:%M")
-
-            # 處理「昨天」格式
-            if "昨天" in time_string:
-                # 提取時間部分，例如「昨天上午11:21」
-                time_pattern = r'(上午|下午)?(\d{1,2}):(\d{2})'
-                time_match = re.search(time_pattern, time_string)
-
-                yesterday = current_time - timedelta(days=1)
-
-                if time_match:
-                    period = time_match.group(1)  # 上午/下午
-                    hour = int(time_match.group(2))
-                    minute = int(time_match.group(3))
-
-                    # 處理12小時制
-                    if period == "下午" and hour != 12:
-                        hour += 12
-                    elif period == "上午" and hour == 12:
-                        hour = 0
-
-                    target_time = yesterday.replace(
-                        hour=hour, minute=minute, second=0, microsecond=0)
-                else:
-                    # 如果沒有具體時間，設為昨天同一時刻
-                    target_time = yesterday
-
-                return target_time.strftime("%Y-%m-%d %H:%M")
-
-            # 處理「X月X日」格式（當年）
-            month_day_pattern = r'(\d{1,2})月(\d{1,2})日(?:\s*(上午|下午)?(\d{1,2}):(\d{2}))?'
-            month_day_match = re.search(month_day_pattern, time_string)
-            if month_day_match:
-                month = int(month_day_match.group(1))
-                day = int(month_day_match.group(2))
-                period = month_day_match.group(3)  # 上午/下午
-                hour = int(month_day_match.group(
-                    4)) if month_day_match.group(4) else 0
-                minute = int(month_day_match.group(
-                    5)) if month_day_match.group(5) else 0
-
-                # 處理12小時制
-                if period == "下午" and hour != 12:
-                    hour += 12
-                elif period == "上午" and hour == 12:
-                    hour = 0
-
-                # 判斷年份（如果月份大於當前月份，可能是去年）
-                year = current_time.year
-                if month > current_time.month or (month == current_time.month and day > current_time.day):
-                    year = current_time.year - 1
-
-                target_time = datetime(year, month, day, hour, minute)
-                return target_time.strftime("%Y-%m-%d %H:%M")
-
-            # 處理「YYYY年X月X日」格式
-            full_date_pattern = r'(\d{4})年(\d{1,2})月(\d{1,2})日(?:\s*(上午|下午)?(\d{1,2}):(\d{2}))?'
-            full_date_match = re.search(full_date_pattern, time_string)
-            if full_date_match:
-                year = int(full_date_match.group(1))
-                month = int(full_date_match.group(2))
-                day = int(full_date_match.group(3))
-                period = full_date_match.group(4)  # 上午/下午
-                hour = int(full_date_match.group(
-                    5)) if full_date_match.group(5) else 0
-                minute = int(full_date_match.group(
-                    6)) if full_date_match.group(6) else 0
-
-                # 處理12小時制
-                if period == "下午" and hour != 12:
-                    hour += 12
-                elif period == "上午" and hour == 12:
-                    hour = 0
-
-                target_time = datetime(year, month, day, hour, minute)
-                return target_time.strftime("%Y-%m-%d %H:%M")
-
-            # 處理純時間格式「上午11:21」或「下午2:30」（當日）
-            time_only_pattern = r'(上午|下午)(\d{1,2}):(\d{2})'
-            time_only_match = re.search(time_only_pattern, time_string)
-            if time_only_match:
-                period = time_only_match.group(1)
-                hour = int(time_only_match.group(2))
-                minute = int(time_only_match.group(3))
-
-                # 處理12小時制
-                if period == "下午" and hour != 12:
-                    hour += 12
-                elif period == "上午" and hour == 12:
-                    hour = 0
-
-                target_time = current_time.replace(
-                    hour=hour, minute=minute, second=0, microsecond=0)
-                return target_time.strftime("%Y-%m-%d %H:%M")
-
-            # 如果都不匹配，返回原始字串
-            print(f"⚠️ 無法解析時間格式: {time_string}")
-            return time_string
-
-        except Exception as e:
-            print(f"解析時間時發生錯誤: {e}, 原始時間: {time_string}")
-            return time_string
+    def parse_facebook_times(self, time_strings, now=None):
+        """批次解析一整欄時間字串，整批使用同一個參考時間"""
+        return self.time_parser.parse_many(time_strings, now)
 
     def clean_date_string(self, date_text):
         """清理日期字串，移除多餘字符和分享對象資訊，然後統一格式"""
@@ -413,13 +606,14 @@ class FacebookPageScraper:
             return standardized_time
 
         except Exception as e:
-            print(f"清理日期字串時發生錯誤: {e}")
+            logger.warning("清理日期字串時發生錯誤: %s", e)
             return date_text if date_text else "未知時間"
 
+    @measure_phase("overlay")
     def close_overlay_dialogs(self):
         """關閉登入後可能出現的遮蔽彈窗"""
         try:
-            print("🔍 檢查是否有遮蔽彈窗需要關閉...")
+            logger.info("🔍 檢查是否有遮蔽彈窗需要關閉...")
 
             # 縮短等待時間，更快速檢查
             time.sleep(1.5)
@@ -450,7 +644,7 @@ class FacebookPageScraper:
 
                     for button in close_buttons:
                         if button.is_displayed() and button.is_enabled():
-                            print(f"✅ 發現並點擊關閉按鈕: {selector}")
+                            logger.debug("✅ 發現並點擊關閉按鈕: %s", selector)
                             ActionChains(self.driver)\
                                 .move_to_element(button)\
                                 .pause(0.3)\
@@ -474,7 +668,7 @@ class FacebookPageScraper:
                 ActionChains(self.driver).move_to_element(
                     body).click().perform()
                 time.sleep(0.5)
-                print("🖱️ 已點擊body元素，嘗試關閉彈窗")
+                logger.debug("🖱️ 已點擊body元素，嘗試關閉彈窗")
 
                 # 方法2：使用JavaScript點擊空白區域
                 self.driver.execute_script("""
@@ -496,7 +690,7 @@ class FacebookPageScraper:
                     });
                 """)
                 time.sleep(0.5)
-                print("🔧 已執行JavaScript彈窗關閉腳本")
+                logger.debug("🔧 已執行JavaScript彈窗關閉腳本")
 
                 # 方法3：ActionChains發送ESC鍵
                 for i in range(2):
@@ -507,10 +701,10 @@ class FacebookPageScraper:
                     except:
                         pass
 
-                print("⌨️ 已嘗試多種方式關閉彈窗")
+                logger.debug("⌨️ 已嘗試多種方式關閉彈窗")
 
             except Exception as e:
-                print(f"⚠️ 彈窗關閉操作失敗: {e}")
+                logger.warning("⚠️ 彈窗關閉操作失敗: %s", e)
                 pass
 
             # 快速檢查是否還有遮蔽層
@@ -528,42 +722,80 @@ class FacebookPageScraper:
                 """)
 
                 if overlay_count > 0:
-                    print(f"⚠️ 仍檢測到 {overlay_count} 個可能的遮蔽層")
+                    logger.warning("⚠️ 仍檢測到 %s 個可能的遮蔽層", overlay_count)
                 else:
-                    print("✅ 未檢測到明顯的遮蔽層")
+                    logger.info("✅ 未檢測到明顯的遮蔽層")
 
             except:
                 pass
 
             if closed_count > 0:
-                print(f"✅ 成功關閉了 {closed_count} 個彈窗")
+                logger.info("✅ 成功關閉了 %s 個彈窗", closed_count)
             else:
-                print("ℹ️ 未發現明顯彈窗，已執行預防性關閉操作")
+                logger.info("ℹ️ 未發現明顯彈窗，已執行預防性關閉操作")
 
-            print("✅ 彈窗檢查完成")
+            logger.info("✅ 彈窗檢查完成")
+            self.overlays_handled = True
 
         except Exception as e:
-            print(f"❌ 關閉遮蔽彈窗時發生錯誤: {e}")
+            logger.error("❌ 關閉遮蔽彈窗時發生錯誤: %s", e)
+
+    @measure_phase("overlay")
+    def quick_close_overlays(self):
+        """已處理過登入後彈窗的常駐瀏覽器：以單一 JavaScript 呼叫關閉彈窗，不做選擇器等待與固定延遲"""
+        try:
+            overlay_count = self.driver.execute_script(CLOSE_OVERLAY_SCRIPT)
+            if overlay_count:
+                logger.warning("⚠️ 仍檢測到 %s 個可能的遮蔽層", overlay_count)
+        except Exception as e:
+            logger.warning("⚠️ 彈窗關閉操作失敗: %s", e)
 
+    @measure_phase("navigate")
     def navigate_to_page(self, page_url):
         """前往指定的粉絲專頁"""
+        self.instrument_driver()
+        self.page_url = page_url
         try:
-            print(f"🌐 正在前往粉絲專頁: {page_url}")
+            logger.info("🌐 正在前往粉絲專頁: %s", page_url)
+            if self.extraction_engine == "network":
+                self.begin_network_capture()
             self.driver.get(page_url)
-            time.sleep(2)  # 縮短基本等待時間
-
-            # 立即檢查並關閉可能的彈窗（不等待太久）
-            print("🔧 立即檢查頁面彈窗...")
-            self.close_overlay_dialogs()
+            # 等待第一篇貼文出現，取代固定等待
+            wait_engine = self.get_wait_engine()
+            if not wait_engine.wait_for_selector(POST_CONTAINER_SELECTOR, timeout=10):
+                logger.warning("⚠️ 等待貼文載入逾時，繼續嘗試爬取")
+
+            # 立即檢查並關閉可能的彈窗；登入時已完整處理過彈窗的瀏覽器只需快速檢查
+            if self.overlays_handled:
+                self.quick_close_overlays()
+            else:
+                logger.info("🔧 立即檢查頁面彈窗...")
+                self.close_overlay_dialogs()
 
             # 再次確認頁面載入
-            time.sleep(1)
+            wait_engine.wait_for_network_idle(timeout=1.0)
 
             return True
         except Exception as e:
-            print(f"❌ 前往粉絲專頁失敗: {e}")
+            logger.error("❌ 前往粉絲專頁失敗: %s", e)
             return False
 
+    def get_scroll_metrics(self):
+        """取得 [文件總高度, 目前捲動位置, 視窗高度]，失敗時返回全部 None"""
+        try:
+            metrics = self.driver.execute_script(SCROLL_METRICS_SCRIPT)
+            if isinstance(metrics, (list, tuple)) and len(metrics) == 3:
+                return metrics
+        except Exception:
+            pass
+        return [None, None, None]
+
+    def get_wait_engine(self):
+        """取得目前瀏覽器的等待引擎（瀏覽器重新啟動時自動重建）"""
+        if self.wait_engine is None or self.wait_engine.driver is not self.driver:
+            self.wait_engine = WaitEngine(self.driver)
+        return self.wait_engine
+
     def slow_scroll(self, step=100):
         """非常緩慢滾動頁面以載入更多貼文"""
         self.driver.execute_script(f"window.scrollBy(0, {step});")
@@ -571,38 +803,37 @@ class FacebookPageScraper:
 
     def fast_scroll_with_realtime_extract(self, total_distance=1000, step=100, all_posts=None):
         """快速滾動並實時抓取貼文內容（適應Facebook的即時載入機制）"""
-        print(f"🔄 開始快速滾動 {total_distance}px（步長 {step}px），實時抓取貼文內容...")
+        logger.debug("🔄 開始快速滾動 %spx（步長 %spx），實時抓取貼文內容...", total_distance, step)
 
         total_clicked = 0
-        current_posts = all_posts if all_posts else []
+        current_posts = all_posts if all_posts is not None else []
+        wait_engine = self.get_wait_engine()
 
         steps = total_distance // step
         for i in range(steps):
             if self.stop_scraping:
                 break
 
-            # 滾動一步
-            self.driver.execute_script(f"window.scrollBy(0, {step});")
-            time.sleep(0.3)  # 快速等待載入
+            with self.metrics.phase("scroll"):
+                # 滾動一步
+                self.driver.execute_script(f"window.scrollBy(0, {step});")
+                # 等待新貼文出現或頁面穩定（有上限時間），取代固定等待
+                wait_engine.wait_for_scroll_settle()
 
             # 每步都點擊「查看更多」並實時抓取內容
-            new_clicks, current_posts = self.quick_click_see_more(
+            new_clicks, current_posts, extracted = self.expand_see_more(
                 current_posts)
             total_clicked += new_clicks
 
-            # 如果沒有點擊，也要每步抓取當前可見的貼文內容
-            if new_clicks == 0 and i % 1 == 0:  # 沒點擊時每步都抓取
+            # 展開時沒有重新擷取，就抓取當前可見的貼文內容（每步只擷取一次）
+            if not extracted:
                 fresh_posts = self.extract_posts_with_bs()
                 # 智慧合併，保留最完整的內容
                 current_posts = self.smart_merge_posts(
                     current_posts, fresh_posts)
 
-            # 短暫間隔，保持高效率
-            time.sleep(random.uniform(0.2, 0.4))
-
         if total_clicked > 0:
-            print(
-                f"✅ 本輪滾動總共處理了 {total_clicked} 個「查看更多」文字標籤，實時更新了 {len(current_posts)} 篇貼文")
+            logger.debug("✅ 本輪滾動總共處理了 %s 個「查看更多」文字標籤，實時更新了 %s 篇貼文", total_clicked, len(current_posts))
 
         return total_clicked, current_posts
 
@@ -611,8 +842,58 @@ class FacebookPageScraper:
         """向後兼容性方法，實際調用fast_scroll_with_realtime_extract"""
         return self.fast_scroll_with_realtime_extract(total_distance, step, all_posts)
 
+    def get_see_more_expander(self):
+        """取得目前瀏覽器的「查看更多」展開器（瀏覽器重新啟動時自動重建）"""
+        if self.see_more_expander is None or self.see_more_expander.driver is not self.driver:
+            self.see_more_expander = SeeMoreExpander(self.driver)
+        return self.see_more_expander
+
+    def expand_with_observer(self, current_posts=None):
+        """輪詢常駐展開器：有新點擊時等待展開後抓取更新內容
+
+        沒有新點擊時不等待也不擷取：先前點擊後才展開完成的貼文由呼叫端下一次擷取取得，
+        仍待重試的按鈕（最多 retry_ms × max_attempts）不會讓每一步都等待並重複擷取。
+        :return: (新點擊數, 貼文, 是否已重新擷取)；展開器無法使用時返回 None，由呼叫端改用逐次掃描
+        """
+        with self.metrics.phase("click"):
+            try:
+                new_clicks, _ = self.get_see_more_expander().take_new_clicks()
+            except Exception as e:
+                logger.warning("⚠️ 常駐展開器無法使用，改用逐次掃描: %s", e)
+                return None
+
+            if new_clicks == 0:
+                return 0, current_posts if current_posts is not None else [], False
+
+            self.get_wait_engine().wait_for_expansion()
+        fresh_posts = self.extract_posts_with_bs()
+        if current_posts is not None:
+            return new_clicks, self.smart_merge_posts(current_posts, fresh_posts), True
+        return new_clicks, fresh_posts, True
+
     def quick_click_see_more(self, current_posts=None):
         """快速點擊「查看更多」按鈕並抓取更新內容"""
+        clicks, posts, _ = self.expand_see_more(current_posts)
+        return clicks, posts
+
+    def expand_see_more(self, current_posts=None):
+        """快速點擊「查看更多」，有點擊時等待展開並抓取更新內容
+
+        :return: (點擊數, 貼文, 是否已重新擷取並合併)；未重新擷取時呼叫端需要自行擷取才能取得最新內容
+        """
+        if self.extraction_engine == "network":
+            # 網路回應已包含完整內文，不需展開
+            return 0, current_posts if current_posts is not None else [], False
+
+        if not self.sync_window_expansion():
+            # 目前位置的貼文不在時間範圍內，不需要完整內容
+            return 0, current_posts if current_posts is not None else [], False
+
+        if self.use_see_more_expander:
+            result = self.expand_with_observer(current_posts)
+            if result is not None:
+                return result
+
         try:
             script = """
             var clicked = 0;
@@ -629,6 +910,7 @@ class FacebookPageScraper:
                                       rect.top >= 0 && rect.bottom <= window.innerHeight;
                         
                         if(isVisible) {
+                            element.setAttribute('data-fps-clicked', '1');
                             element.click();
                             clicked++;
                         }
@@ -638,30 +920,38 @@ class FacebookPageScraper:
             return clicked;
             """
 
-            clicked_count = self.driver.execute_script(script)
+            with self.metrics.phase("click"):
+                clicked_count = self.driver.execute_script(script)
 
-            # 如果有點擊，等待0.5秒後抓取更新內容
+            # 如果有點擊，等待內容展開後抓取更新內容
             if clicked_count > 0:
-                time.sleep(0.5)
+                with self.metrics.phase("click"):
+                    self.get_wait_engine().wait_for_expansion()
                 fresh_posts = self.extract_posts_with_bs()
                 if current_posts is not None:
                     # 智慧合併以獲得最新的完整內容
                     updated_posts = self.smart_merge_posts(
                         current_posts, fresh_posts)
-                    return clicked_count, updated_posts
+                    return clicked_count, updated_posts, True
                 else:
-                    return clicked_count, fresh_posts
+                    return clicked_count, fresh_posts, True
 
-            return clicked_count, current_posts if current_posts is not None else []
+            return clicked_count, current_posts if current_posts is not None else [], False
 
         except Exception as e:
-            return 0, current_posts if current_posts is not None else []
+            return 0, current_posts if current_posts is not None else [], False
 
     def smart_click_see_more_buttons(self, all_posts=None):
         """簡化版：直接點擊所有可見的「查看更多」文字標籤，並立即抓取更新內容"""
+        if self.use_see_more_expander:
+            # 展開器持續點擊並追蹤展開狀態，不需要多輪驗證
+            result = self.expand_with_observer(all_posts)
+            if result is not None:
+                return result[:2]
+
         try:
             clicked_count = 0
-            updated_posts = all_posts if all_posts else []
+            updated_posts = all_posts if all_posts is not None else []
 
             # 最簡化的JavaScript：找到「查看更多」就直接點擊
             script = """
@@ -682,7 +972,8 @@ class FacebookPageScraper:
                         var isVisible = rect.width > 0 && rect.height > 0;
                         
                         if(isVisible) {
-                            // 直接點擊
+                            // 直接點擊（標記以便等待引擎確認是否已展開）
+                            element.setAttribute('data-fps-clicked', '1');
                             element.click();
                             console.log('成功點擊查看更多:', text);
                             clicked++;
@@ -697,39 +988,37 @@ class FacebookPageScraper:
             """
 
             # 執行JavaScript腳本
-            clicked_count = self.driver.execute_script(script)
+            with self.metrics.phase("click"):
+                clicked_count = self.driver.execute_script(script)
 
             if clicked_count > 0:
-                print(f"✅ 點擊了 {clicked_count} 個「查看更多」文字標籤")
+                logger.debug("✅ 點擊了 %s 個「查看更多」文字標籤", clicked_count)
 
                 # 等待更長時間並進行多次驗證
-                print("⏳ 等待內容完全展開並驗證...")
+                logger.debug("⏳ 等待內容完全展開並驗證...")
 
-                # 進行多輪等待和驗證
+                # 進行多輪等待和驗證（增量擷取時每輪只回傳有變動的貼文，因此逐輪累積合併）
                 best_posts = None
                 for attempt in range(3):  # 最多3次驗證
-                    time.sleep(1.5)  # 每次等待1.5秒
+                    # 等待被點擊的貼文展開（最多1.5秒），全部展開就立即返回
+                    with self.metrics.phase("click"):
+                        self.get_wait_engine().wait_for_expansion(timeout=1.5)
 
                     current_posts = self.extract_posts_with_bs()
+                    best_posts = current_posts if best_posts is None else self.smart_merge_posts(
+                        best_posts, current_posts)
 
-                    # 計算當前這批內容中有多少仍包含「查看更多」
-                    truncated_count = sum(1 for post in current_posts
+                    # 計算目前累積內容中有多少仍包含「查看更多」
+                    truncated_count = sum(1 for post in best_posts
                                           if '查看更多' in post.get('post_text', '') or
                                           'See More' in post.get('post_text', '') or
                                           'See more' in post.get('post_text', ''))
 
-                    print(
-                        f"🔍 第 {attempt + 1} 次驗證：{len(current_posts)} 篇貼文，{truncated_count} 篇仍截斷")
-
-                    # 如果這次的結果更好（截斷內容更少），就保存
-                    if best_posts is None or truncated_count < sum(1 for post in best_posts
-                                                                   if '查看更多' in post.get('post_text', '') or
-                                                                   'See More' in post.get('post_text', '') or
-                                                                   'See more' in post.get('post_text', '')):
-                        best_posts = current_posts
-                        if truncated_count == 0:
-                            print(f"✅ 第 {attempt + 1} 次驗證：所有內容已完全展開！")
-                            break
+                    logger.debug("🔍 第 %s 次驗證：%s 篇貼文，%s 篇仍截斷", attempt + 1, len(best_posts), truncated_count)
+
+                    if truncated_count == 0:
+                        logger.debug("✅ 第 %s 次驗證：所有內容已完全展開！", attempt + 1)
+                        break
 
                 new_posts = best_posts if best_posts else self.extract_posts_with_bs()
 
@@ -737,14 +1026,14 @@ class FacebookPageScraper:
                 if all_posts is not None:
                     updated_posts = self.smart_merge_posts(
                         all_posts, new_posts)
-                    print(f"📊 合併完成：{len(updated_posts)} 篇貼文")
+                    logger.debug("📊 合併完成：%s 篇貼文", len(updated_posts))
                 else:
                     updated_posts = new_posts
 
             return clicked_count, updated_posts
 
         except Exception as e:
-            print(f"❌ 點擊「查看更多」文字標籤時發生錯誤: {e}")
+            logger.error("❌ 點擊「查看更多」文字標籤時發生錯誤: %s", e)
             return 0, updated_posts
 
     def click_see_more_buttons(self):
@@ -752,114 +1041,340 @@ class FacebookPageScraper:
         clicks, _ = self.smart_click_see_more_buttons()
         return clicks
 
-    def extract_posts_with_bs(self):
-        """使用BeautifulSoup擷取貼文資料"""
+    def extract_posts_with_bs(self, incremental=None):
+        """使用BeautifulSoup擷取貼文資料
+        :param incremental: 是否只擷取新出現或內容有變動的貼文容器，None表示使用 self.incremental_extraction
+        """
+        if incremental is None:
+            incremental = self.incremental_extraction
+
+        if self.extraction_engine == "network":
+            posts_data = self.extract_posts_from_network(incremental)
+            if posts_data is not None:
+                return posts_data
+            # 無法讀取網路記錄時退回 BeautifulSoup
+
+        if self.extraction_engine == "js":
+            posts_data = self.extract_posts_in_browser(incremental)
+            if posts_data is not None:
+                return posts_data
+            # 瀏覽器端擷取失敗時退回 BeautifulSoup
+
         try:
             # 注意：「查看更多」按鈕的點擊現在在滾動過程中進行，這裡不再重複執行
-            page_source = self.driver.page_source
-            soup = BeautifulSoup(page_source, "html.parser")
+            if incremental:
+                posts = self.fetch_changed_post_containers()
+                if posts is None:
+                    # 瀏覽器端腳本失敗時退回完整擷取
+                    return self.extract_posts_with_bs(incremental=False)
+            else:
+                with self.metrics.phase("page_source"):
+                    page_source = self.driver.page_source
+
+                # 尋找貼文容器
+                with self.metrics.phase("parse"):
+                    posts = self.parse_post_containers(page_source)
+
             posts_data = []
+            with self.metrics.phase("parse"):
+                for post in posts:
+                    if self.stop_scraping:
+                        break
+
+                    post_data = self.extract_single_post(post)
+                    if post_data:
+                        posts_data.append(post_data)
+
+            return posts_data
 
-            # 尋找貼文容器
-            posts = soup.find_all("div", {"class": "x1n2onr6 x1ja2u2z"})
+        except Exception as e:
+            logger.warning("擷取貼文資料時發生錯誤: %s", e)
+            return []
+
+    def extract_posts_in_browser(self, incremental=None):
+        """在瀏覽器內擷取貼文欄位，只傳回精簡 JSON，欄位與 extract_posts_with_bs 相同
+        :return: 貼文字典列表，腳本執行失敗時返回 None
+        """
+        if incremental is None:
+            incremental = self.incremental_extraction
 
-            for post in posts:
+        plan = self.get_extraction_plan()
+        try:
+            with self.metrics.phase("browser_extract"):
+                records = self.driver.execute_script(
+                    IN_BROWSER_EXTRACT_SCRIPT, bool(incremental), list(plan.fields))
+        except Exception as e:
+            logger.warning("瀏覽器端擷取失敗，改用BeautifulSoup: %s", e)
+            return None
+
+        if records is None:
+            return None
+
+        posts_data = []
+        with self.metrics.phase("parse"):
+            for record in records:
                 if self.stop_scraping:
                     break
-
                 try:
-                    # 擷取貼文文字內容
-                    message_elements = post.find_all(
-                        "div", {"data-ad-preview": "message"})
-                    post_text = " ".join([msg.get_text(strip=True)
-                                         for msg in message_elements])
-
-                    # 擷取按讚數
-                    likes_element = post.select_one(
-                        "span.xt0b8zv.x1jx94hy.xrbpyxo.xl423tq > span > span")
-                    likes = likes_element.get_text(
-                        strip=True) if likes_element else "0"
-
-                    # 擷取留言數
-                    comments_element = post.select(
-                        "div > div > span > div > div > div > span > span.html-span")
-                    comments = comments_element[0].text if comments_element else "0"
-
-                    # 擷取分享數
-                    shares_element = post.select(
-                        "div > div > span > div > div > div > span > span.html-span")
-                    shares = shares_element[1].text if len(
-                        shares_element) > 1 else "0"
-
-                    # 擷取貼文時間 - 使用 dir="ltr" 標籤，第二個元素是時間
-                    post_time = "未知時間"
-                    try:
-                        # 找到所有 dir="ltr" 的元素
-                        ltr_elements = post.find_all(attrs={"dir": "ltr"})
-                        if len(ltr_elements) >= 2:
-                            # 第二個 dir="ltr" 元素通常是時間
-                            time_element = ltr_elements[1]
-                            candidate_time = time_element.get_text(strip=True)
-                            # 驗證是否為合理的時間格式
-                            if candidate_time and len(candidate_time) < 100:
-                                post_time = self.clean_date_string(
-                                    candidate_time)
-
-                        # 如果通過 dir="ltr" 沒找到合適的時間，使用備用方案
-                        if post_time == "未知時間":
-                            time_selectors = [
-                                "a[role='link'] span[dir='ltr']",
-                                "div.xu06os2.x1ok221b > span > div > span > span > a > span",
-                                "span[dir='ltr']",
-                                "time",
-                                "[data-testid='story-subtitle'] span"
-                            ]
-
-                            for selector in time_selectors:
-                                try:
-                                    time_elem = post.select_one(selector)
-                                    if time_elem:
-                                        candidate_time = time_elem.get_text(
-                                            strip=True)
-                                        # 檢查是否像時間格式（包含數字且不太長）
-                                        if candidate_time and len(candidate_time) < 50 and any(char.isdigit() for char in candidate_time):
-                                            post_time = self.clean_date_string(
-                                                candidate_time)
-                                            break
-                                except:
-                                    continue
-                    except Exception as e:
-                        print(f"擷取時間時發生錯誤: {e}")
-                        post_time = "未知時間"
-
-                    # 擷取貼文連結
-                    link_element = post.select_one(
-                        "div.xu06os2.x1ok221b > span > div > span > span > a")
-                    post_url = link_element.get('href') if link_element else ""
-                    if post_url and not post_url.startswith('http'):
-                        post_url = "https://www.facebook.com" + post_url
-
-                    # 只加入有內容的貼文
-                    if post_text.strip() or likes != "0" or comments != "0":
-                        posts_data.append({
-                            "post_text": post_text,
-                            "likes": likes,
-                            "comments": comments,
-                            "shares": shares,
-                            "post_time": post_time,
-                            "post_url": post_url,
-                            "scraped_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        })
-
+                    post_data = plan.from_browser_record(record)
                 except Exception as e:
-                    print(f"擷取單一貼文時發生錯誤: {e}")
+                    logger.warning("轉換瀏覽器擷取資料時發生錯誤: %s", e)
                     continue
+                if post_data:
+                    posts_data.append(post_data)
+        return posts_data
+
+    def get_network_capture(self):
+        """取得目前瀏覽器的網路回應擷取器（瀏覽器重新啟動時自動重建）"""
+        if self.network_capture is None or self.network_capture.driver is not self.driver:
+            if self.network_capture is not None:
+                self.network_capture.close()
+            self.network_capture = NetworkFeedCapture(
+                self.driver, fixture_path=self.network_fixture_path, metrics=self.metrics)
+            self.network_capture.enable()
+        return self.network_capture
+
+    def begin_network_capture(self, discard_pending=True):
+        """開始擷取新粉絲專頁的網路回應：捨棄之前的網路事件（例如登入頁面）並清除解碼結果
+
+        瀏覽器未以效能記錄啟動等無法讀取網路記錄的情況，改用 bs 引擎並返回 False。
+        """
+        try:
+            capture = self.get_network_capture()
+            if discard_pending:
+                capture.reset()
+        except Exception as e:
+            logger.warning("⚠️ 無法讀取瀏覽器的網路記錄，改用BeautifulSoup擷取: %s", e)
+            self.extraction_engine = "bs"
+            return False
+        self.network_decoder = FeedResponseDecoder(self.get_extraction_plan().fields)
+        return True
 
-            return posts_data
+    def extract_posts_from_network(self, incremental=None):
+        """從動態消息的網路回應解出貼文（完整內文、精確時間、互動數與永久連結）
 
+        :param incremental: True 時只返回這次新出現或有更新的貼文，False 時返回目前粉絲專頁的所有貼文
+        :return: 貼文字典列表，無法讀取網路記錄時返回 None（之後改用 bs 引擎）
+        """
+        if incremental is None:
+            incremental = self.incremental_extraction
+        if self.network_decoder is None and not self.begin_network_capture(discard_pending=False):
+            return None
+
+        try:
+            with self.metrics.phase("network_capture"):
+                responses = self.get_network_capture().poll()
         except Exception as e:
-            print(f"擷取貼文資料時發生錯誤: {e}")
-            return []
+            logger.warning("⚠️ 讀取網路記錄失敗，改用BeautifulSoup擷取: %s", e)
+            self.extraction_engine = "bs"
+            return None
+
+        with self.metrics.phase("parse"):
+            posts_data = self.network_decoder.decode(responses)
+            if not incremental:
+                posts_data = self.network_decoder.all_posts()
+        return posts_data
+
+    def cross_check_extraction(self):
+        """同時以瀏覽器端與BeautifulSoup擷取目前頁面，比對兩者結果
+        :return: 不一致的項目列表 [(索引, 瀏覽器端結果, BeautifulSoup結果)]
+        """
+        browser_posts = self.extract_posts_in_browser(incremental=False) or []
+
+        engine = self.extraction_engine
+        self.extraction_engine = "bs"
+        try:
+            bs_posts = self.extract_posts_with_bs(incremental=False)
+        finally:
+            self.extraction_engine = engine
+
+        def comparable(post):
+            return {k: v for k, v in post.items() if k != "scraped_at"}
+
+        mismatches = []
+        for index in range(max(len(browser_posts), len(bs_posts))):
+            browser_post = comparable(browser_posts[index]) if index < len(browser_posts) else None
+            bs_post = comparable(bs_posts[index]) if index < len(bs_posts) else None
+            if browser_post != bs_post:
+                mismatches.append((index, browser_post, bs_post))
+
+        if mismatches:
+            logger.warning("⚠️ 擷取交叉比對：%s 篇結果不一致（瀏覽器端 %s 篇，BeautifulSoup %s 篇）",
+                           len(mismatches), len(browser_posts), len(bs_posts))
+        else:
+            logger.info("✅ 擷取交叉比對：%s 篇結果一致", len(bs_posts))
+        return mismatches
+
+    def fetch_changed_post_containers(self):
+        """只取回瀏覽器中新出現或內容有變動的貼文容器（增量擷取）
+
+        已處理過的容器會在瀏覽器端以 data-fps-sig 標記其文字長度，
+        之後只有新容器或文字長度改變（例如點擊「查看更多」展開）的容器才會被傳回解析，
+        因此每次擷取的成本與已滾動的深度無關。
+        :return: BeautifulSoup 容器元素列表，腳本執行失敗時返回 None
+        """
+        try:
+            with self.metrics.phase("page_source"):
+                fragments = self.driver.execute_script(INCREMENTAL_EXTRACT_SCRIPT)
+        except Exception as e:
+            logger.warning("增量擷取腳本執行失敗，改用完整擷取: %s", e)
+            return None
+
+        if fragments is None:
+            return None
+
+        containers = []
+        with self.metrics.phase("parse"):
+            for fragment in fragments:
+                # 每個片段單獨解析，只取根容器，避免巢狀容器被重複擷取
+                parsed = self.parse_post_containers(fragment)
+                if parsed:
+                    containers.append(parsed[0])
+        return containers
+
+    def make_soup(self, html, parse_only=None):
+        """依 self.parser_engine 建立 BeautifulSoup 物件，lxml 不可用時退回 html.parser"""
+        engine = self.parser_engine
+        if engine not in PARSER_ENGINES:
+            logger.warning("⚠️ 未知的解析引擎 %s，改用 html.parser", engine)
+            engine = self.parser_engine = "html.parser"
+
+        if engine == "html.parser":
+            return BeautifulSoup(html, "html.parser", parse_only=parse_only)
+
+        try:
+            return BeautifulSoup(html, "lxml", parse_only=parse_only)
+        except FeatureNotFound:
+            logger.warning("⚠️ 未安裝lxml，改用 html.parser 解析")
+            self.parser_engine = "html.parser"
+            return BeautifulSoup(html, "html.parser", parse_only=parse_only)
+
+    def parse_post_containers(self, html):
+        """解析HTML並返回所有貼文容器（文件順序）"""
+        parse_only = None
+        if self.parser_engine == "strainer":
+            # 只建立貼文容器的子樹，其餘大量的頁面結構直接略過
+            parse_only = SoupStrainer("div", attrs=POST_CONTAINER_ATTRS)
+
+        soup = self.make_soup(html, parse_only=parse_only)
+        return soup.find_all("div", POST_CONTAINER_ATTRS)
+
+    def reset_incremental_tags(self):
+        """清除瀏覽器中的增量擷取標記，下次擷取會重新處理所有貼文容器"""
+        try:
+            self.driver.execute_script(RESET_INCREMENTAL_TAGS_SCRIPT)
+            return True
+        except Exception as e:
+            logger.warning("清除增量擷取標記失敗: %s", e)
+            return False
+
+    def extract_single_post(self, post):
+        """使用預先編譯的擷取計畫，單次走訪貼文子樹擷取欄位，無內容時返回 None"""
+        try:
+            return self.get_extraction_plan().extract(post)
+        except Exception as e:
+            logger.warning("擷取單一貼文時發生錯誤: %s", e)
+            return None
+
+    def get_extraction_plan(self):
+        """取得（必要時重建）符合 self.extraction_fields 的擷取計畫"""
+        fields = tuple(self.extraction_fields) if self.extraction_fields else None
+        if self._extraction_plan is None or self._extraction_plan_fields != fields:
+            self._extraction_plan = PostExtractionPlan(
+                fields, clean_date=self.clean_date_string)
+            self._extraction_plan_fields = fields
+        return self._extraction_plan
+
+    def extract_single_post_with_selectors(self, post):
+        """以逐欄位的 CSS 選擇器擷取單一貼文（原始做法，保留作為對照與效能基準）"""
+        try:
+            # 擷取貼文文字內容
+            message_elements = post.find_all(
+                "div", {"data-ad-preview": "message"})
+            post_text = " ".join([msg.get_text(strip=True)
+                                 for msg in message_elements])
+
+            # 擷取按讚數
+            likes_element = post.select_one(
+                "span.xt0b8zv.x1jx94hy.xrbpyxo.xl423tq > span > span")
+            likes = likes_element.get_text(
+                strip=True) if likes_element else "0"
+
+            # 擷取留言數
+            comments_element = post.select(
+                "div > div > span > div > div > div > span > span.html-span")
+            comments = comments_element[0].text if comments_element else "0"
+
+            # 擷取分享數
+            shares_element = post.select(
+                "div > div > span > div > div > div > span > span.html-span")
+            shares = shares_element[1].text if len(
+                shares_element) > 1 else "0"
+
+            # 擷取貼文時間 - 使用 dir="ltr" 標籤，第二個元素是時間
+            post_time = "未知時間"
+            try:
+                # 找到所有 dir="ltr" 的元素
+                ltr_elements = post.find_all(attrs={"dir": "ltr"})
+                if len(ltr_elements) >= 2:
+                    # 第二個 dir="ltr" 元素通常是時間
+                    time_element = ltr_elements[1]
+                    candidate_time = time_element.get_text(strip=True)
+                    # 驗證是否為合理的時間格式
+                    if candidate_time and len(candidate_time) < 100:
+                        post_time = self.clean_date_string(
+                            candidate_time)
+
+                # 如果通過 dir="ltr" 沒找到合適的時間，使用備用方案
+                if post_time == "未知時間":
+                    time_selectors = [
+                        "a[role='link'] span[dir='ltr']",
+                        "div.xu06os2.x1ok221b > span > div > span > span > a > span",
+                        "span[dir='ltr']",
+                        "time",
+                        "[data-testid='story-subtitle'] span"
+                    ]
+
+                    for selector in time_selectors:
+                        try:
+                            time_elem = post.select_one(selector)
+                            if time_elem:
+                                candidate_time = time_elem.get_text(
+                                    strip=True)
+                                # 檢查是否像時間格式（包含數字且不太長）
+                                if candidate_time and len(candidate_time) < 50 and any(char.isdigit() for char in candidate_time):
+                                    post_time = self.clean_date_string(
+                                        candidate_time)
+                                    break
+                        except:
+                            continue
+            except Exception as e:
+                logger.warning("擷取時間時發生錯誤: %s", e)
+                post_time = "未知時間"
+
+            # 擷取貼文連結
+            link_element = post.select_one(
+                "div.xu06os2.x1ok221b > span > div > span > span > a")
+            post_url = link_element.get('href') if link_element else ""
+            if post_url and not post_url.startswith('http'):
+                post_url = "https://www.facebook.com" + post_url
+
+            # 只加入有內容的貼文
+            if post_text.strip() or likes != "0" or comments != "0":
+                return {
+                    "post_text": post_text,
+                    "likes": likes,
+                    "comments": comments,
+                    "shares": shares,
+                    "post_time": post_time,
+                    "post_url": post_url,
+                    "scraped_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                }
+            return None
+
+        except Exception as e:
+            logger.warning("擷取單一貼文時發生錯誤: %s", e)
+            return None
 
     def remove_duplicates(self, data_list):
         """移除重複的貼文 - 使用改進的識別方式"""
@@ -902,18 +1417,37 @@ class FacebookPageScraper:
                 seen.add(identifier)
                 unique_data.append(data)
 
-        print(f"🧹 去重完成：從 {len(data_list)} 篇減少到 {len(unique_data)} 篇獨特貼文")
+        logger.debug("🧹 去重完成：從 %s 篇減少到 %s 篇獨特貼文", len(data_list), len(unique_data))
         return unique_data
 
+    @measure_phase("merge")
     def smart_merge_posts(self, old_posts, new_posts):
-        """智慧合併貼文：如果舊貼文包含「查看更多」，用新內容替換"""
+        """智慧合併貼文：如果舊貼文包含「查看更多」，用新內容替換
+
+        old_posts 為 PostStore 時直接在索引中更新（O(新貼文數)）並返回同一個 PostStore；
+        為列表時使用原本的列表合併方式。
+        """
+        if isinstance(old_posts, PostStore):
+            if new_posts:
+                # 網路引擎的貼文內文來自回應 JSON，一定是完整的（改用 bs 引擎時 extraction_engine 已切換）
+                _, replaced_count = old_posts.merge(new_posts, complete=self.extraction_engine == "network")
+                if replaced_count > 0:
+                    logger.debug("🔄 成功替換了 %s 個截斷貼文為完整內容", replaced_count)
+                if self.known_tracker is not None:
+                    # 上次已輸出的貼文標記為已保存，自動保存與最終結果都不會再輸出
+                    old_posts.mark_saved(self.known_tracker.observe(new_posts))
+                if self.post_window is not None:
+                    # 時間範圍外的貼文同樣標記為已保存，不寫入自動保存的檔案
+                    old_posts.mark_saved(self.post_window.observe(new_posts))
+            return old_posts
+
         if not old_posts:
             return self.remove_duplicates(new_posts)
 
         if not new_posts:
             return old_posts
 
-        print(f"🔄 智慧合併貼文：舊 {len(old_posts)} 篇 + 新 {len(new_posts)} 篇")
+        logger.debug("🔄 智慧合併貼文：舊 %s 篇 + 新 %s 篇", len(old_posts), len(new_posts))
 
         # 建立新貼文的快速查找字典（使用改進的識別方式）
         new_posts_dict = {}
@@ -980,12 +1514,12 @@ class FacebookPageScraper:
 
                 # 如果新文章包含「查看更多」，保留舊內容不進行更新
                 if new_has_see_more:
-                    print(f"⚠️ 新文章仍包含「查看更多」，保留舊內容不更新")
+                    logger.debug("⚠️ 新文章仍包含「查看更多」，保留舊內容不更新")
                     merged_posts.append(old_post)
                     # 從新貼文字典中移除，避免重複添加
                     del new_posts_dict[old_combined_key]
                 elif len(new_text) > len(old_text):
-                    print(f"✅ 替換截斷內容：{len(old_text)} → {len(new_text)} 字符")
+                    logger.debug("✅ 替換截斷內容：%s → %s 字符", len(old_text), len(new_text))
                     merged_posts.append(new_post)
                     replaced_count += 1
                     # 從新貼文字典中移除，避免重複添加
@@ -1008,184 +1542,235 @@ class FacebookPageScraper:
         final_posts = self.remove_duplicates(merged_posts)
 
         if replaced_count > 0:
-            print(f"🔄 成功替換了 {replaced_count} 個截斷貼文為完整內容")
+            logger.debug("🔄 成功替換了 %s 個截斷貼文為完整內容", replaced_count)
 
         return final_posts
 
-    def scrape_posts(self, max_posts, progress_callback=None):
-        """爬取指定數量的貼文，使用智慧滾動策略確保所有「查看更多」都被點擊"""
-        all_posts = []
-        scroll_attempts = 0
-        max_scroll_attempts = 50  # 最大滾動次數
-        batch_number = 1
-        last_save_count = 0
-        total_see_more_clicks = 0  # 統計總點擊數量
-
-        print(
-            f"🚀 開始高效爬取貼文，目標: {max_posts} 篇（每 {self.auto_save_interval} 篇自動保存）")
-        print("⚡ 採用快速滾動策略，實時抓取並展開貼文內容")
-
-        # 初始加載並抓取
-        print("🔍 初始加載：抓取當前頁面貼文...")
-        all_posts = self.extract_posts_with_bs()
-        initial_clicks, all_posts = self.quick_click_see_more(all_posts)
-        total_see_more_clicks += initial_clicks
-        if initial_clicks > 0:
-            print(f"✅ 初始加載點擊了 {initial_clicks} 個「查看更多」，已更新內容")
-
-        while scroll_attempts < max_scroll_attempts and not self.stop_scraping:
-            # 計算當前完整貼文數量（不包含「查看更多」的貼文）
-            complete_posts = [
-                post for post in all_posts
-                if not ('查看更多' in post.get('post_text', '') or
-                        'See More' in post.get('post_text', '') or
-                        'See more' in post.get('post_text', ''))
-            ]
+    def scrape_posts(self, max_posts, progress_callback=None, since=None, until=None):
+        """爬取指定數量的貼文，使用智慧滾動策略確保所有「查看更多」都被點擊
 
-            # 如果已經獲得足夠的完整貼文，就停止
-            if len(complete_posts) >= max_posts:
-                print(f"🎯 已獲得 {len(complete_posts)} 篇完整貼文，達到目標！")
-                break
-            # 使用高效滾動策略：快速滾動並實時抓取更新內容
-            scroll_distance = 600 + random.randint(-100, 100)  # 減少滾動距離提高效率
-            step_size = 120 + random.randint(-30, 30)  # 增加步長提高效率
-
-            clicks_in_scroll, all_posts = self.fast_scroll_with_realtime_extract(
-                total_distance=scroll_distance,
-                step=step_size,
-                all_posts=all_posts
-            )
-            total_see_more_clicks += clicks_in_scroll
-
-            # 計算完整貼文數量
-            complete_posts_for_display = [
-                post for post in all_posts
-                if not ('查看更多' in post.get('post_text', '') or
-                        'See More' in post.get('post_text', '') or
-                        'See more' in post.get('post_text', ''))
-            ]
-
-            current_count = len(all_posts)
-            complete_count = len(complete_posts_for_display)
-            print(f"📊 已擷取 {current_count} 篇貼文（其中 {complete_count} 篇完整）...")
-
-            # 檢查是否需要自動保存（基於完整貼文數量）
-            if complete_count - last_save_count >= self.auto_save_interval:
-                # 取得新增的完整貼文
-                new_complete_posts = complete_posts_for_display[last_save_count:]
-                if new_complete_posts:
-                    saved_file = self.save_partial_results(
-                        new_complete_posts, batch_number)
-                    if saved_file:
-                        print(
-                            f"💾 自動保存完成：第 {batch_number} 批次，{len(new_complete_posts)} 篇完整貼文")
-                        batch_number += 1
-                        last_save_count = complete_count
-
-            # 更新進度（基於完整貼文數量）
-            if progress_callback:
-                progress = min(100, (complete_count / max_posts) * 100)
-                progress_callback(progress, complete_count)
-
-            scroll_attempts += 1
-
-            # 每10次滾動後短暫檢查
-            if scroll_attempts % 10 == 0:
-                print("🔄 快速檢查遺漏的「查看更多」...")
-                extra_clicks, all_posts = self.quick_click_see_more(all_posts)
-                total_see_more_clicks += extra_clicks
-                if extra_clicks > 0:
-                    print(f"✅ 快速檢查額外找到 {extra_clicks} 個文字標籤，已更新內容")
-
-                print(f"⏸️ 短暫暫停... (已滾動 {scroll_attempts} 次)")
-                time.sleep(random.uniform(1, 2))  # 大幅縮短暫停時間
-
-        # 最終清理：快速檢查遺漏的「查看更多」
-        print("🧹 最終清理：快速檢查遺漏的「查看更多」...")
-        final_clicks, all_posts = self.quick_click_see_more(all_posts)
-        total_see_more_clicks += final_clicks
-        if final_clicks > 0:
-            print(f"✅ 最終清理找到 {final_clicks} 個遺漏的文字標籤，已更新內容")
-
-        # 保存剩餘的完整貼文
-        final_complete_posts = [
-            post for post in all_posts
-            if not ('查看更多' in post.get('post_text', '') or
-                    'See More' in post.get('post_text', '') or
-                    'See more' in post.get('post_text', ''))
-        ]
-
-        if len(final_complete_posts) > last_save_count:
-            remaining_posts = final_complete_posts[last_save_count:]
-            if remaining_posts:
-                saved_file = self.save_partial_results(
-                    remaining_posts, batch_number)
-                if saved_file:
-                    print(f"✅ 最終批次保存完成：{len(remaining_posts)} 篇完整貼文")
-
-        # 總共點擊的「查看更多」文字標籤統計
-        print(f"📈 高效完成：共處理了 {total_see_more_clicks} 個「查看更多」文字標籤，實時抓取了內容")
-
-        # 最終選取完整貼文
-        print("🧹 最終選取：提取完整的貼文...")
-        complete_posts = [
-            post for post in all_posts
-            if not ('查看更多' in post.get('post_text', '') or
-                    'See More' in post.get('post_text', '') or
-                    'See more' in post.get('post_text', ''))
-        ]
-
-        # 取得指定數量的完整貼文
-        final_posts = complete_posts[:max_posts]
-        filtered_out_count = len(all_posts) - len(complete_posts)
-
-        if filtered_out_count > 0:
-            print(f"📝 從 {len(all_posts)} 篇貼文中過濾掉 {filtered_out_count} 篇截斷貼文")
-            print(f"📊 最終選取 {len(final_posts)} 篇完整貼文")
-        else:
-            print(f"✅ 所有 {len(final_posts)} 篇貼文都是完整內容")
-
-        self.scraped_posts = final_posts
+        流程見 facebook_scrape_steps.scrape_steps，瀏覽器指令由 execute_scrape_step 以 Selenium 執行。
+        :param since: 只爬取此時間之後的貼文，None 表示使用 self.post_since；捲動超過此時間即停止
+        :param until: 只爬取此時間之前的貼文，None 表示使用 self.post_until
+        """
+        self.instrument_driver()
+        run_steps(scrape_steps(self, max_posts, progress_callback, since, until), self.execute_scrape_step)
+
+        expander = self.see_more_expander
+        if self.use_see_more_expander and expander is not None and expander.last_stats:
+            stats = expander.last_stats
+            logger.info("🔽 展開器：點擊 %s 次，已展開 %s，待展開 %s，失敗 %s，掃描容器 %s 次",
+                        stats['clicked'], stats['expanded'], stats['pending'], stats['failed'], stats['scanned'])
+        for kind, entry in self.get_wait_engine().summary().items():
+            logger.info("⏱️ 等待[%s]：%s 次，共 %s 秒，逾時 %s 次", kind, entry['count'], entry['seconds'], entry['timeouts'])
+        self.resource_stats = self.get_resource_stats()
+        if isinstance(self.resource_stats, dict):
+            logger.info("📦 頁面資源：%s 個請求，傳輸 %.1f MB（%s）",
+                        self.resource_stats.get('requests', 0), self.resource_stats.get('transfer_bytes', 0) / 1024 / 1024, '精簡模式' if self.lean_mode else '一般模式')
+        logger.info("📊 效能統計：\n  %s", "\n  ".join(self.metrics.summary_lines()))
 
         # 如果有保存部分檔案，通知使用者
         if self.partial_files:
-            print(f"📁 已建立 {len(self.partial_files)} 個部分檔案，爬取完成後會自動合併")
+            logger.info("📁 已建立 %s 個部分檔案，爬取完成後會自動合併", len(self.partial_files))
             if self.save_callback:
                 self.save_callback(
                     f"已建立 {len(self.partial_files)} 個備份檔案，可避免資料丟失")
 
         return self.scraped_posts
 
-    def save_partial_results(self, posts_batch, batch_number):
-        """儲存部分爬取結果"""
-        if not posts_batch:
+    def execute_scrape_step(self, command, *args):
+        """以 Selenium 執行 scrape_steps 傳出的瀏覽器指令，返回指令的結果"""
+        if command == SCROLL:
+            with self.metrics.phase("scroll"):
+                self.driver.execute_script(f"window.scrollBy(0, {args[0]});")
+        elif command == SETTLE:
+            with self.metrics.phase("scroll"):
+                self.get_wait_engine().wait_for_scroll_settle(timeout=args[0])
+        elif command == EXPAND:
+            clicks, _, extracted = self.expand_see_more(self.post_store)
+            return clicks, extracted
+        elif command == EXTRACT:
+            self.smart_merge_posts(self.post_store, self.extract_posts_with_bs())
+        elif command == SCROLL_METRICS:
+            return self.get_scroll_metrics()
+        elif command == WAIT_GROWTH:
+            with self.metrics.phase("scroll"):
+                self.get_wait_engine().wait_for_feed_growth(timeout=args[0])
+        elif command == WAIT_NETWORK:
+            with self.metrics.phase("scroll"):
+                self.get_wait_engine().wait_for_network_idle(timeout=args[0])
+        elif command == RESET_TAGS:
+            self.reset_incremental_tags()
+        elif command == INSTALL_EXPANDER:
+            try:
+                self.install_see_more_expander()
+            except Exception as e:
+                logger.warning("⚠️ 無法安裝「查看更多」展開器，改用逐次掃描: %s", e)
+        else:
+            raise ValueError(f"未知的爬取指令: {command}")
+        return None
+
+    def begin_checkpoint_run(self):
+        """since_last_run 時載入目前粉絲專頁的檢查點，之後的合併會追蹤連續已爬取過的貼文"""
+        self.checkpoint = self.known_tracker = None
+        if not self.since_last_run:
+            return None
+        if not self.page_url:
+            logger.warning("⚠️ 未知目前的粉絲專頁網址，無法使用增量爬取，將完整爬取")
             return None
+        self.checkpoint = CheckpointStore(self.checkpoint_dir).load(self.page_url)
+        self.known_tracker = KnownPostTracker(self.checkpoint, self.known_posts_to_stop)
+        if len(self.checkpoint):
+            logger.info("📌 增量爬取：上次已爬取 %s 篇貼文（最新 %s），遇到連續 %s 篇已爬取過的貼文即停止",
+                        len(self.checkpoint), self.checkpoint.newest_post_time or "未知時間", self.known_posts_to_stop)
+        else:
+            logger.info("📌 增量爬取：此粉絲專頁尚無檢查點，本次完整爬取")
+        return self.checkpoint
 
-        # 過濾截斷貼文再保存
-        filtered_batch = []
-        filtered_count = 0
+    def reached_known_posts(self):
+        """是否已連續遇到足夠多篇上次爬取過的貼文（表示已捲動到上次的位置）"""
+        tracker = self.known_tracker
+        if tracker is None or not tracker.reached:
+            return False
+        logger.info("📌 已連續遇到 %s 篇上次爬取過的貼文，停止捲動（本次新貼文 %s 篇）",
+                    tracker.streak, tracker.new_count)
+        return True
 
-        for post in posts_batch:
-            post_text = post.get('post_text', '')
-            has_see_more = (
-                '查看更多' in post_text or
-                'See More' in post_text or
-                'See more' in post_text
-            )
+    def wants_post(self, post):
+        """貼文是否會出現在最終輸出：在時間範圍內，且識別碼不在檢查點中（與 filter_new_posts / filter_window_posts 相同）"""
+        if self.post_window is not None and not self.post_window.contains(post):
+            return False
+        return self.checkpoint is None or post not in self.checkpoint
 
-            if not has_see_more:
-                filtered_batch.append(post)
-            else:
-                filtered_count += 1
+    def new_post_store(self):
+        """建立本次爬取的貼文索引（在 begin_checkpoint_run / begin_window_run 之後呼叫）
+
+        有檢查點或時間範圍時，貼文進入索引時就以 wants_post 判斷一次，selected_count 增量維護，
+        每輪檢查目標數量不需重新掃描所有貼文。
+        """
+        selector = self.wants_post if self.checkpoint is not None or self.post_window is not None else None
+        self.post_store = PostStore(selector=selector)
+        return self.post_store
+
+    def new_complete_count(self, store):
+        """最終會輸出的完整貼文數（用於判斷是否達到目標數量）
+
+        KnownPostTracker 以發布時間判斷的「已爬取過」只用於決定何時停止捲動，不影響計數。
+        """
+        return store.selected_count
+
+    def filter_new_posts(self, posts):
+        """增量爬取時移除上次已輸出過的貼文"""
+        if self.checkpoint is None:
+            return posts
+        new_posts = [post for post in posts if post not in self.checkpoint]
+        if len(new_posts) < len(posts):
+            logger.info("📌 略過 %s 篇上次已爬取過的貼文", len(posts) - len(new_posts))
+        return new_posts
+
+    def begin_window_run(self, since=None, until=None):
+        """建立本次爬取的時間範圍（參數為 None 時使用 post_since / post_until），沒有範圍時返回 None"""
+        self.expansion_paused = False
+        since = self.post_since if since is None else since
+        until = self.post_until if until is None else until
+        window = PostTimeWindow(since, until, self.window_posts_to_stop)
+        self.post_window = window if window.is_bounded else None
+        if self.post_window is not None:
+            logger.info("📅 只爬取 %s 的貼文，連續遇到 %s 篇較早的貼文即停止", window, self.window_posts_to_stop)
+        return self.post_window
+
+    def install_see_more_expander(self):
+        """安裝常駐展開器；時間範圍有上限時先暫停，捲動到範圍內的貼文才開始展開"""
+        if self.extraction_engine == "network":
+            return None
+        window = self.post_window
+        stats = self.get_see_more_expander().install(
+            paused=window is not None and window.until_minutes is not None)
+        self.expansion_paused = bool(stats.get('paused'))
+        return stats
+
+    def window_expansion_change(self):
+        """依最近出現的貼文是否在時間範圍內，返回展開器應切換成的暫停狀態，不需切換時返回 None"""
+        window = self.post_window
+        if window is None:
+            return None
+        paused = not window.wants_expansion
+        if paused == self.expansion_paused:
+            return None
+        self.expansion_paused = paused
+        logger.debug("📅 %s展開「查看更多」（目前位置的貼文%s時間範圍內）",
+                     "暫停" if paused else "恢復", "不在" if paused else "在")
+        return paused
+
+    def sync_window_expansion(self):
+        """切換展開器的暫停狀態，返回目前位置的貼文是否需要展開"""
+        paused = self.window_expansion_change()
+        if paused is not None and self.use_see_more_expander and self.see_more_expander is not None:
+            try:
+                self.get_see_more_expander().set_paused(paused)
+            except Exception as e:
+                logger.warning("⚠️ 切換展開器暫停狀態失敗: %s", e)
+        return not self.expansion_paused
+
+    def passed_time_window(self):
+        """是否已捲動超過時間範圍的下限（連續遇到多篇早於 since 的貼文）"""
+        window = self.post_window
+        if window is None or not window.passed:
+            return False
+        logger.info("📅 已連續遇到 %s 篇早於 %s 的貼文，停止捲動（範圍內 %s 篇）",
+                    window.older_streak, format_minutes(window.since_minutes), window.inside_count)
+        return True
+
+    def filter_window_posts(self, posts):
+        """移除時間範圍外（或時間無法解析）的貼文"""
+        if self.post_window is None:
+            return posts
+        selected = self.post_window.select(posts)
+        if len(selected) < len(posts):
+            logger.info("📅 略過 %s 篇時間範圍外的貼文", len(posts) - len(selected))
+        return selected
+
+    def update_checkpoint(self, posts):
+        """將本次輸出的貼文加入檢查點並保存"""
+        if self.checkpoint is None:
+            return None
+        try:
+            added = self.checkpoint.add(posts)
+            path = CheckpointStore(self.checkpoint_dir).save(self.checkpoint)
+            logger.info("📌 檢查點已更新：新增 %s 篇，共 %s 篇", added, len(self.checkpoint))
+            return path
+        except OSError as e:
+            logger.warning("⚠️ 保存檢查點時發生錯誤: %s", e)
+            return None
+
+    @measure_phase("csv")
+    def save_partial_results(self, posts_batch, batch_number):
+        """儲存部分爬取結果
+        :param posts_batch: 貼文列表，或 PostStore（只保存其中尚未保存的完整貼文）
+        """
+        if not posts_batch:
+            return None
+
+        store = posts_batch if isinstance(posts_batch, PostStore) else None
+        if store is not None:
+            # PostStore 已在貼文進入時計算截斷標記，不需再逐篇檢查
+            filtered_batch = store.unsaved_complete_posts()
+        else:
+            # 過濾截斷貼文再保存
+            filtered_batch = [post for post in posts_batch
+                              if not is_truncated_text(post.get('post_text', ''))]
+            filtered_count = len(posts_batch) - len(filtered_batch)
 
-        if filtered_count > 0:
-            print(
-                f"📝 部分保存時過濾了 {filtered_count} 篇截斷貼文，保存 {len(filtered_batch)} 篇完整貼文")
+            if filtered_count > 0:
+                logger.info("📝 部分保存時過濾了 %s 篇截斷貼文，保存 %s 篇完整貼文", filtered_count, len(filtered_batch))
 
         if not filtered_batch:
-            print("⚠️ 本批次沒有完整貼文可保存")
+            logger.warning("⚠️ 本批次沒有完整貼文可保存")
             return None
 
+        if self.use_output_journal:
+            return self.append_to_journal(filtered_batch, store)
+
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"facebook_posts_partial_{timestamp}_batch_{batch_number}.csv"
@@ -1200,7 +1785,9 @@ class FacebookPageScraper:
                     writer.writerow(post)
 
             self.partial_files.append(filename)
-            print(f"部分資料已儲存至: {filename}")
+            if store is not None:
+                store.mark_saved(filtered_batch)
+            logger.info("部分資料已儲存至: %s", filename)
 
             # 通知GUI保存狀態
             if self.save_callback:
@@ -1210,13 +1797,57 @@ class FacebookPageScraper:
             return filename
 
         except Exception as e:
-            print(f"儲存部分CSV檔案時發生錯誤: {e}")
+            logger.warning("儲存部分CSV檔案時發生錯誤: %s", e)
+            return None
+
+    def get_output_journal(self):
+        """取得本次執行的輸出日誌（第一次呼叫時建立）"""
+        if self.journal is None:
+            self.journal = OutputJournal(compress=self.journal_compress).open()
+            self.partial_files.append(self.journal.path)
+        return self.journal
+
+    def append_to_journal(self, posts, store=None):
+        """將完整貼文附加到輸出日誌，返回日誌路徑"""
+        try:
+            journal = self.get_output_journal()
+            journal.append_many(posts)
+            if store is not None:
+                store.mark_saved(posts)
+
+            # 通知GUI保存狀態
+            if self.save_callback:
+                self.save_callback(
+                    f"已自動保存 {len(posts)} 篇完整貼文到: {journal.path}")
+
+            return journal.path
+
+        except Exception as e:
+            logger.warning("寫入輸出日誌時發生錯誤: %s", e)
             return None
 
-    def merge_partial_files(self, final_filename=None):
-        """合併所有部分檔案為最終檔案"""
-        if not self.partial_files:
-            print("沒有部分檔案需要合併")
+    def close_output_journal(self):
+        """將日誌緩衝寫入磁碟並關閉"""
+        if self.journal is not None:
+            try:
+                self.journal.close()
+            except Exception as e:
+                logger.warning("關閉輸出日誌時發生錯誤: %s", e)
+
+    @measure_phase("csv")
+    def merge_partial_files(self, final_filename=None, extra_files=None, include_previous_runs=False):
+        """以串流方式合併所有部分檔案為最終檔案
+        :param final_filename: 最終檔案名稱，副檔名為 .parquet / .arrow 時輸出欄位式檔案
+        :param extra_files: 額外要合併的檔案（例如之前執行留下的部分檔案或日誌）
+        :param include_previous_runs: 是否一併合併目前目錄中歷次執行留下的檔案
+        """
+        input_files = list(self.partial_files)
+        for extra in (extra_files or []) + (find_result_files() if include_previous_runs else []):
+            if extra not in input_files:
+                input_files.append(extra)
+
+        if not input_files:
+            logger.info("沒有部分檔案需要合併")
             return False
 
         if not final_filename:
@@ -1224,54 +1855,40 @@ class FacebookPageScraper:
             final_filename = f"facebook_posts_final_{timestamp}.csv"
 
         try:
-            all_posts = []
-
-            # 讀取所有部分檔案
-            for partial_file in self.partial_files:
-                if os.path.exists(partial_file):
-                    with open(partial_file, 'r', encoding='utf-8-sig') as csvfile:
-                        reader = csv.DictReader(csvfile)
-                        for row in reader:
-                            all_posts.append(row)
+            # 確保日誌緩衝已寫入磁碟
+            if self.journal is not None:
+                self.journal.flush()
 
-            # 去除重複項目
-            unique_posts = self.remove_duplicates(all_posts)
+            written, skipped = stream_merge_files(input_files, final_filename)
 
-            # 寫入最終檔案
-            with open(final_filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                if unique_posts:
-                    fieldnames = unique_posts[0].keys()
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            logger.info("最終合併檔案已儲存至: %s", final_filename)
+            logger.info("總共合併了 %s 篇獨特貼文（來自 %s 個檔案，略過 %s 篇重複或無效貼文）", written, len(input_files), skipped)
 
-                    writer.writeheader()
-                    for post in unique_posts:
-                        writer.writerow(post)
-
-            print(f"最終合併檔案已儲存至: {final_filename}")
-            print(f"總共合併了 {len(unique_posts)} 篇獨特貼文")
-
-            # 清理部分檔案（可選）
+            # 清理本次執行的部分檔案（可選）
             self.cleanup_partial_files()
 
             return final_filename
 
         except Exception as e:
-            print(f"合併檔案時發生錯誤: {e}")
+            logger.warning("合併檔案時發生錯誤: %s", e)
             return False
 
     def cleanup_partial_files(self):
         """清理部分檔案"""
+        self.close_output_journal()
+        self.journal = None
         try:
             for partial_file in self.partial_files:
                 if os.path.exists(partial_file):
                     os.remove(partial_file)
-                    print(f"已清理部分檔案: {partial_file}")
+                    logger.info("已清理部分檔案: %s", partial_file)
             self.partial_files = []
         except Exception as e:
-            print(f"清理部分檔案時發生錯誤: {e}")
+            logger.warning("清理部分檔案時發生錯誤: %s", e)
 
+    @measure_phase("csv")
     def save_to_csv(self, filename=None):
-        """將爬取的資料儲存為CSV檔案"""
+        """將爬取的資料儲存為CSV檔案（副檔名為 .parquet / .arrow 時儲存為欄位式檔案）"""
         # 如果有部分檔案，先合併它們
         if self.partial_files:
             merged_file = self.merge_partial_files(filename)
@@ -1280,7 +1897,7 @@ class FacebookPageScraper:
 
         # 如果沒有部分檔案但有完整的爬取資料
         if not self.scraped_posts:
-            print("沒有資料可供儲存")
+            logger.info("沒有資料可供儲存")
             return False
 
         if not filename:
@@ -1288,6 +1905,11 @@ class FacebookPageScraper:
             filename = f"facebook_posts_{timestamp}.csv"
 
         try:
+            if columnar_format(filename):
+                write_posts(self.scraped_posts, filename)
+                logger.info("資料已儲存至: %s", filename)
+                return True
+
             with open(filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
                 fieldnames = ['post_text', 'likes', 'comments',
                               'shares', 'post_time', 'post_url', 'scraped_at']
@@ -1297,20 +1919,34 @@ class FacebookPageScraper:
                 for post in self.scraped_posts:
                     writer.writerow(post)
 
-            print(f"資料已儲存至: {filename}")
+            logger.info("資料已儲存至: %s", filename)
             return True
 
         except Exception as e:
-            print(f"儲存CSV檔案時發生錯誤: {e}")
+            logger.warning("儲存CSV檔案時發生錯誤: %s", e)
             return False
 
+    def reset_run_state(self):
+        """清除上一次爬取的狀態，讓同一個已登入的瀏覽器可以接著執行新的爬取工作"""
+        self.close_output_journal()
+        self.journal = None
+        self.partial_files = []
+        self.scraped_posts = []
+        self.post_store = PostStore()
+        self.metrics.reset()
+        self.stop_scraping = False
+
     def stop_scraping_process(self):
         """停止爬取過程"""
         self.stop_scraping = True
-        print("正在停止爬取過程...")
+        logger.info("正在停止爬取過程...")
 
     def close(self):
         """關閉瀏覽器"""
+        self.close_output_journal()
+        if self.network_capture is not None:
+            self.network_capture.close()
+            self.network_capture = None
         if self.driver:
             self.driver.quit()
-            print("瀏覽器已關閉")
+            logger.info("瀏覽器已關閉")
@@ -0,0 +1,430 @@
+"""從網路回應擷取動態消息貼文
+
+Facebook 的動態消息先以 JSON（GraphQL 回應，首頁載入時則內嵌在 HTML 的 <script type="application/json">）
+傳到瀏覽器，再由前端呈現成 DOM。此模組透過瀏覽器的效能記錄（goog:loggingPrefs performance）
+得知有哪些回應，以 Network.getResponseBody 取回內容，直接從 JSON 解出貼文：
+完整內文、精確的發布時間（epoch 秒）、讚數、留言數、分享數與永久連結，
+不需點擊「查看更多」，也不需依賴 CSS class 解析 HTML。
+
+擷取到的回應可存成回應錄製檔（JSON Lines，可 gzip 壓縮），之後不需瀏覽器即可重新解碼：
+    python facebook_network_capture.py decode responses.jsonl.gz --output posts.csv
+    python facebook_network_capture.py inspect responses.jsonl.gz
+"""
+import argparse
+import base64
+import csv
+import gzip
+import json
+import re
+from datetime import datetime
+
+from facebook_output_journal import FIELDNAMES
+from facebook_time_parser import OUTPUT_FORMAT
+from facebook_scraper_logging import get_logger
+
+logger = get_logger("network")
+
+
+FIXTURE_FORMAT = "facebook-network-responses"
+FIXTURE_VERSION = 1
+
+# 要取回內容的回應：GraphQL API，以及粉絲專頁本身的 HTML 文件（內含第一批貼文）
+GRAPHQL_URL_PATTERN = re.compile(r"^https://[^/]*facebook\.com/api/graphql/?")
+DOCUMENT_URL_PATTERN = re.compile(r"^https://[^/]*facebook\.com/")
+EMBEDDED_JSON_PATTERN = re.compile(r'<script type="application/json"[^>]*>(.*?)</script>', re.DOTALL)
+JSON_GUARD = "for (;;);"
+
+# 可作為貼文永久連結的網址
+PERMALINK_PATTERN = re.compile(r"facebook\.com/(?:[^?#]+/(?:posts|videos|photos)/|permalink\.php|story\.php|reel/)")
+
+# 貼文內的鍵 → 欄位；同一欄位依序使用第一個有值的鍵
+FIELD_KEYS = {
+    'message': 'post_text',
+    'creation_time': 'creation_time',
+    'publish_time': 'creation_time',
+    'reaction_count': 'likes',
+    'reactors': 'likes',
+    'total_comment_count': 'comments',
+    'comment_count': 'comments',
+    'comments': 'comments',
+    'share_count': 'shares',
+    'permalink_url': 'post_url',
+    'url': 'post_url',
+    'wwwURL': 'post_url',
+}
+
+PERFORMANCE_LOG_PREFS = {"performance": "ALL"}
+
+
+def iter_json_payloads(body):
+    """依序取出回應內的 JSON 物件
+
+    GraphQL 回應可能是多個連續的 JSON（串流傳送的 @defer 片段），可能以 for (;;); 開頭；
+    HTML 文件則取出其中的 <script type="application/json"> 內容。
+    """
+    text = body.lstrip()
+    if text.startswith(JSON_GUARD):
+        text = text[len(JSON_GUARD):]
+    if text.startswith("<"):
+        for match in EMBEDDED_JSON_PATTERN.finditer(text):
+            yield from iter_json_payloads(match.group(1))
+        return
+
+    decoder = json.JSONDecoder()
+    index, length = 0, len(text)
+    while index < length:
+        while index < length and text[index].isspace():
+            index += 1
+        if index >= length:
+            break
+        try:
+            payload, index = decoder.raw_decode(text, index)
+        except json.JSONDecodeError as e:
+            logger.debug("無法解析的回應片段（位置 %s）: %s", index, e)
+            return
+        yield payload
+
+
+def is_story(node):
+    return node.get('__typename') == "Story" and ('post_id' in node or 'comet_sections' in node)
+
+
+def story_id(node):
+    return node.get('id') or node.get('post_id')
+
+
+def _story_ids(node):
+    return {value for value in (node.get('id'), node.get('post_id')) if value}
+
+
+def iter_stories(payload):
+    """以文件順序找出 JSON 內最外層的貼文節點（分享的貼文等巢狀貼文不重複列出）"""
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if is_story(node):
+                yield node
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+def _count(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, dict):
+        for key in ('count', 'total_count'):
+            if isinstance(value.get(key), int) and not isinstance(value.get(key), bool):
+                return value[key]
+    return None
+
+
+def _field_value(field, value):
+    """將節點上的值轉為欄位值，不適用時返回 None"""
+    if field == 'post_text':
+        text = value.get('text') if isinstance(value, dict) else None
+        return text if isinstance(text, str) and text.strip() else None
+    if field == 'creation_time':
+        return value if isinstance(value, int) and not isinstance(value, bool) and value > 0 else None
+    if field == 'post_url':
+        return value if isinstance(value, str) and PERMALINK_PATTERN.search(value) else None
+    return _count(value)
+
+
+def story_fields(story):
+    """走訪單一貼文節點，取得各欄位第一個有值的結果
+
+    不進入其他貼文的節點（分享的原始貼文），但同一篇貼文的子節點（例如 context_layout.story）照常走訪。
+    """
+    own_ids = _story_ids(story)
+    found = {}
+    stack = [story]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if node is not story and is_story(node) and not (_story_ids(node) & own_ids):
+                continue
+            for key, value in node.items():
+                field = FIELD_KEYS.get(key)
+                if field is not None and field not in found:
+                    converted = _field_value(field, value)
+                    if converted is not None:
+                        found[field] = converted
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return found
+
+
+class FeedResponseDecoder:
+    """將擷取到的回應解碼為貼文字典（欄位與 extract_posts_with_bs 相同）
+
+    同一篇貼文可能分散在多個回應片段（例如先傳內文、之後才傳互動數），
+    依貼文 ID 合併：內文取較長者，互動數取最新的非零值。
+    """
+
+    def __init__(self, fields=None):
+        """
+        :param fields: 只輸出指定欄位（POST_FIELDS 子集），None 表示全部
+        """
+        self.fields = None if fields is None else set(fields)
+        self.stories = {}  # {貼文ID: 欄位}
+        self.responses = 0
+        self.payloads = 0
+
+    def __len__(self):
+        return len(self.stories)
+
+    def reset(self):
+        self.stories.clear()
+
+    def decode(self, responses):
+        """解碼一批回應，返回其中出現（或有更新）的貼文，依出現順序排列"""
+        touched = []
+        touched_ids = set()
+        for response in responses:
+            self.responses += 1
+            for payload in iter_json_payloads(response.get('body') or ""):
+                self.payloads += 1
+                for story in iter_stories(payload):
+                    identifier = story_id(story)
+                    if identifier is None:
+                        continue
+                    self._merge(identifier, story_fields(story))
+                    if identifier not in touched_ids:
+                        touched_ids.add(identifier)
+                        touched.append(identifier)
+
+        posts = []
+        for identifier in touched:
+            post = self.to_post(self.stories[identifier])
+            if post:
+                posts.append(post)
+        return posts
+
+    def all_posts(self):
+        """目前解出的所有貼文，依第一次出現的順序排列"""
+        posts = (self.to_post(fields) for fields in self.stories.values())
+        return [post for post in posts if post]
+
+    def _merge(self, identifier, fields):
+        current = self.stories.get(identifier)
+        if current is None:
+            self.stories[identifier] = fields
+            return
+        for field, value in fields.items():
+            if field == 'post_text':
+                if len(value) > len(current.get(field, "")):
+                    current[field] = value
+            elif field in ('likes', 'comments', 'shares'):
+                if value or field not in current:
+                    current[field] = value
+            else:
+                current.setdefault(field, value)
+
+    def to_post(self, fields):
+        """轉為貼文字典；沒有內文也沒有互動數時返回 None"""
+        creation_time = fields.get('creation_time')
+        post = {
+            'post_text': fields.get('post_text', ""),
+            'likes': str(fields.get('likes', 0)),
+            'comments': str(fields.get('comments', 0)),
+            'shares': str(fields.get('shares', 0)),
+            'post_time': datetime.fromtimestamp(creation_time).strftime(OUTPUT_FORMAT)
+                         if creation_time else "未知時間",
+            'post_url': fields.get('post_url', ""),
+        }
+        if not post['post_text'].strip() and post['likes'] == "0" and post['comments'] == "0":
+            return None
+        if self.fields is not None:
+            post = {field: value for field, value in post.items() if field in self.fields}
+        post['scraped_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return post
+
+
+def apply_capture_options(options):
+    """在瀏覽器選項加上效能記錄（網路事件），擷取引擎才能得知回應"""
+    options.set_capability("goog:loggingPrefs", PERFORMANCE_LOG_PREFS)
+    return options
+
+
+class NetworkFeedCapture:
+    """從瀏覽器的效能記錄取得動態消息的網路回應內容
+
+    瀏覽器需以 apply_capture_options 啟動。每次 poll 讀取自上次以來的網路事件，
+    對完成載入的 GraphQL 回應（與粉絲專頁文件）呼叫 Network.getResponseBody 取回內容。
+    """
+
+    def __init__(self, driver, include_documents=True, fixture_path=None, metrics=None):
+        """
+        :param include_documents: 是否也取回 HTML 文件（第一批貼文內嵌在文件中）
+        :param fixture_path: 同時將回應寫入此回應錄製檔，供離線解碼
+        """
+        self.driver = driver
+        self.include_documents = include_documents
+        self.metrics = metrics
+        self.stats = {'log_entries': 0, 'responses': 0, 'bytes': 0, 'failed': 0}
+        self._pending = {}  # {requestId: 網址}
+        self._fixture = FixtureWriter(fixture_path) if fixture_path else None
+
+    def enable(self):
+        """開啟 Network 網域並加大回應緩衝，避免大型回應在取回前被清除"""
+        self.driver.execute_cdp_cmd("Network.enable", {
+            'maxTotalBufferSize': 64 * 1024 * 1024,
+            'maxResourceBufferSize': 16 * 1024 * 1024,
+        })
+
+    def read_log(self):
+        entries = self.driver.get_log("performance")
+        self.stats['log_entries'] += len(entries)
+        return entries
+
+    def reset(self):
+        """捨棄目前為止的網路事件（例如前往新的粉絲專頁前，不取回登入頁面等回應）"""
+        self.read_log()
+        self._pending.clear()
+
+    def wants(self, url, resource_type):
+        if GRAPHQL_URL_PATTERN.match(url):
+            return True
+        return self.include_documents and resource_type == "Document" and bool(DOCUMENT_URL_PATTERN.match(url))
+
+    def poll(self):
+        """讀取新的網路事件，返回已完成載入的回應 [{'url', 'body'}]"""
+        responses = []
+        for entry in self.read_log():
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            method = message.get('method')
+            params = message.get('params') or {}
+            request_id = params.get('requestId')
+            if method == "Network.responseReceived":
+                url = (params.get('response') or {}).get('url', "")
+                if self.wants(url, params.get('type')):
+                    self._pending[request_id] = url
+            elif method == "Network.loadingFinished":
+                url = self._pending.pop(request_id, None)
+                if url is not None:
+                    body = self.fetch_body(request_id)
+                    if body is not None:
+                        responses.append({'url': url, 'body': body})
+            elif method == "Network.loadingFailed":
+                self._pending.pop(request_id, None)
+
+        if responses and self._fixture is not None:
+            self._fixture.write(responses)
+        return responses
+
+    def fetch_body(self, request_id):
+        try:
+            result = self.driver.execute_cdp_cmd("Network.getResponseBody", {'requestId': request_id})
+        except Exception as e:
+            # 回應已從瀏覽器緩衝中清除等情況
+            self.stats['failed'] += 1
+            logger.debug("無法取回回應內容 %s: %s", request_id, e)
+            return None
+        body = result.get('body') or ""
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        self.stats['responses'] += 1
+        size = len(body.encode('utf-8'))
+        self.stats['bytes'] += size
+        if self.metrics is not None:
+            self.metrics.increment("network_response_bytes", size)
+        return body
+
+    def close(self):
+        if self._fixture is not None:
+            self._fixture.close()
+            self._fixture = None
+
+
+class FixtureWriter:
+    """將擷取到的回應寫入回應錄製檔（第一行為檔頭，之後每行一個回應）"""
+
+    def __init__(self, path, metadata=None):
+        self.path = path
+        self.count = 0
+        self._file = gzip.open(path, 'wt', encoding='utf-8') if path.endswith(".gz") \
+            else open(path, 'w', encoding='utf-8')
+        header = {'format': FIXTURE_FORMAT, 'version': FIXTURE_VERSION, 'recorded_at': datetime.now().isoformat()}
+        header.update(metadata or {})
+        self._file.write(json.dumps(header, ensure_ascii=False) + "\n")
+
+    def write(self, responses):
+        for response in responses:
+            self._file.write(json.dumps({'url': response['url'], 'body': response['body']}, ensure_ascii=False) + "\n")
+            self.count += 1
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def load_fixture(path):
+    """讀取回應錄製檔，返回 (檔頭, 回應列表)"""
+    opener = gzip.open if path.endswith(".gz") else open
+    header, responses = {}, []
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line_number, line in enumerate(f):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if line_number == 0:
+                if record.get('format') != FIXTURE_FORMAT:
+                    raise ValueError(f"{path} 不是網路回應錄製檔")
+                header = record
+                continue
+            responses.append(record)
+    return header, responses
+
+
+def decode_fixture(path, fields=None):
+    """離線解碼回應錄製檔，返回 (貼文列表, 解碼器)"""
+    _, responses = load_fixture(path)
+    decoder = FeedResponseDecoder(fields)
+    decoded = decoder.decode(responses)
+    return decoded, decoder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="離線解碼擷取到的 Facebook 網路回應")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    decode_parser = subparsers.add_parser("decode", help="將回應錄製檔解碼為貼文CSV")
+    decode_parser.add_argument("fixture")
+    decode_parser.add_argument("--output", help="輸出CSV檔案（未指定時只顯示摘要）")
+
+    inspect_parser = subparsers.add_parser("inspect", help="列出每個回應解出的貼文數")
+    inspect_parser.add_argument("fixture")
+
+    args = parser.parse_args()
+
+    if args.command == "inspect":
+        header, responses = load_fixture(args.fixture)
+        print(f"錄製於 {header.get('recorded_at')}，共 {len(responses)} 個回應")
+        decoder = FeedResponseDecoder()
+        for index, response in enumerate(responses, 1):
+            posts = decoder.decode([response])
+            print(f"  {index:4d}. {len(response['body']):>9,} 字元  {len(posts):3d} 篇  {response['url'][:80]}")
+        print(f"共 {len(decoder)} 篇貼文")
+        return
+
+    posts, decoder = decode_fixture(args.fixture)
+    print(f"✅ {decoder.responses} 個回應（{decoder.payloads} 個 JSON 片段）解出 {len(posts)} 篇貼文")
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8-sig') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(posts)
+        print(f"資料已儲存至: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
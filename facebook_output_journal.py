@@ -0,0 +1,253 @@
+import argparse
+import csv
+import glob
+import gzip
+import json
+import os
+import time
+import zlib
+from datetime import datetime
+
+from facebook_columnar_export import ColumnarPostWriter, columnar_format
+from facebook_post_store import post_identity_digest
+from facebook_scraper_logging import get_logger
+
+logger = get_logger("journal")
+
+
+FIELDNAMES = ['post_text', 'likes', 'comments',
+              'shares', 'post_time', 'post_url', 'scraped_at']
+
+
+class OutputJournal:
+    """單一檔案、只附加寫入的爬取結果日誌（JSON Lines）
+
+    取代每批次一個部分CSV檔案的做法：
+    - 寫入先放在記憶體緩衝，超過時間或大小門檻才寫入磁碟並 fsync
+    - 開啟既有日誌時會偵測並截斷當機造成的不完整最後一筆資料
+    - 可選 gzip 壓縮：每次寫入為獨立的 gzip 區段，當機只會損壞最後一個區段
+    最終CSV由 export_csv 串流產生，不需重新讀取多個檔案合併。
+    """
+
+    def __init__(self, path=None, compress=False, flush_interval=5.0, flush_bytes=64 * 1024):
+        """
+        :param path: 日誌檔案路徑，None 時自動產生 facebook_posts_journal_<時間>.jsonl[.gz]
+        :param compress: 是否以 gzip 壓縮
+        :param flush_interval: 距離上次寫入超過此秒數就寫入磁碟（附加時檢查，爬取迴圈每輪也會呼叫 flush_if_due）
+        :param flush_bytes: 緩衝超過此位元組數就寫入磁碟
+        """
+        if path is None:
+            # 含微秒，避免多個爬蟲同時建立日誌時檔名衝突
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            path = f"facebook_posts_journal_{timestamp}.jsonl"
+        if compress and not path.endswith(".gz"):
+            # 以副檔名辨識壓縮格式，讀取與修復時才能正確處理
+            path += ".gz"
+        self.path = path
+        self.compress = path.endswith(".gz")
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.record_count = 0
+        self._buffer = []
+        self._buffer_size = 0
+        self._last_flush = time.monotonic()
+        self._file = None
+
+    def open(self):
+        """開啟日誌（必要時先修復不完整的最後一筆資料）"""
+        if self._file is None:
+            if os.path.exists(self.path):
+                truncated = self.recover(self.path)
+                if truncated:
+                    logger.warning("⚠️ 日誌 %s 最後一筆資料不完整，已截斷 %s 位元組", self.path, truncated)
+            self._file = open(self.path, 'ab')
+        return self
+
+    def append(self, post):
+        """附加單篇貼文"""
+        line = json.dumps({field: post.get(field, "") for field in FIELDNAMES},
+                          ensure_ascii=False) + "\n"
+        data = line.encode('utf-8')
+        self._buffer.append(data)
+        self._buffer_size += len(data)
+        self.record_count += 1
+
+        if self._buffer_size >= self.flush_bytes:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def append_many(self, posts):
+        """附加一批貼文"""
+        for post in posts:
+            self.append(post)
+
+    def flush_if_due(self):
+        """緩衝有資料且距離上次寫入已超過 flush_interval 時寫入磁碟
+
+        只在附加時檢查的話，最後一批之後長時間沒有新貼文，緩衝會一直留在記憶體中；
+        由爬取迴圈定期呼叫，讓當機時最多遺失 flush_interval 秒的資料。
+        :return: 是否已寫入
+        """
+        if not self._buffer or time.monotonic() - self._last_flush < self.flush_interval:
+            return False
+        self.flush()
+        return True
+
+    def flush(self):
+        """將緩衝寫入磁碟並同步"""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        self.open()
+        data = b"".join(self._buffer)
+        if self.compress:
+            data = gzip.compress(data)
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._buffer = []
+        self._buffer_size = 0
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def recover(path):
+        """截斷日誌尾端不完整的資料，返回被截斷的位元組數"""
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        if path.endswith(".gz"):
+            good_end = 0
+            while good_end < len(data):
+                decompressor = zlib.decompressobj(wbits=31)
+                try:
+                    decompressor.decompress(data[good_end:])
+                except zlib.error:
+                    break
+                if not decompressor.eof:
+                    break
+                good_end = len(data) - len(decompressor.unused_data)
+        else:
+            good_end = data.rfind(b"\n") + 1
+
+        truncated = len(data) - good_end
+        if truncated:
+            with open(path, 'r+b') as f:
+                f.truncate(good_end)
+        return truncated
+
+    @staticmethod
+    def read_records(path):
+        """逐筆讀取日誌內容（略過不完整或損壞的資料）"""
+        opener = gzip.open if path.endswith(".gz") else open
+        try:
+            with opener(path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except (EOFError, OSError, zlib.error):
+            # 壓縮日誌最後一個區段不完整
+            return
+
+    def export_csv(self, filename):
+        """將日誌串流轉換為CSV檔案（依貼文識別器去重；副檔名為 .parquet / .arrow 時為欄位式檔案），返回寫入的貼文數"""
+        self.flush()
+        written, _ = stream_merge_files([self.path], filename)
+        return written
+
+
+def is_journal_file(path):
+    return path.endswith(".jsonl") or path.endswith(".jsonl.gz")
+
+
+def iter_result_rows(path):
+    """逐筆讀取爬取結果檔案（部分CSV或輸出日誌），不會一次載入整個檔案"""
+    if is_journal_file(path):
+        yield from OutputJournal.read_records(path)
+        return
+
+    with open(path, 'r', newline='', encoding='utf-8-sig') as csvfile:
+        yield from csv.DictReader(csvfile)
+
+
+def find_result_files(directory="."):
+    """尋找目錄中歷次執行留下的部分CSV檔案與輸出日誌（依檔名時間排序）"""
+    patterns = ["facebook_posts_partial_*.csv",
+                "facebook_posts_journal_*.jsonl",
+                "facebook_posts_journal_*.jsonl.gz"]
+    files = []
+    for pattern in patterns:
+        files.extend(glob.glob(os.path.join(directory, pattern)))
+    return sorted(files)
+
+
+def stream_merge_files(paths, output_filename):
+    """以固定記憶體串流合併多個結果檔案
+
+    逐筆讀取輸入並立即寫出，只以8位元組的識別摘要去重，
+    因此記憶體用量只與獨特貼文數量有關，而非資料總量。
+    輸出檔名為 .parquet / .arrow 時改寫成欄位式檔案（見 facebook_columnar_export.py）。
+    :return: (寫入的貼文數, 略過的重複或無效貼文數)
+    """
+    if columnar_format(output_filename):
+        with ColumnarPostWriter(output_filename) as writer:
+            return _merge_rows(paths, writer.write)
+
+    with open(output_filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES, extrasaction='ignore')
+        writer.writeheader()
+        return _merge_rows(paths, writer.writerow)
+
+
+def _merge_rows(paths, write_row):
+    seen = set()
+    written = 0
+    skipped = 0
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        for row in iter_result_rows(path):
+            digest = post_identity_digest(row)
+            if digest is None or digest in seen:
+                skipped += 1
+                continue
+            seen.add(digest)
+            write_row(row)
+            written += 1
+    return written, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="串流合併 Facebook 爬取結果檔案")
+    parser.add_argument("output", help="輸出檔案：.csv，或欄位式的 .parquet / .arrow（需安裝 pyarrow）")
+    parser.add_argument("files", nargs="*",
+                        help="要合併的部分CSV或輸出日誌，未指定時合併目前目錄中所有歷次執行的檔案")
+    args = parser.parse_args()
+
+    files = args.files or find_result_files()
+    if not files:
+        print("沒有找到可合併的檔案")
+        return
+
+    written, skipped = stream_merge_files(files, args.output)
+    print(f"已合併 {len(files)} 個檔案：寫入 {written} 篇獨特貼文，略過 {skipped} 篇重複或無效貼文")
+    print(f"最終合併檔案已儲存至: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
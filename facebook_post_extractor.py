@@ -0,0 +1,337 @@
+from datetime import datetime
+
+from bs4 import Tag
+
+from facebook_scraper_logging import get_logger
+
+logger = get_logger("extractor")
+
+
+# 可擷取的貼文欄位（scraped_at 一律附加）
+POST_FIELDS = ("post_text", "likes", "comments",
+               "shares", "post_time", "post_url")
+
+LIKES_CLASSES = {"xt0b8zv", "x1jx94hy", "xrbpyxo", "xl423tq"}
+HEADER_CLASSES = {"xu06os2", "x1ok221b"}
+
+
+def _has_classes(tag, classes):
+    """檢查元素是否同時具有指定的所有class"""
+    if tag is None:
+        return False
+    tag_classes = tag.get("class")
+    if not tag_classes:
+        return False
+    if isinstance(tag_classes, str):
+        tag_classes = tag_classes.split()
+    return classes.issubset(tag_classes)
+
+
+def _parent_chain_matches(tag, names):
+    """檢查元素往上的父元素名稱是否依序符合 names，成功時返回最後一個父元素"""
+    current = tag
+    for name in names:
+        current = current.parent
+        if current is None or current.name != name:
+            return None
+    return current
+
+
+def _is_likes(tag):
+    # span.xt0b8zv.x1jx94hy.xrbpyxo.xl423tq > span > span
+    if tag.name != "span":
+        return False
+    top = _parent_chain_matches(tag, ("span", "span"))
+    return top is not None and _has_classes(top, LIKES_CLASSES)
+
+
+def _is_count_span(tag):
+    # div > div > span > div > div > div > span > span.html-span
+    return (tag.name == "span"
+            and _has_classes(tag, {"html-span"})
+            and _parent_chain_matches(
+                tag, ("span", "div", "div", "div", "span", "div", "div")) is not None)
+
+
+def _is_post_link(tag):
+    # div.xu06os2.x1ok221b > span > div > span > span > a
+    if tag.name != "a":
+        return False
+    top = _parent_chain_matches(tag, ("span", "span", "div", "span", "div"))
+    return top is not None and _has_classes(top, HEADER_CLASSES)
+
+
+def _is_header_link_span(tag):
+    # div.xu06os2.x1ok221b > span > div > span > span > a > span
+    if tag.name != "span":
+        return False
+    top = _parent_chain_matches(
+        tag, ("a", "span", "span", "div", "span", "div"))
+    return top is not None and _has_classes(top, HEADER_CLASSES)
+
+
+def _has_ancestor(tag, predicate):
+    parent = tag.parent
+    while parent is not None:
+        if predicate(parent):
+            return True
+        parent = parent.parent
+    return False
+
+
+def _is_link_ltr_span(tag):
+    # a[role='link'] span[dir='ltr']
+    return (tag.name == "span" and tag.get("dir") == "ltr"
+            and _has_ancestor(tag, lambda p: p.name == "a" and p.get("role") == "link"))
+
+
+def _is_subtitle_span(tag):
+    # [data-testid='story-subtitle'] span
+    return (tag.name == "span"
+            and _has_ancestor(tag, lambda p: p.get("data-testid") == "story-subtitle"))
+
+
+# 時間的備用選擇器，順序與原本的 CSS 選擇器相同
+TIME_FALLBACK_MATCHERS = (
+    _is_link_ltr_span,
+    _is_header_link_span,
+    lambda tag: tag.name == "span" and tag.get("dir") == "ltr",
+    lambda tag: tag.name == "time",
+    _is_subtitle_span,
+)
+
+
+class PostExtractionPlan:
+    """預先編譯的貼文欄位擷取計畫
+
+    只走訪貼文子樹一次即收集所有欄位，取代每篇貼文多次 find_all/select 的做法，
+    結果與原本的選擇器版本相同。可透過 fields 只擷取需要的欄位（例如略過時間解析或連結）。
+    """
+
+    def __init__(self, fields=None, clean_date=None):
+        """
+        :param fields: 要擷取的欄位（POST_FIELDS 的子集），None 表示全部
+        :param clean_date: 將原始時間文字轉為統一格式的函數
+        """
+        fields = POST_FIELDS if fields is None else tuple(fields)
+        unknown = [field for field in fields if field not in POST_FIELDS]
+        if unknown:
+            raise ValueError(f"未知的貼文欄位: {', '.join(unknown)}")
+
+        self.fields = fields
+        self.clean_date = clean_date or (lambda text: text)
+        self.want_text = "post_text" in fields
+        self.want_likes = "likes" in fields
+        self.want_counts = "comments" in fields or "shares" in fields
+        self.want_time = "post_time" in fields
+        self.want_url = "post_url" in fields
+
+    def extract(self, post):
+        """從單一貼文容器擷取欄位，無內容時返回 None"""
+        messages = []
+        likes_element = None
+        count_spans = []
+        ltr_elements = []
+        fallback_times = [None] * len(TIME_FALLBACK_MATCHERS)
+        link_element = None
+
+        for tag in post.descendants:
+            if not isinstance(tag, Tag):
+                continue
+
+            if self.want_text and tag.name == "div" and tag.get("data-ad-preview") == "message":
+                messages.append(tag)
+
+            if self.want_likes and likes_element is None and _is_likes(tag):
+                likes_element = tag
+
+            if self.want_counts and len(count_spans) < 2 and _is_count_span(tag):
+                count_spans.append(tag)
+
+            if self.want_time:
+                if len(ltr_elements) < 2 and tag.get("dir") == "ltr":
+                    ltr_elements.append(tag)
+                for index, matcher in enumerate(TIME_FALLBACK_MATCHERS):
+                    if fallback_times[index] is None and matcher(tag):
+                        fallback_times[index] = tag
+
+            if self.want_url and link_element is None and _is_post_link(tag):
+                link_element = tag
+
+        post_data = {}
+
+        if self.want_text:
+            post_data["post_text"] = " ".join(
+                [msg.get_text(strip=True) for msg in messages])
+
+        if self.want_likes:
+            post_data["likes"] = likes_element.get_text(
+                strip=True) if likes_element else "0"
+
+        if "comments" in self.fields:
+            post_data["comments"] = count_spans[0].text if count_spans else "0"
+
+        if "shares" in self.fields:
+            post_data["shares"] = count_spans[1].text if len(
+                count_spans) > 1 else "0"
+
+        if self.want_time:
+            post_data["post_time"] = self._resolve_time(
+                ltr_elements, fallback_times)
+
+        if self.want_url:
+            post_url = link_element.get('href') if link_element else ""
+            if post_url and not post_url.startswith('http'):
+                post_url = "https://www.facebook.com" + post_url
+            post_data["post_url"] = post_url
+
+        return self._finalize(post_data)
+
+    def _resolve_time(self, ltr_elements, fallback_times):
+        """依原本的優先順序決定貼文時間"""
+        ltr_text = ltr_elements[1].get_text(
+            strip=True) if len(ltr_elements) >= 2 else None
+        fallback_texts = (elem.get_text(strip=True) if elem is not None else None
+                          for elem in fallback_times)
+        return resolve_post_time(ltr_text, fallback_texts, self.clean_date)
+
+    def from_browser_record(self, record):
+        """將瀏覽器端擷取腳本回傳的原始資料轉為與 extract 相同格式的貼文字典"""
+        post_data = {}
+
+        if self.want_text:
+            post_data["post_text"] = " ".join(record.get("messages") or [])
+
+        if self.want_likes:
+            likes = record.get("likes")
+            post_data["likes"] = likes if likes is not None else "0"
+
+        counts = record.get("counts") or []
+        if "comments" in self.fields:
+            post_data["comments"] = counts[0] if counts else "0"
+
+        if "shares" in self.fields:
+            post_data["shares"] = counts[1] if len(counts) > 1 else "0"
+
+        if self.want_time:
+            post_data["post_time"] = resolve_post_time(
+                record.get("ltr_time"), record.get("fallback_times") or [], self.clean_date)
+
+        if self.want_url:
+            post_url = record.get("post_url") or ""
+            if post_url and not post_url.startswith('http'):
+                post_url = "https://www.facebook.com" + post_url
+            post_data["post_url"] = post_url
+
+        return self._finalize(post_data)
+
+    def _finalize(self, post_data):
+        """只保留有內容的貼文，並附加爬取時間"""
+        if (post_data.get("post_text", "").strip()
+                or post_data.get("likes", "0") != "0"
+                or post_data.get("comments", "0") != "0"):
+            post_data["scraped_at"] = datetime.now().strftime(
+                "%Y-%m-%d %H:%M:%S")
+            return post_data
+        return None
+
+
+def resolve_post_time(ltr_text, fallback_texts, clean_date):
+    """依原本的優先順序決定貼文時間
+
+    :param ltr_text: 第二個 dir="ltr" 元素的文字，沒有時為 None
+    :param fallback_texts: 依序為各備用選擇器第一個符合元素的文字（None 表示沒有符合）
+    """
+    post_time = "未知時間"
+    try:
+        # 第二個 dir="ltr" 元素通常是時間
+        if ltr_text and len(ltr_text) < 100:
+            post_time = clean_date(ltr_text)
+
+        # 備用方案：每個選擇器只檢查第一個符合的元素
+        if post_time == "未知時間":
+            for candidate_time in fallback_texts:
+                if candidate_time and len(candidate_time) < 50 and any(char.isdigit() for char in candidate_time):
+                    post_time = clean_date(candidate_time)
+                    break
+    except Exception as e:
+        logger.warning("擷取時間時發生錯誤: %s", e)
+        post_time = "未知時間"
+    return post_time
+
+
+# 在瀏覽器內執行的貼文擷取腳本，選擇器與 PostExtractionPlan 相同，只回傳精簡的 JSON 資料
+# arguments[0]: 是否只處理新出現或有變動的容器（與增量擷取共用 data-fps-sig 標記）
+# arguments[1]: 要擷取的欄位列表
+IN_BROWSER_EXTRACT_SCRIPT = """
+var incremental = arguments[0];
+var fields = arguments[1] || [];
+var want = {};
+for (var f = 0; f < fields.length; f++) { want[fields[f]] = true; }
+
+function strippedText(el) {
+    // 等同 BeautifulSoup 的 get_text(strip=True)
+    var walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT, null);
+    var parts = [];
+    var node;
+    while ((node = walker.nextNode())) {
+        var parentName = node.parentNode ? node.parentNode.nodeName : '';
+        if (parentName === 'SCRIPT' || parentName === 'STYLE' || parentName === 'TEMPLATE') {
+            continue;
+        }
+        var text = node.nodeValue.trim();
+        if (text) { parts.push(text); }
+    }
+    return parts.join('');
+}
+
+var fallbackSelectors = [
+    "a[role='link'] span[dir='ltr']",
+    "div.xu06os2.x1ok221b > span > div > span > span > a > span",
+    "span[dir='ltr']",
+    "time",
+    "[data-testid='story-subtitle'] span"
+];
+
+var containers = document.querySelectorAll('div[class="x1n2onr6 x1ja2u2z"]');
+var records = [];
+for (var i = 0; i < containers.length; i++) {
+    var post = containers[i];
+    if (incremental) {
+        var signature = String((post.textContent || '').length);
+        if (post.getAttribute('data-fps-sig') === signature) { continue; }
+        post.setAttribute('data-fps-sig', signature);
+    }
+
+    var record = {};
+    if (want.post_text) {
+        var messages = post.querySelectorAll('div[data-ad-preview="message"]');
+        record.messages = [];
+        for (var m = 0; m < messages.length; m++) { record.messages.push(strippedText(messages[m])); }
+    }
+    if (want.likes) {
+        var likes = post.querySelector('span.xt0b8zv.x1jx94hy.xrbpyxo.xl423tq > span > span');
+        record.likes = likes ? strippedText(likes) : null;
+    }
+    if (want.comments || want.shares) {
+        var counts = post.querySelectorAll('div > div > span > div > div > div > span > span.html-span');
+        record.counts = [];
+        for (var c = 0; c < counts.length && c < 2; c++) { record.counts.push(counts[c].textContent); }
+    }
+    if (want.post_time) {
+        var ltr = post.querySelectorAll('[dir="ltr"]');
+        record.ltr_time = ltr.length >= 2 ? strippedText(ltr[1]) : null;
+        record.fallback_times = [];
+        for (var s = 0; s < fallbackSelectors.length; s++) {
+            var timeElem = post.querySelector(fallbackSelectors[s]);
+            record.fallback_times.push(timeElem ? strippedText(timeElem) : null);
+        }
+    }
+    if (want.post_url) {
+        var link = post.querySelector('div.xu06os2.x1ok221b > span > div > span > span > a');
+        record.post_url = link ? link.getAttribute('href') : '';
+    }
+    records.push(record);
+}
+return records;
+"""
@@ -0,0 +1,174 @@
+import hashlib
+
+
+TRUNCATION_MARKERS = ('查看更多', 'See More', 'See more')
+
+
+def is_truncated_text(text):
+    """貼文內容是否仍包含「查看更多」（表示內容被截斷）"""
+    return any(marker in text for marker in TRUNCATION_MARKERS)
+
+
+def post_identity(post):
+    """取得貼文的唯一識別器：文章開頭50字 + 日期部分（不包含具體時分）
+
+    與 remove_duplicates 使用相同規則；內容為空或時間未知的貼文返回 None。
+    """
+    if isinstance(post, dict):
+        post_text = (post.get('post_text') or '').strip()
+        post_time = post.get('post_time') or ''
+    else:
+        post_text = (getattr(post, 'post_text', '') or '').strip()
+        post_time = getattr(post, 'post_time', '') or ''
+
+    if not post_text or post_time == '未知時間':
+        return None
+
+    # 如果時間格式是 YYYY-MM-DD HH:MM，只取日期部分
+    date_part = post_time.split(" ")[0] if " " in post_time else post_time
+    return (post_text[:50].strip(), date_part)
+
+
+def post_identity_digest(post):
+    """將貼文識別器壓縮為固定大小（8位元組）的整數，供大量去重時節省記憶體
+
+    內容為空或時間未知的貼文返回 None。
+    """
+    key = post_identity(post)
+    if key is None:
+        return None
+    raw = f"{key[0]}\x1f{key[1]}".encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), 'big')
+
+
+class _StoredPost:
+    __slots__ = ('post', 'text_length', 'truncated', 'saved', 'selected')
+
+    def __init__(self, post, complete=False):
+        text = (post.get('post_text') or '').strip()
+        self.post = post
+        self.text_length = len(text)
+        # 已知為完整內文（例如網路回應）時，內文本身含有「查看更多」等字樣也不視為截斷
+        self.truncated = not complete and is_truncated_text(text)
+        self.saved = False
+        self.selected = False
+
+    def rank(self):
+        # 優先保留未截斷的內容，其次是較長的內容
+        return (not self.truncated, self.text_length)
+
+
+class PostStore:
+    """以貼文識別器為索引的貼文集合
+
+    取代每次滾動都重建列表的 smart_merge_posts：新增或更新單篇貼文為 O(1)，
+    截斷標記只在貼文進入時計算一次，完整/截斷數量以計數器增量維護。
+    迭代順序為貼文第一次出現的順序；尚未保存的完整貼文另以有序索引維護（依成為完整貼文的順序），
+    自動保存時不需掃描全部貼文。
+    """
+
+    def __init__(self, posts=None, selector=None):
+        """
+        :param selector: 判斷完整貼文是否計入 selected_count 的函式（例如時間範圍與檢查點），
+                         只在貼文進入或被取代時呼叫一次；None 表示所有完整貼文都計入
+        """
+        self._entries = {}
+        self._unsaved = {}
+        self.selector = selector
+        self.complete_count = 0
+        self.selected_count = 0
+        self.truncated_count = 0
+        if posts:
+            self.merge(posts)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return (entry.post for entry in self._entries.values())
+
+    def __contains__(self, post):
+        return post_identity(post) in self._entries
+
+    @property
+    def unsaved_complete_count(self):
+        return len(self._unsaved)
+
+    def upsert(self, post, complete=False):
+        """新增或更新單篇貼文
+
+        :param complete: 貼文內文已知為完整（網路回應解出的貼文），不檢查截斷標記
+        :return: "added"、"replaced"（以更完整的內容取代）、"kept"（保留舊內容）或 "skipped"（無法識別）
+        """
+        key = post_identity(post)
+        if key is None:
+            return "skipped"
+
+        entry = _StoredPost(post, complete)
+        existing = self._entries.get(key)
+        if existing is None:
+            self._entries[key] = entry
+            self._select(entry)
+            self._count(key, entry, 1)
+            return "added"
+
+        if entry.rank() <= existing.rank():
+            return "kept"
+
+        # 已保存過的完整貼文不再重複保存
+        entry.saved = existing.saved
+        self._select(entry)
+        self._count(key, existing, -1)
+        self._entries[key] = entry
+        self._count(key, entry, 1)
+        return "replaced"
+
+    def merge(self, posts, complete=False):
+        """合併一批貼文，返回 (新增數, 替換數)"""
+        added = replaced = 0
+        for post in posts:
+            result = self.upsert(post, complete)
+            if result == "added":
+                added += 1
+            elif result == "replaced":
+                replaced += 1
+        return added, replaced
+
+    def posts(self):
+        """所有貼文（依第一次出現順序）"""
+        return [entry.post for entry in self._entries.values()]
+
+    def complete_posts(self):
+        """不含「查看更多」的完整貼文"""
+        return [entry.post for entry in self._entries.values() if not entry.truncated]
+
+    def truncated_posts(self):
+        """仍被截斷的貼文"""
+        return [entry.post for entry in self._entries.values() if entry.truncated]
+
+    def unsaved_complete_posts(self):
+        """尚未保存過的完整貼文（依成為完整貼文的順序）"""
+        return [entry.post for entry in self._unsaved.values()]
+
+    def mark_saved(self, posts):
+        """標記貼文已保存"""
+        for post in posts:
+            key = post_identity(post)
+            entry = self._entries.get(key)
+            if entry is not None and not entry.saved:
+                entry.saved = True
+                self._unsaved.pop(key, None)
+
+    def _select(self, entry):
+        entry.selected = not entry.truncated and (self.selector is None or bool(self.selector(entry.post)))
+
+    def _count(self, key, entry, delta):
+        if entry.selected:
+            self.selected_count += delta
+        if entry.truncated:
+            self.truncated_count += delta
+        else:
+            self.complete_count += delta
+            if delta > 0 and not entry.saved:
+                # 完整貼文只會被更完整的內容取代：已在索引中時只更新內容、保留原本順序
+                self._unsaved[key] = entry
@@ -0,0 +1,123 @@
+from datetime import date, datetime, time as dt_time
+
+from facebook_checkpoint_store import post_time_minutes
+from facebook_post_store import post_identity_digest
+from facebook_time_parser import OUTPUT_FORMAT
+
+# 貼文相對於時間範圍的位置
+OLDER = -1   # 早於 since
+INSIDE = 0
+NEWER = 1    # 晚於 until
+
+BOUND_FORMATS = (OUTPUT_FORMAT, "%Y-%m-%d", "%Y/%m/%d %H:%M", "%Y/%m/%d")
+
+
+def parse_time_bound(value, end_of_day=False):
+    """將時間範圍的邊界轉為自 epoch 起的分鐘數
+
+    接受 datetime、date 或 YYYY-MM-DD [HH:MM] 字串；只有日期時 since 取當天 00:00，
+    until（end_of_day=True）取當天 23:59。None 或空字串表示不限制。
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        text = value.strip()
+        for fmt in BOUND_FORMATS:
+            try:
+                parsed = datetime.strptime(text, fmt)
+            except ValueError:
+                continue
+            if fmt in ("%Y-%m-%d", "%Y/%m/%d"):
+                value = parsed.date()
+            else:
+                value = parsed
+            break
+        else:
+            raise ValueError(f"無法解析的日期: {value}（請使用 YYYY-MM-DD 或 YYYY-MM-DD HH:MM）")
+    if isinstance(value, datetime):
+        return int(value.timestamp() // 60)
+    if isinstance(value, date):
+        clock = dt_time(23, 59) if end_of_day else dt_time(0, 0)
+        return int(datetime.combine(value, clock).timestamp() // 60)
+    raise TypeError(f"不支援的日期類型: {type(value).__name__}")
+
+
+def format_minutes(minutes):
+    return datetime.fromtimestamp(minutes * 60).strftime(OUTPUT_FORMAT) if minutes is not None else "不限"
+
+
+class PostTimeWindow:
+    """依 post_time 限制爬取範圍，並依貼文在動態消息中第一次出現的順序判斷是否已捲動超過下限
+
+    動態消息大致由新到舊排列，但置頂貼文與少數順序錯亂的貼文可能早於 since；
+    只有連續 stop_after 篇（可解析時間的）貼文都早於 since 時才視為已超過下限。
+    最近一篇新出現的貼文不在範圍內時暫停「查看更多」展開，範圍外的貼文不需要完整內容。
+    """
+
+    def __init__(self, since=None, until=None, stop_after=3):
+        self.since_minutes = parse_time_bound(since)
+        self.until_minutes = parse_time_bound(until, end_of_day=True)
+        if (self.since_minutes is not None and self.until_minutes is not None
+                and self.since_minutes > self.until_minutes):
+            raise ValueError("開始日期晚於結束日期")
+        self.stop_after = stop_after
+        self.frontier = None  # 最近一篇新出現貼文的位置（OLDER / INSIDE / NEWER），None 表示尚未知
+        self.older_streak = 0
+        self.inside_count = 0
+        self.outside_count = 0
+        self._seen = set()
+
+    def __str__(self):
+        return f"{format_minutes(self.since_minutes)} ～ {format_minutes(self.until_minutes)}"
+
+    @property
+    def is_bounded(self):
+        return self.since_minutes is not None or self.until_minutes is not None
+
+    def position_of(self, minutes):
+        if self.since_minutes is not None and minutes < self.since_minutes:
+            return OLDER
+        if self.until_minutes is not None and minutes > self.until_minutes:
+            return NEWER
+        return INSIDE
+
+    def contains(self, post):
+        """貼文時間是否在範圍內（時間無法解析的貼文無法確認，視為不在範圍內）"""
+        if not self.is_bounded:
+            return True
+        minutes = post_time_minutes(post.get('post_time'))
+        return minutes is not None and self.position_of(minutes) == INSIDE
+
+    def select(self, posts):
+        return [post for post in posts if self.contains(post)] if self.is_bounded else list(posts)
+
+    @property
+    def passed(self):
+        """是否已連續遇到 stop_after 篇早於 since 的貼文（之後不會再有範圍內的貼文）"""
+        return self.since_minutes is not None and self.older_streak >= self.stop_after
+
+    @property
+    def wants_expansion(self):
+        """目前捲動位置的貼文是否需要展開「查看更多」"""
+        return not self.passed and self.frontier in (None, INSIDE)
+
+    def observe(self, posts):
+        """依動態消息順序處理一批擷取到的貼文，返回其中不在範圍內（不需輸出）的貼文"""
+        outside = []
+        for post in posts:
+            minutes = post_time_minutes(post.get('post_time'))
+            if minutes is None or self.position_of(minutes) != INSIDE:
+                outside.append(post)
+            if minutes is None:
+                continue
+            digest = post_identity_digest(post)
+            if digest is None or digest in self._seen:
+                continue
+            self._seen.add(digest)
+            position = self.frontier = self.position_of(minutes)
+            if position == INSIDE:
+                self.inside_count += 1
+            else:
+                self.outside_count += 1
+            self.older_streak = self.older_streak + 1 if position == OLDER else 0
+        return outside
@@ -0,0 +1,176 @@
+"""scrape_posts 的共用流程
+
+開始（檢查點、時間範圍、初始擷取）、每輪分步捲動、停止條件、自動保存與最終選取只寫在 scrape_steps 一處。
+流程本身不操作瀏覽器：每個瀏覽器操作以 (指令, 參數...) yield 給執行者，執行者完成後以 send 傳回結果。
+同步（Selenium，FacebookPageScraper.execute_scrape_step）、分頁多工（TabMultiplexer，在等待前讓出給其他分頁）
+與非同步 DevTools（CDPPageScraper.execute_step）引擎各自實作這些指令。
+"""
+import random
+import time
+
+from facebook_scroll_controller import AdaptiveScrollController
+from facebook_scraper_logging import get_logger
+
+logger = get_logger("scraper")
+
+
+# 瀏覽器指令（結果為 None 者只需執行）
+RESET_TAGS = "reset_tags"              # 清除增量擷取標記
+INSTALL_EXPANDER = "install_expander"  # 安裝常駐「查看更多」展開器
+EXTRACT = "extract"                    # 擷取目前的貼文並合併到 scraper.post_store
+EXPAND = "expand"                      # 展開「查看更多」→ (新點擊數, 是否已重新擷取並合併)
+SCROLL = "scroll"                      # (SCROLL, 步長) 捲動一步
+SETTLE = "settle"                      # (SETTLE, 秒) 等待捲動後新貼文出現或頁面穩定
+SCROLL_METRICS = "scroll_metrics"      # → [文件總高度, 目前捲動位置, 視窗高度]
+WAIT_GROWTH = "wait_growth"            # (WAIT_GROWTH, 秒) 等待動態消息載入新貼文
+WAIT_NETWORK = "wait_network"          # (WAIT_NETWORK, 秒) 等待網路請求完成
+
+# 只等待頁面、不改變頁面的指令（分頁多工在這些指令前讓出給其他分頁）
+WAIT_COMMANDS = (SETTLE, WAIT_GROWTH, WAIT_NETWORK)
+
+SETTLE_TIMEOUT = 0.8
+GROWTH_TIMEOUT = 5.0
+NETWORK_TIMEOUT = 2.0
+CHECK_EVERY_ROUNDS = 10  # 每幾輪補查一次遺漏的「查看更多」並等待網路請求完成
+
+
+def scrape_steps(scraper, max_posts, progress_callback=None, since=None, until=None,
+                 label="", log_extra=None):
+    """爬取指定數量的完整貼文（FacebookPageScraper.scrape_posts 的流程），以 yield 傳出瀏覽器指令
+
+    :param scraper: 提供設定、貼文索引與輸出的 FacebookPageScraper
+    :param progress_callback: 進度回調函數 (進度百分比, 完整貼文數)
+    :param since: 只爬取此時間之後的貼文，None 表示使用 scraper.post_since
+    :param until: 只爬取此時間之前的貼文，None 表示使用 scraper.post_until
+    :param label: 記錄訊息前綴（例如粉絲專頁網址）
+    :param log_extra: 每輪摘要記錄額外附加的結構化欄位
+    :return: （StopIteration.value）最終的完整貼文列表，同時設定 scraper.scraped_posts
+    """
+    prefix = f"{label} " if label else ""
+    scraper.begin_checkpoint_run()
+    scraper.begin_window_run(since, until)
+    store = scraper.new_post_store()
+    # 捲動距離、步長與輪數上限由控制器依每輪新增的貼文數決定
+    controller = scraper.scroll_controller = AdaptiveScrollController(max_posts, log=logger.debug)
+    batch_number = 1
+    total_clicks = 0
+
+    logger.info("🚀 %s開始爬取貼文，目標: %s 篇（每 %s 篇自動保存）", prefix, max_posts, scraper.auto_save_interval)
+
+    # 初始加載（清除舊標記，確保同一頁面重複爬取時能取得所有貼文）
+    if scraper.incremental_extraction:
+        yield (RESET_TAGS,)
+    if scraper.use_see_more_expander:
+        yield (INSTALL_EXPANDER,)
+    yield (EXTRACT,)
+    clicks, _ = yield (EXPAND,)
+    total_clicks += clicks
+    if clicks > 0:
+        logger.info("✅ %s初始加載點擊了 %s 個「查看更多」，已更新內容", prefix, clicks)
+
+    while not scraper.stop_scraping:
+        # 已獲得足夠的完整貼文（會輸出的、不包含「查看更多」的貼文）就停止
+        new_complete_count = scraper.new_complete_count(store)
+        if new_complete_count >= max_posts:
+            logger.info("🎯 %s已獲得 %s 篇完整貼文，達到目標！", prefix, new_complete_count)
+            break
+        if scraper.reached_known_posts() or scraper.passed_time_window():
+            break
+        if not controller.has_budget():
+            break
+
+        # 快速分步捲動（保留少量隨機變化），每步等待頁面穩定後展開「查看更多」並擷取
+        round_started_at = time.perf_counter()
+        scroll_distance = controller.distance + random.randint(-50, 50)
+        step_size = controller.step + random.randint(-15, 15)
+        posts_before = len(store)
+        round_clicks = 0
+
+        for _ in range(max(1, scroll_distance // max(1, step_size))):
+            if scraper.stop_scraping:
+                break
+            yield (SCROLL, step_size)
+            yield (SETTLE, SETTLE_TIMEOUT)
+            clicks, extracted = yield (EXPAND,)
+            round_clicks += clicks
+            if not extracted:
+                yield (EXTRACT,)
+        total_clicks += round_clicks
+
+        # 自動保存（基於尚未保存的完整貼文數量）
+        if store.unsaved_complete_count >= scraper.auto_save_interval:
+            saved_count = store.unsaved_complete_count
+            if scraper.save_partial_results(store, batch_number):
+                logger.info("💾 %s自動保存完成：第 %s 批次，%s 篇完整貼文", prefix, batch_number, saved_count)
+                batch_number += 1
+        if scraper.journal is not None:
+            # 日誌只在附加時檢查寫入間隔，每輪補查一次，避免沒有新批次時資料一直留在緩衝
+            scraper.journal.flush_if_due()
+
+        complete_count = store.complete_count
+        if progress_callback:
+            progress_callback(min(100, complete_count / max_posts * 100), complete_count)
+
+        new_posts = len(store) - posts_before
+        decision = controller.record_round(new_posts, *(yield (SCROLL_METRICS,)))
+        # 每輪一行摘要，取代過去每次合併、去重、點擊各自輸出的訊息
+        extra = {'event': 'scroll_round', 'page': scraper.page_url, 'round': controller.rounds,
+                 'new_posts': new_posts, 'clicks': round_clicks, 'posts': len(store),
+                 'complete': complete_count, 'distance': scroll_distance, 'decision': decision}
+        extra.update(log_extra or {})
+        logger.info("📊 %s第 %s 輪：新增 %s 篇，展開 %s 個「查看更多」，共 %s 篇（其中 %s 篇完整），%.1f 秒",
+                    prefix, controller.rounds, new_posts, round_clicks, len(store), complete_count,
+                    time.perf_counter() - round_started_at, extra=extra)
+        if decision == "stop":
+            if controller.stop_reason == "end_of_feed":
+                logger.info("🏁 %s已到達動態消息底部，共 %s 篇完整貼文", prefix, complete_count)
+            else:
+                logger.warning("⚠️ %s連續 %s 輪沒有新貼文，停止滾動", prefix, controller.stall_rounds * 2)
+            break
+        if decision == "wait":
+            logger.info("⏳ %s連續多輪沒有新貼文，等待動態消息載入...", prefix)
+            yield (WAIT_GROWTH, GROWTH_TIMEOUT)
+
+        if controller.rounds % CHECK_EVERY_ROUNDS == 0:
+            clicks, _ = yield (EXPAND,)
+            total_clicks += clicks
+            if clicks > 0:
+                logger.debug("✅ %s快速檢查額外找到 %s 個文字標籤，已更新內容", prefix, clicks)
+            yield (WAIT_NETWORK, NETWORK_TIMEOUT)
+
+    # 最終清理：快速檢查遺漏的「查看更多」
+    clicks, extracted = yield (EXPAND,)
+    total_clicks += clicks
+    if not extracted:
+        # 先前點擊後才展開完成、或暫停前最後展開的貼文可能尚未重新擷取
+        yield (EXTRACT,)
+    if clicks > 0:
+        logger.info("✅ %s最終清理找到 %s 個遺漏的文字標籤，已更新內容", prefix, clicks)
+
+    # 保存剩餘的完整貼文
+    if store.unsaved_complete_count > 0:
+        remaining_count = store.unsaved_complete_count
+        if scraper.save_partial_results(store, batch_number):
+            logger.info("✅ %s最終批次保存完成：%s 篇完整貼文", prefix, remaining_count)
+    if scraper.journal is not None:
+        scraper.journal.flush()
+
+    scraper.metrics.finish()
+    final_posts = scraper.filter_window_posts(scraper.filter_new_posts(store.complete_posts()))[:max_posts]
+    scraper.update_checkpoint(final_posts)
+    scraper.scraped_posts = final_posts
+    logger.info("✅ %s完成：%s 篇完整貼文（共擷取 %s 篇，其中 %s 篇截斷），展開 %s 個「查看更多」，%.1f 秒",
+                prefix, len(final_posts), len(store), store.truncated_count, total_clicks,
+                scraper.metrics.elapsed)
+    return final_posts
+
+
+def run_steps(steps, execute):
+    """以同步的執行者跑完 scrape_steps：execute(指令, 參數...) 返回指令結果"""
+    result = None
+    while True:
+        try:
+            command = steps.send(result)
+        except StopIteration as stop:
+            return stop.value
+        result = execute(*command)
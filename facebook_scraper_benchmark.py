@@ -0,0 +1,474 @@
+"""Facebook 粉絲專頁爬蟲效能基準測試
+
+使用合成的動態牆 HTML（模擬 x1n2onr6 x1ja2u2z 貼文容器結構），不需要瀏覽器或網路。
+
+使用方式：
+    python facebook_scraper_benchmark.py extract --posts 500
+
+熱點路徑基準測試（10 / 100 / 1,000 / 10,000 篇），保存基準並比較：
+    python facebook_scraper_benchmark.py suite --save-baseline benchmark_baseline.json
+    python facebook_scraper_benchmark.py suite --compare benchmark_baseline.json
+    python facebook_scraper_benchmark.py compare current.json benchmark_baseline.json
+
+比較一般模式與精簡模式（需要瀏覽器與 Facebook 帳號）：
+    python facebook_scraper_benchmark.py browser-modes --email you@example.com --page-url https://www.facebook.com/cnn
+"""
+import argparse
+import contextlib
+import getpass
+import io
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from facebook_fan_page_scraper import FacebookPageScraper
+from facebook_post_store import PostStore
+from facebook_scraper_logging import ROOT_LOGGER
+from facebook_scraper_metrics import browser_memory_bytes
+from facebook_time_parser import FacebookTimeParser
+
+
+FILLER_WORDS = ["今天", "天氣", "真好", "我們", "一起", "去了", "公園", "散步",
+                "看到", "很多", "美麗", "花朵", "活動", "報名", "開始", "歡迎", "參加"]
+
+
+def synthetic_post_html(index, rng, truncated=False):
+    """產生單一篇合成貼文的HTML"""
+    words = rng.randint(20, 120)
+    text = "".join(rng.choice(FILLER_WORDS) for _ in range(words))
+    text = f"#{index} {text}"
+    if truncated:
+        text += "……查看更多"
+    month = (index % 12) + 1
+    day = (index % 27) + 1
+    hour = rng.randint(1, 12)
+    minute = rng.randint(0, 59)
+    period = rng.choice(["上午", "下午"])
+    return (
+        '<div class="x1n2onr6 x1ja2u2z"><div class="x78zum5 xdt5ytf">'
+        '<div class="x1cy8zhl"><h3><span dir="ltr"><a role="link" href="/page">測試粉絲專頁</a></span></h3>'
+        '<div class="xu06os2 x1ok221b"><span><div><span><span>'
+        f'<a role="link" href="/testpage/posts/{index}"><span dir="ltr">{month}月{day}日 {period}{hour}:{minute:02d}</span></a>'
+        '</span></span></div></span></div></div>'
+        f'<div data-ad-preview="message"><div dir="auto"><div>{text}</div></div></div>'
+        '<div class="x6s0dn4"><span class="xt0b8zv x1jx94hy xrbpyxo xl423tq">'
+        f'<span><span>{rng.randint(0, 5000)}</span></span></span>'
+        '<div><div><span><div><div><div><span>'
+        f'<span class="html-span">{rng.randint(0, 500)}</span>'
+        '</span></div></div></div></span></div></div>'
+        '<div><div><span><div><div><div><span>'
+        f'<span class="html-span">{rng.randint(0, 200)}</span>'
+        '</span></div></div></div></span></div></div></div>'
+        '</div></div>'
+    )
+
+
+def synthetic_feed_html(post_count, seed=0, truncated_ratio=0.1):
+    """產生包含 post_count 篇貼文的合成動態牆頁面"""
+    rng = random.Random(seed)
+    posts = [synthetic_post_html(i, rng, rng.random() < truncated_ratio)
+             for i in range(post_count)]
+    return ("<html><head><title>Facebook</title></head><body>"
+            '<div role="banner"><div class="x9f619">導覽列</div></div>'
+            '<div role="feed">' + "".join(posts) + "</div></body></html>")
+
+
+def time_call(func, repeat=3):
+    """執行 func 多次並返回最快的一次耗時（秒）與其結果"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_post_extraction(post_count=500, repeat=3):
+    """比較逐欄位選擇器與預先編譯擷取計畫的單篇貼文成本"""
+    scraper = FacebookPageScraper("", "")
+    containers = scraper.parse_post_containers(synthetic_feed_html(post_count))
+
+    def run(extract):
+        return [extract(post) for post in containers]
+
+    def strip(posts):
+        return [{k: v for k, v in post.items() if k != "scraped_at"} for post in posts if post]
+
+    selector_time, selector_posts = time_call(
+        lambda: run(scraper.extract_single_post_with_selectors), repeat)
+
+    scraper.extraction_fields = None
+    plan_time, plan_posts = time_call(
+        lambda: run(scraper.extract_single_post), repeat)
+
+    scraper.extraction_fields = ("post_text", "likes", "comments", "shares")
+    projected_time, _ = time_call(
+        lambda: run(scraper.extract_single_post), repeat)
+
+    results = [
+        ("CSS選擇器（原始）", selector_time),
+        ("預編譯單次走訪", plan_time),
+        ("預編譯＋欄位投影（略過時間與連結）", projected_time),
+    ]
+
+    print(f"📊 單篇貼文擷取成本（{len(containers)} 篇，取 {repeat} 次最佳）")
+    for label, elapsed in results:
+        per_post_us = elapsed / max(len(containers), 1) * 1_000_000
+        speedup = selector_time / elapsed if elapsed else float("inf")
+        print(f"  {label:<24} {per_post_us:10.1f} µs/篇  ×{speedup:.2f}")
+
+    identical = strip(selector_posts) == strip(plan_posts)
+    print("✅ 輸出與原始選擇器版本一致" if identical else "❌ 輸出與原始選擇器版本不一致")
+    return results
+
+
+SUITE_SCALES = (10, 100, 1000, 10000)
+
+SUITE_BENCHMARKS = ("extract", "merge_list", "merge_store", "dedupe",
+                    "parse_time", "save_partial", "merge_partial")
+
+# 固定的參考時間，讓時間解析結果與耗時不受執行日期影響
+REFERENCE_TIME = datetime(2024, 6, 15, 12, 0)
+
+
+class SyntheticPageDriver:
+    """只提供 page_source 的假瀏覽器，讓 extract_posts_with_bs 不需要真實瀏覽器"""
+
+    def __init__(self, html):
+        self.page_source = html
+
+    def execute_script(self, script, *args):
+        return None
+
+
+def synthetic_time_strings(count, seed=0):
+    """產生混合各種 Facebook 時間格式的字串"""
+    rng = random.Random(seed)
+    templates = [
+        lambda: f"{rng.randint(1, 59)}分鐘",
+        lambda: f"{rng.randint(1, 23)}小時",
+        lambda: f"{rng.randint(1, 6)}天",
+        lambda: f"昨天 {rng.choice(['上午', '下午'])}{rng.randint(1, 12)}:{rng.randint(0, 59):02d}",
+        lambda: f"{rng.randint(1, 12)}月{rng.randint(1, 28)}日 {rng.choice(['上午', '下午'])}{rng.randint(1, 12)}:{rng.randint(0, 59):02d}",
+        lambda: f"{rng.randint(2015, 2023)}年{rng.randint(1, 12)}月{rng.randint(1, 28)}日",
+        lambda: f"{rng.randint(1, 23)} hrs",
+        lambda: "剛剛",
+    ]
+    return [rng.choice(templates)() for _ in range(count)]
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+@contextlib.contextmanager
+def quiet_output():
+    """暫停爬蟲的記錄輸出與 print，只量測程式本身"""
+    logger = logging.getLogger(ROOT_LOGGER)
+    previous = logger.level
+    logger.setLevel(logging.CRITICAL)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        logger.setLevel(previous)
+
+
+def quiet_scraper():
+    scraper = FacebookPageScraper("", "")
+    scraper.time_parser = FacebookTimeParser(now=lambda: REFERENCE_TIME)
+    return scraper
+
+
+def scroll_windows(posts, window=10, stride=5):
+    """模擬滾動：每輪看到 window 篇貼文，與上一輪重疊 window - stride 篇"""
+    return [posts[start:start + window] for start in range(0, max(len(posts) - stride, 1), stride)]
+
+
+def build_suite_case(name, scale, feed_html, posts):
+    """建立單一基準測試：返回 (setup, run, 處理項目數)，run 接收 setup 的結果"""
+    if name == "extract":
+        def setup():
+            scraper = quiet_scraper()
+            scraper.driver = SyntheticPageDriver(feed_html)
+            return scraper
+        return setup, lambda scraper: scraper.extract_posts_with_bs(incremental=False), scale
+
+    if name in ("merge_list", "merge_store"):
+        windows = scroll_windows(posts)
+
+        def run(scraper):
+            merged = PostStore() if name == "merge_store" else []
+            for window in windows:
+                merged = scraper.smart_merge_posts(merged, window)
+            return merged
+        return quiet_scraper, run, scale
+
+    if name == "dedupe":
+        duplicated = posts + posts
+        return quiet_scraper, lambda scraper: scraper.remove_duplicates(duplicated), len(duplicated)
+
+    if name == "parse_time":
+        strings = synthetic_time_strings(scale)
+
+        def run(scraper):
+            # 每次使用全新的解析引擎，測量未命中快取的成本
+            scraper.time_parser = FacebookTimeParser(now=lambda: REFERENCE_TIME)
+            return [scraper.parse_facebook_time(string) for string in strings]
+        return quiet_scraper, run, scale
+
+    if name in ("save_partial", "merge_partial"):
+        def save_all(scraper):
+            store = PostStore()
+            batch_size = scraper.auto_save_interval
+            for batch_number, start in enumerate(range(0, len(posts), batch_size), 1):
+                store.merge(posts[start:start + batch_size])
+                scraper.save_partial_results(store, batch_number)
+            scraper.close_output_journal()
+            return scraper
+
+        if name == "save_partial":
+            return quiet_scraper, save_all, scale
+
+        return (lambda: save_all(quiet_scraper()),
+                lambda scraper: scraper.merge_partial_files("benchmark_merged.csv"), scale)
+
+    raise ValueError(f"未知的基準測試: {name}")
+
+
+def measure_case(setup, run, repeat, measure_memory=True):
+    """返回 (最快耗時秒數, 尖峰記憶體位元組)；scraper 的輸出訊息不顯示
+
+    measure_memory 為 False 時尖峰記憶體返回 None（tracemalloc 會使大型項目慢數倍）。
+    """
+    best = None
+    with quiet_output():
+        for _ in range(repeat):
+            state = setup()
+            start = time.perf_counter()
+            run(state)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        if not measure_memory:
+            return best, None
+
+        # 記憶體另外量測一次，避免 tracemalloc 的額外成本影響計時
+        state = setup()
+        tracemalloc.start()
+        try:
+            run(state)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def run_suite(scales=SUITE_SCALES, benchmarks=SUITE_BENCHMARKS, repeat=3, seed=0, measure_memory=True):
+    """執行熱點路徑基準測試，返回可保存為基準的結果"""
+    results = {}
+    for scale in scales:
+        feed_html = synthetic_feed_html(scale, seed=seed)
+        with quiet_output():
+            scraper = quiet_scraper()
+            scraper.driver = SyntheticPageDriver(feed_html)
+            posts = scraper.extract_posts_with_bs(incremental=False)
+
+        # 10,000 篇時列表合併等 O(n²) 項目單次就需數秒，只執行一次
+        case_repeat = repeat if scale < 10000 else 1
+        print(f"\n📏 規模 {scale} 篇（取 {case_repeat} 次最佳）")
+        for name in benchmarks:
+            with tempfile.TemporaryDirectory() as directory, working_directory(directory):
+                setup, run, items = build_suite_case(name, scale, feed_html, posts)
+                seconds, peak = measure_case(setup, run, case_repeat, measure_memory)
+            throughput = items / seconds if seconds else float("inf")
+            results[f"{name}@{scale}"] = {
+                "name": name,
+                "scale": scale,
+                "items": items,
+                "seconds": seconds,
+                "throughput": throughput,
+                "peak_bytes": peak,
+            }
+            memory = f"{peak / 1024 / 1024:8.2f} MB" if peak is not None else "     N/A"
+            print(f"  {name:<14} {seconds * 1000:12.2f} ms  {throughput:14,.0f} 項/秒  尖峰記憶體 {memory}")
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "measure_memory": measure_memory,
+        },
+        "results": results,
+    }
+
+
+def compare_results(current, baseline, threshold=0.2, min_seconds=0.001):
+    """比較目前結果與基準，返回退步項目列表
+
+    耗時或尖峰記憶體超過基準 (1 + threshold) 倍即視為退步；
+    耗時差距小於 min_seconds 的項目視為量測雜訊。
+    """
+    regressions = []
+    print(f"\n📊 與基準比較（門檻 {threshold:.0%}）")
+    for key, result in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            print(f"  {key:<22} （基準中沒有此項目）")
+            continue
+
+        time_ratio = result["seconds"] / base["seconds"] if base["seconds"] else 1.0
+        memory_ratio = (result["peak_bytes"] / base["peak_bytes"]
+                        if result["peak_bytes"] is not None and base["peak_bytes"] else 1.0)
+        slower = (time_ratio > 1 + threshold
+                  and result["seconds"] - base["seconds"] > min_seconds)
+        bigger = memory_ratio > 1 + threshold
+        flag = "⚠️ 退步" if slower or bigger else "✅"
+        print(f"  {key:<22} 耗時 ×{time_ratio:5.2f}  記憶體 ×{memory_ratio:5.2f}  {flag}")
+        if slower:
+            regressions.append(f"{key} 耗時 {base['seconds']:.4f}s → {result['seconds']:.4f}s")
+        if bigger:
+            regressions.append(f"{key} 尖峰記憶體 {base['peak_bytes']} → {result['peak_bytes']} bytes")
+
+    if regressions:
+        print(f"❌ 共 {len(regressions)} 項退步：")
+        for regression in regressions:
+            print(f"  {regression}")
+    else:
+        print("✅ 沒有退步")
+    return regressions
+
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_results(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"💾 結果已儲存至: {path}")
+
+
+def bench_browser_modes(email, password, page_url, max_posts=20, use_edge=True):
+    """以相同的粉絲專頁與貼文數，比較一般模式與精簡模式的耗時、傳輸量與記憶體"""
+    results = []
+    for lean in (False, True):
+        label = "精簡模式" if lean else "一般模式"
+        print(f"\n===== {label} =====")
+        scraper = FacebookPageScraper(email, password, use_edge)
+        scraper.lean_mode = lean
+        try:
+            started = time.perf_counter()
+            if not scraper.initialize_driver() or not scraper.login():
+                print(f"❌ {label} 無法啟動瀏覽器或登入，略過")
+                continue
+            login_seconds = time.perf_counter() - started
+
+            scrape_started = time.perf_counter()
+            if not scraper.navigate_to_page(page_url):
+                print(f"❌ {label} 無法前往粉絲專頁，略過")
+                continue
+            posts = scraper.scrape_posts(max_posts)
+            scrape_seconds = time.perf_counter() - scrape_started
+
+            stats = scraper.resource_stats or {}
+            results.append({
+                "mode": label,
+                "posts": len(posts),
+                "login_seconds": login_seconds,
+                "scrape_seconds": scrape_seconds,
+                "requests": stats.get("requests", 0),
+                "transfer_bytes": stats.get("transfer_bytes", 0),
+                "js_heap_bytes": stats.get("js_heap_bytes"),
+                "browser_rss_bytes": browser_memory_bytes(scraper.driver),
+            })
+        finally:
+            scraper.cleanup_partial_files()
+            scraper.close()
+
+    def megabytes(value):
+        return f"{value / 1024 / 1024:8.1f}" if value is not None else "     N/A"
+
+    print(f"\n📊 一般模式與精簡模式比較（{page_url}，目標 {max_posts} 篇）")
+    print("  模式       貼文  登入(秒)  爬取(秒)  請求數  傳輸(MB)  JS堆積(MB)  瀏覽器記憶體(MB)")
+    for result in results:
+        print(f"  {result['mode']:<8} {result['posts']:5d} {result['login_seconds']:9.1f} "
+              f"{result['scrape_seconds']:9.1f} {result['requests']:7d} {megabytes(result['transfer_bytes'])}  "
+              f"{megabytes(result['js_heap_bytes'])}  {megabytes(result['browser_rss_bytes'])}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Facebook 粉絲專頁爬蟲效能基準測試")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    extract_parser = subparsers.add_parser("extract", help="單篇貼文欄位擷取成本")
+    extract_parser.add_argument("--posts", type=int, default=500)
+    extract_parser.add_argument("--repeat", type=int, default=3)
+
+    suite_parser = subparsers.add_parser("suite", help="擷取、合併、去重、時間解析與保存的熱點路徑基準測試")
+    suite_parser.add_argument("--scales", default=",".join(str(scale) for scale in SUITE_SCALES),
+                              help="貼文數規模，以逗號分隔")
+    suite_parser.add_argument("--only", help=f"只執行指定項目，以逗號分隔（{', '.join(SUITE_BENCHMARKS)}）")
+    suite_parser.add_argument("--repeat", type=int, default=3)
+    suite_parser.add_argument("--no-memory", action="store_true",
+                              help="不量測尖峰記憶體（10,000 篇規模可大幅縮短執行時間）")
+    suite_parser.add_argument("--output", help="將結果存成JSON")
+    suite_parser.add_argument("--save-baseline", help="將結果存為基準檔案")
+    suite_parser.add_argument("--compare", help="與基準檔案比較，有退步時以狀態碼 1 結束")
+    suite_parser.add_argument("--threshold", type=float, default=0.2, help="退步門檻（比例）")
+
+    compare_parser = subparsers.add_parser("compare", help="比較兩份結果檔案")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="退步門檻（比例）")
+
+    modes_parser = subparsers.add_parser("browser-modes", help="比較一般模式與精簡模式（需要瀏覽器與帳號）")
+    modes_parser.add_argument("--email", required=True)
+    modes_parser.add_argument("--password", default=os.environ.get("FB_PASSWORD"),
+                              help="Facebook密碼（預設讀取環境變數 FB_PASSWORD，未設定時會詢問）")
+    modes_parser.add_argument("--page-url", required=True)
+    modes_parser.add_argument("--posts", type=int, default=20)
+    modes_parser.add_argument("--chrome", action="store_true", help="使用 Chrome 而非 Edge")
+
+    args = parser.parse_args()
+    if args.command == "extract":
+        bench_post_extraction(args.posts, args.repeat)
+    elif args.command == "suite":
+        scales = [int(scale) for scale in args.scales.split(",") if scale.strip()]
+        benchmarks = args.only.split(",") if args.only else SUITE_BENCHMARKS
+        results = run_suite(scales, benchmarks, args.repeat, measure_memory=not args.no_memory)
+        if args.output:
+            save_results(results, args.output)
+        if args.save_baseline:
+            save_results(results, args.save_baseline)
+        if args.compare and compare_results(results, load_results(args.compare), args.threshold):
+            sys.exit(1)
+    elif args.command == "compare":
+        if compare_results(load_results(args.current), load_results(args.baseline), args.threshold):
+            sys.exit(1)
+    elif args.command == "browser-modes":
+        password = args.password or getpass.getpass("Facebook密碼: ")
+        bench_browser_modes(args.email, password, args.page_url, args.posts, use_edge=not args.chrome)
+
+
+if __name__ == '__main__':
+    main()
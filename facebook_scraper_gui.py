@@ -1,13 +1,33 @@
 import sys
 import os
 import threading
+import logging
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
                             QWidget, QLabel, QLineEdit, QPushButton, QTextEdit, 
                             QProgressBar, QSpinBox, QGroupBox, QMessageBox, 
-                            QComboBox, QCheckBox, QFileDialog, QSplitter)
-from PyQt5.QtCore import QThread, pyqtSignal, Qt
+                            QComboBox, QCheckBox, QFileDialog, QSplitter, QDateEdit)
+from PyQt5.QtCore import QThread, pyqtSignal, Qt, QDate
 from PyQt5.QtGui import QFont, QIcon, QPixmap
 from facebook_fan_page_scraper import FacebookPageScraper
+from facebook_scraper_pool import ScraperWorkerPool
+from facebook_tab_multiplexer import TabMultiplexer
+from facebook_scraper_service import ScraperServiceClient
+from facebook_scraper_metrics import ScrapeMetrics, format_summary
+from facebook_scraper_logging import add_handler, remove_handler
+
+class SignalLogHandler(logging.Handler):
+    """將爬蟲記錄轉交給 Qt 訊號（跨執行緒安全），顯示在執行日誌"""
+    
+    def __init__(self, emit, level=logging.INFO):
+        super().__init__(level)
+        self.emit_message = emit
+        self.setFormatter(logging.Formatter("%(message)s"))
+        
+    def emit(self, record):
+        try:
+            self.emit_message(self.format(record))
+        except Exception:
+            self.handleError(record)
 
 class ScrapingThread(QThread):
     """爬取執行緒"""
@@ -15,18 +35,41 @@ class ScrapingThread(QThread):
     status_updated = pyqtSignal(str)  # 狀態訊息
     scraping_finished = pyqtSignal(bool)  # 爬取完成訊號
     save_status_updated = pyqtSignal(str)  # 自動保存狀態訊號
+    metrics_ready = pyqtSignal(dict)  # 效能統計報告
+    log_message = pyqtSignal(str)  # 爬蟲記錄訊息
     
-    def __init__(self, scraper, page_urls, max_posts):
+    def __init__(self, scraper, page_urls, max_posts, workers=1, service_client=None):
         super().__init__()
         self.scraper = scraper
         self.page_urls = page_urls
         self.max_posts = max_posts
+        self.workers = workers
+        self.service_client = service_client
+        self.pool = None
+        self.multiplexer = None
         self.is_running = False
         
     def run(self):
         """執行爬取作業"""
         self.is_running = True
         
+        # 爬蟲的 INFO 以上記錄（每輪摘要、自動保存、警告）同步顯示在執行日誌
+        log_handler = SignalLogHandler(self.log_message.emit)
+        add_handler(log_handler)
+        try:
+            if self.service_client:
+                self.run_with_service()
+            elif self.workers > 1 and len(self.page_urls) > 1:
+                self.run_parallel()
+            elif self.scraper.tabs_per_browser > 1 and len(self.page_urls) > 1:
+                self.run_tabs()
+            else:
+                self.run_sequential()
+        finally:
+            remove_handler(log_handler)
+    
+    def run_sequential(self):
+        """以單一瀏覽器依序爬取每個粉絲專頁"""
         try:
             # 設定自動保存回調函數
             self.scraper.save_callback = self.save_status_updated.emit
@@ -70,6 +113,139 @@ class ScrapingThread(QThread):
             
             # 儲存所有爬取的貼文
             self.scraper.scraped_posts = all_scraped_posts
+            self.scraper.metrics.finish()
+            self.metrics_ready.emit(self.scraper.metrics.to_dict())
+            
+            if all_scraped_posts:
+                self.status_updated.emit(f"爬取完成！總共爬取 {len(all_scraped_posts)} 篇貼文")
+                self.scraping_finished.emit(True)
+            else:
+                self.status_updated.emit("未爬取到任何貼文")
+                self.scraping_finished.emit(False)
+                
+        except Exception as e:
+            self.status_updated.emit(f"爬取過程發生錯誤: {str(e)}")
+            self.scraping_finished.emit(False)
+    
+    def run_parallel(self):
+        """以多個瀏覽器並行爬取多個粉絲專頁"""
+        try:
+            self.pool = ScraperWorkerPool(
+                self.scraper,
+                workers=self.workers,
+                status_callback=self.status_updated.emit,
+                save_callback=self.save_status_updated.emit
+            )
+            self.status_updated.emit(f"使用 {min(self.workers, len(self.page_urls))} 個瀏覽器並行爬取...")
+            results = self.pool.run(self.page_urls, self.max_posts, progress_callback=self.update_progress)
+            
+            all_scraped_posts = []
+            for page_url, posts in results.items():
+                all_scraped_posts.extend(posts)
+                self.status_updated.emit(f"{page_url}：{len(posts)} 篇貼文")
+            
+            # 彙整所有工作者的資料，讓儲存功能可一併合併
+            self.scraper.scraped_posts = all_scraped_posts
+            self.scraper.partial_files = self.pool.partial_files
+            self.metrics_ready.emit(self.pool.metrics.to_dict())
+            self.pool.close()
+            
+            if all_scraped_posts:
+                self.status_updated.emit(f"爬取完成！總共爬取 {len(all_scraped_posts)} 篇貼文")
+                self.scraping_finished.emit(True)
+            else:
+                self.status_updated.emit("未爬取到任何貼文")
+                self.scraping_finished.emit(False)
+                
+        except Exception as e:
+            self.status_updated.emit(f"爬取過程發生錯誤: {str(e)}")
+            self.scraping_finished.emit(False)
+    
+    def run_tabs(self):
+        """以單一瀏覽器的多個分頁輪流爬取多個粉絲專頁"""
+        try:
+            self.scraper.save_callback = self.save_status_updated.emit
+            
+            self.status_updated.emit("正在初始化瀏覽器...")
+            if not self.scraper.initialize_driver():
+                self.status_updated.emit("瀏覽器初始化失敗")
+                self.scraping_finished.emit(False)
+                return
+            
+            self.status_updated.emit("正在登入Facebook...")
+            if not self.scraper.login():
+                self.status_updated.emit("Facebook登入失敗")
+                self.scraping_finished.emit(False)
+                return
+            
+            self.multiplexer = TabMultiplexer(
+                self.scraper,
+                status_callback=self.status_updated.emit,
+                save_callback=self.save_status_updated.emit
+            )
+            self.status_updated.emit(f"使用同一個瀏覽器的 {min(self.multiplexer.max_tabs, len(self.page_urls))} 個分頁輪流爬取...")
+            results = self.multiplexer.run(self.page_urls, self.max_posts, progress_callback=self.update_progress)
+            
+            all_scraped_posts = []
+            for page_url, posts in results.items():
+                all_scraped_posts.extend(posts)
+                self.status_updated.emit(f"{page_url}：{len(posts)} 篇貼文")
+            
+            self.scraper.scraped_posts = all_scraped_posts
+            self.scraper.partial_files = self.multiplexer.partial_files
+            self.metrics_ready.emit(self.multiplexer.metrics.to_dict())
+            
+            if all_scraped_posts:
+                self.status_updated.emit(f"爬取完成！總共爬取 {len(all_scraped_posts)} 篇貼文")
+                self.scraping_finished.emit(True)
+            else:
+                self.status_updated.emit("未爬取到任何貼文")
+                self.scraping_finished.emit(False)
+                
+        except Exception as e:
+            self.status_updated.emit(f"爬取過程發生錯誤: {str(e)}")
+            self.scraping_finished.emit(False)
+    
+    def run_with_service(self):
+        """將爬取工作交給本機常駐服務（瀏覽器已登入待命）"""
+        try:
+            if not self.service_client.is_available():
+                self.status_updated.emit("無法連線至本機爬取服務，請先執行 python facebook_scraper_service.py serve")
+                self.scraping_finished.emit(False)
+                return
+            
+            all_scraped_posts = []
+            partial_files = []
+            job_metrics = []
+            for i, page_url in enumerate(self.page_urls):
+                if not self.is_running:
+                    break
+                
+                self.status_updated.emit(f"正在爬取第 {i+1}/{len(self.page_urls)} 個粉絲專頁（常駐服務）...")
+                job_id = self.service_client.submit(page_url, self.max_posts,
+                                                    self.scraper.post_since, self.scraper.post_until)
+                job = self.service_client.wait(
+                    job_id,
+                    progress_callback=self.update_progress,
+                    should_stop=lambda: not self.is_running
+                )
+                
+                if job["status"] == "failed":
+                    self.status_updated.emit(f"爬取粉絲專頁 {page_url} 失敗: {job['error']}")
+                    continue
+                
+                all_scraped_posts.extend(job["posts"])
+                partial_files.extend(job["partial_files"])
+                if job.get("metrics"):
+                    job_metrics.append(ScrapeMetrics.from_dict(job["metrics"]))
+                first_post = job["time_to_first_post"]
+                latency = f"，首篇貼文 {first_post:.1f} 秒" if first_post is not None else ""
+                self.status_updated.emit(f"已完成第 {i+1} 個粉絲專頁，共爬取 {len(job['posts'])} 篇貼文{latency}")
+            
+            self.scraper.scraped_posts = all_scraped_posts
+            self.scraper.partial_files = partial_files
+            if job_metrics:
+                self.metrics_ready.emit(ScrapeMetrics.combine(job_metrics).to_dict())
             
             if all_scraped_posts:
                 self.status_updated.emit(f"爬取完成！總共爬取 {len(all_scraped_posts)} 篇貼文")
@@ -89,6 +265,11 @@ class ScrapingThread(QThread):
     def stop(self):
         """停止爬取"""
         self.is_running = False
+        if self.pool:
+            self.pool.stop()
+            self.pool.close()
+        if self.multiplexer:
+            self.multiplexer.stop()
         if hasattr(self, 'scraper') and self.scraper:
             self.scraper.stop_scraping_process()
             # 立即嘗試關閉瀏覽器以加速停止過程
@@ -184,6 +365,58 @@ class FacebookScraperGUI(QMainWindow):
         posts_layout.addStretch()
         settings_layout.addLayout(posts_layout)
         
+        # 並行瀏覽器數量
+        workers_layout = QHBoxLayout()
+        workers_layout.addWidget(QLabel("並行瀏覽器數量:"))
+        self.workers_spinbox = QSpinBox()
+        self.workers_spinbox.setMinimum(1)
+        self.workers_spinbox.setMaximum(8)
+        self.workers_spinbox.setValue(1)
+        self.workers_spinbox.setToolTip("多個粉絲專頁時同時開啟多個瀏覽器爬取，共用同一份登入狀態")
+        workers_layout.addWidget(self.workers_spinbox)
+        workers_layout.addWidget(QLabel("每個瀏覽器分頁數:"))
+        self.tabs_spinbox = QSpinBox()
+        self.tabs_spinbox.setMinimum(1)
+        self.tabs_spinbox.setMaximum(8)
+        self.tabs_spinbox.setValue(1)
+        self.tabs_spinbox.setToolTip("只開一個瀏覽器，以多個分頁輪流爬取多個粉絲專頁（並行瀏覽器數量為 1 時使用），比每個專頁一個瀏覽器省記憶體")
+        workers_layout.addWidget(self.tabs_spinbox)
+        workers_layout.addStretch()
+        settings_layout.addLayout(workers_layout)
+        
+        # 精簡模式
+        self.lean_checkbox = QCheckBox("精簡模式（背景執行，不載入圖片、影片與字型）")
+        self.lean_checkbox.setToolTip("節省頻寬與記憶體，適合同時開啟多個瀏覽器；不會顯示瀏覽器視窗")
+        settings_layout.addWidget(self.lean_checkbox)
+        
+        # 增量爬取
+        self.since_last_run_checkbox = QCheckBox("只爬取上次之後的新貼文（遇到已爬取過的貼文即停止）")
+        self.since_last_run_checkbox.setToolTip("每個粉絲專頁保存已爬取貼文的檢查點，適合每天定期更新")
+        settings_layout.addWidget(self.since_last_run_checkbox)
+        
+        # 日期範圍
+        date_layout = QHBoxLayout()
+        self.date_range_checkbox = QCheckBox("只爬取日期範圍內的貼文:")
+        self.date_range_checkbox.setToolTip("捲動到早於開始日期的貼文即停止，範圍外的貼文不展開「查看更多」")
+        date_layout.addWidget(self.date_range_checkbox)
+        self.since_date_edit = QDateEdit(QDate.currentDate().addDays(-7))
+        self.until_date_edit = QDateEdit(QDate.currentDate())
+        for date_edit in (self.since_date_edit, self.until_date_edit):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("yyyy-MM-dd")
+            date_edit.setEnabled(False)
+            self.date_range_checkbox.toggled.connect(date_edit.setEnabled)
+        date_layout.addWidget(self.since_date_edit)
+        date_layout.addWidget(QLabel("至"))
+        date_layout.addWidget(self.until_date_edit)
+        date_layout.addStretch()
+        settings_layout.addLayout(date_layout)
+        
+        # 本機常駐服務
+        self.service_checkbox = QCheckBox("使用本機常駐服務（瀏覽器已登入待命，省去啟動與登入時間）")
+        self.service_checkbox.setToolTip("需先執行 python facebook_scraper_service.py serve")
+        settings_layout.addWidget(self.service_checkbox)
+        
         splitter.addWidget(settings_group)
         
         # === 控制按鈕區域 ===
@@ -234,8 +467,27 @@ class FacebookScraperGUI(QMainWindow):
         
         splitter.addWidget(log_group)
         
+        # === 效能摘要區域 ===
+        metrics_group = QGroupBox("效能摘要")
+        metrics_layout = QVBoxLayout(metrics_group)
+        
+        self.metrics_text = QTextEdit()
+        self.metrics_text.setReadOnly(True)
+        self.metrics_text.setMaximumHeight(150)
+        self.metrics_text.setFont(QFont("Consolas", 9))
+        self.metrics_text.setPlaceholderText("爬取完成後顯示各階段耗時與瀏覽器指令統計")
+        metrics_layout.addWidget(self.metrics_text)
+        
+        self.export_metrics_button = QPushButton("匯出效能報告")
+        self.export_metrics_button.clicked.connect(self.export_metrics)
+        self.export_metrics_button.setEnabled(False)
+        metrics_layout.addWidget(self.export_metrics_button, alignment=Qt.AlignRight)
+        self.metrics_report = None
+        
+        splitter.addWidget(metrics_group)
+        
         # 設定分割器比例
-        splitter.setSizes([150, 180, 120, 150])
+        splitter.setSizes([150, 180, 120, 150, 120])
         
         # 初始化狀態
         self.log("歡迎使用 Facebook 粉絲專頁爬蟲工具！")
@@ -258,6 +510,13 @@ class FacebookScraperGUI(QMainWindow):
         
     def validate_inputs(self):
         """驗證輸入資料"""
+        # 常駐服務已自行登入，不需要帳號密碼
+        if self.service_checkbox.isChecked():
+            if not self.urls_input.toPlainText().strip():
+                QMessageBox.warning(self, "警告", "請輸入至少一個粉絲專頁網址")
+                return False
+            return self.validate_date_range()
+            
         if not self.email_input.text().strip():
             QMessageBox.warning(self, "警告", "請輸入 Facebook Email")
             return False
@@ -270,6 +529,13 @@ class FacebookScraperGUI(QMainWindow):
             QMessageBox.warning(self, "警告", "請輸入至少一個粉絲專頁網址")
             return False
             
+        return self.validate_date_range()
+        
+    def validate_date_range(self):
+        """日期範圍的開始日期不可晚於結束日期"""
+        if self.date_range_checkbox.isChecked() and self.since_date_edit.date() > self.until_date_edit.date():
+            QMessageBox.warning(self, "警告", "開始日期不可晚於結束日期")
+            return False
         return True
         
     def get_page_urls(self):
@@ -302,14 +568,25 @@ class FacebookScraperGUI(QMainWindow):
         password = self.password_input.text().strip()
         use_edge = self.browser_combo.currentIndex() == 0
         max_posts = self.posts_spinbox.value()
+        workers = self.workers_spinbox.value()
+        
+        service_client = ScraperServiceClient() if self.service_checkbox.isChecked() else None
         
         self.scraper = FacebookPageScraper(email, password, use_edge)
+        self.scraper.lean_mode = self.lean_checkbox.isChecked()
+        self.scraper.tabs_per_browser = self.tabs_spinbox.value()
+        self.scraper.since_last_run = self.since_last_run_checkbox.isChecked()
+        if self.date_range_checkbox.isChecked():
+            self.scraper.post_since = self.since_date_edit.date().toPyDate()
+            self.scraper.post_until = self.until_date_edit.date().toPyDate()
         
         # 創建並啟動爬取執行緒
-        self.scraping_thread = ScrapingThread(self.scraper, page_urls, max_posts)
+        self.scraping_thread = ScrapingThread(self.scraper, page_urls, max_posts, workers, service_client)
         self.scraping_thread.progress_updated.connect(self.update_progress)
         self.scraping_thread.status_updated.connect(self.log)
         self.scraping_thread.save_status_updated.connect(self.log_save_status)
+        self.scraping_thread.metrics_ready.connect(self.show_metrics)
+        self.scraping_thread.log_message.connect(self.log)
         self.scraping_thread.scraping_finished.connect(self.scraping_finished)
         
         # 更新UI狀態
@@ -317,6 +594,9 @@ class FacebookScraperGUI(QMainWindow):
         self.stop_button.setEnabled(True)
         self.save_button.setEnabled(False)
         self.progress_bar.setValue(0)
+        self.metrics_text.clear()
+        self.metrics_report = None
+        self.export_metrics_button.setEnabled(False)
         
         self.log("開始爬取作業...")
         self.scraping_thread.start()
@@ -340,6 +620,36 @@ class FacebookScraperGUI(QMainWindow):
         self.progress_bar.setValue(int(progress))
         self.progress_label.setText(f"已爬取 {count} 篇貼文 ({progress:.1f}%)")
         
+    def show_metrics(self, report):
+        """在效能摘要區域顯示本次爬取的統計"""
+        self.metrics_report = report
+        self.metrics_text.setPlainText("\n".join(format_summary(report)))
+        self.export_metrics_button.setEnabled(True)
+        
+    def export_metrics(self):
+        """將效能統計匯出為 JSON 報告或 Prometheus 文字格式"""
+        if not self.metrics_report:
+            return
+        
+        default_filename = f"facebook_metrics_{self.get_current_time().replace(':', '')}.json"
+        filename, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "匯出效能報告",
+            default_filename,
+            "JSON 報告 (*.json);;Prometheus 文字格式 (*.prom)"
+        )
+        
+        if filename:
+            try:
+                metrics = ScrapeMetrics.from_dict(self.metrics_report)
+                if filename.endswith(".prom") or "Prometheus" in selected_filter:
+                    metrics.save_prometheus(filename)
+                else:
+                    metrics.save_report(filename)
+                self.log(f"📊 效能報告已匯出至: {filename}")
+            except Exception as e:
+                QMessageBox.critical(self, "錯誤", f"匯出效能報告時發生錯誤:\n{str(e)}")
+        
     def scraping_finished(self, success):
         """爬取完成處理"""
         # 更新UI狀態
@@ -403,14 +713,19 @@ class FacebookScraperGUI(QMainWindow):
         if has_partial_files:
             default_filename = f"facebook_posts_merged_{self.get_current_time().replace(':', '')}.csv"
             
-        filename, _ = QFileDialog.getSaveFileName(
+        filename, selected_filter = QFileDialog.getSaveFileName(
             self, 
             "儲存爬取結果", 
             default_filename,
-            "CSV files (*.csv)"
+            "CSV files (*.csv);;Parquet (*.parquet);;Arrow IPC (*.arrow)"
         )
         
         if filename:
+            # 依選擇的格式補上副檔名，存檔時依副檔名決定格式
+            if "Parquet" in selected_filter and not filename.endswith(".parquet"):
+                filename = os.path.splitext(filename)[0] + ".parquet"
+            elif "Arrow" in selected_filter and not filename.endswith(".arrow"):
+                filename = os.path.splitext(filename)[0] + ".arrow"
             try:
                 if has_partial_files:
                     # 如果有部分檔案，使用合併功能
@@ -0,0 +1,167 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+
+
+ROOT_LOGGER = "facebook_scraper"
+
+# 預設等級可用環境變數 FB_SCRAPER_LOG_LEVEL 調整（例如 DEBUG 可看到每次合併、點擊的細節）
+DEFAULT_LEVEL = os.environ.get("FB_SCRAPER_LOG_LEVEL", "INFO").upper()
+
+# 相同的警告與錯誤訊息（以格式字串區分）在 interval 秒內最多輸出 burst 則
+DEFAULT_RATE_LIMIT = (5, 10.0)
+
+# LogRecord 內建的屬性，其餘屬性視為 extra 傳入的結構化欄位
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_state = {'listener': None, 'queue_handler': None}
+_lock = threading.Lock()
+
+
+class RateLimitFilter(logging.Filter):
+    """依格式字串限制相同訊息的輸出頻率
+
+    例如每篇貼文都可能發生的擷取錯誤，在 interval 秒內只輸出前 burst 則，
+    之後下一則輸出時附上略過的數量。只限制 level 以上的記錄（預設為警告與錯誤），
+    傳入 extra={'rate_limit': False} 可不受限制。
+    """
+
+    def __init__(self, burst=DEFAULT_RATE_LIMIT[0], interval=DEFAULT_RATE_LIMIT[1], level=logging.WARNING):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.level = level
+        self._windows = {}  # {(logger, 等級, 格式字串): [視窗開始時間, 已輸出數, 已略過數]}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < self.level or not getattr(record, 'rate_limit', True):
+            return True
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                    record.msg = f"{record.msg}（另有 {suppressed} 則相同訊息已略過）"
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+class JsonLogFormatter(logging.Formatter):
+    """每則記錄輸出一行 JSON，包含 extra 傳入的結構化欄位（例如每輪捲動摘要的數值）"""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key != 'rate_limit':
+                data[key] = value if isinstance(value, (bool, int, float, str, type(None))) else str(value)
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+def setup_logging(level=None, stream=None, json_path=None, rate_limit=DEFAULT_RATE_LIMIT,
+                  fmt="%(message)s", handlers=None):
+    """設定爬蟲的記錄輸出（可重複呼叫，會取代之前的設定）
+
+    呼叫端只把記錄放入佇列，由背景執行緒寫入終端機或檔案，長時間爬取時 I/O 不會拖慢爬取迴圈。
+    :param level: 記錄等級（預設 INFO，或環境變數 FB_SCRAPER_LOG_LEVEL）
+    :param stream: 終端機輸出，None 表示 sys.stdout；False 表示不輸出到終端機
+    :param json_path: 另外以 JSON Lines 格式寫入的檔案
+    :param rate_limit: (burst, interval)，None 表示不限制
+    :param handlers: 額外的 logging.Handler（例如圖形界面的日誌區域）
+    """
+    shutdown_logging()
+
+    output_handlers = []
+    if stream is not False:
+        console = logging.StreamHandler(stream or sys.stdout)
+        console.setFormatter(logging.Formatter(fmt))
+        output_handlers.append(console)
+    if json_path:
+        json_handler = logging.FileHandler(json_path, encoding='utf-8')
+        json_handler.setFormatter(JsonLogFormatter())
+        output_handlers.append(json_handler)
+    output_handlers.extend(handlers or [])
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    if rate_limit:
+        queue_handler.addFilter(RateLimitFilter(*rate_limit))
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(level or DEFAULT_LEVEL)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    listener = logging.handlers.QueueListener(log_queue, *output_handlers, respect_handler_level=True)
+    listener.start()
+    with _lock:
+        _state['listener'] = listener
+        _state['queue_handler'] = queue_handler
+    return listener
+
+
+def shutdown_logging():
+    """輸出佇列中剩餘的記錄並停止背景執行緒"""
+    with _lock:
+        listener, queue_handler = _state['listener'], _state['queue_handler']
+        _state['listener'] = _state['queue_handler'] = None
+    if queue_handler is not None:
+        logging.getLogger(ROOT_LOGGER).removeHandler(queue_handler)
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.flush()
+
+
+def add_handler(handler):
+    """在目前的設定加上一個輸出（例如圖形界面的日誌區域）"""
+    ensure_logging()
+    listener = _state['listener']
+    listener.handlers = listener.handlers + (handler,)
+
+
+def remove_handler(handler):
+    listener = _state['listener']
+    if listener is not None:
+        listener.handlers = tuple(h for h in listener.handlers if h is not handler)
+
+
+def set_level(level):
+    logging.getLogger(ROOT_LOGGER).setLevel(level)
+
+
+def ensure_logging():
+    """尚未設定時以預設值設定（INFO 等級輸出到終端機）"""
+    if _state['listener'] is None:
+        setup_logging()
+
+
+def get_logger(name):
+    """取得爬蟲的子記錄器，例如 get_logger("scraper") → facebook_scraper.scraper"""
+    ensure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,521 @@
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# 延遲直方圖的上界（秒），與 Prometheus 的 le 標籤相同，最後一格為 +Inf
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 爬取階段（同名階段巢狀呼叫時只計算最外層；不同階段則各自計時，例如 navigate 包含 overlay）
+PHASES = ("navigate", "overlay", "scroll", "click", "page_source", "browser_extract",
+          "network_capture", "parse", "merge", "csv")
+
+# 已知腳本的名稱，讓 execute_script 依腳本分開統計（其餘腳本記為 inline）
+SCRIPT_LABELS = {}
+
+
+def register_scripts(labels):
+    """登記 {名稱: 腳本內容}，InstrumentedDriver 會以名稱區分各腳本的延遲"""
+    for label, script in labels.items():
+        SCRIPT_LABELS[script] = label
+
+
+def script_label(script):
+    label = SCRIPT_LABELS.get(script)
+    if label:
+        return label
+    if script.lstrip().startswith("window.scrollBy"):
+        return "scrollBy"
+    return "inline"
+
+
+def payload_bytes(value):
+    """腳本回傳的字串（或字串列表）的 UTF-8 位元組數，其他型別記為 0"""
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, (list, tuple)):
+        return sum(len(item.encode('utf-8')) for item in value if isinstance(item, str))
+    return 0
+
+
+def escape_label(value):
+    """Prometheus 標籤值的跳脫（反斜線、雙引號與換行）"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class LatencyHistogram:
+    """固定上界的延遲直方圖（累計格式與 Prometheus 相同）"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 最後一格為超過所有上界
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other):
+        for i, value in enumerate(other.counts):
+            self.counts[i] += value
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        """以所在區間的上界估計分位數（超過所有上界時返回最大值）"""
+        if self.count == 0:
+            return 0.0
+        threshold = q * self.count
+        cumulative = 0
+        for i, value in enumerate(self.counts):
+            cumulative += value
+            if cumulative >= threshold:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'max': round(self.max, 6),
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': list(self.buckets),
+            'counts': list(self.counts),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data['buckets'])
+        histogram.counts = list(data['counts'])
+        histogram.count = data['count']
+        histogram.sum = data['sum']
+        histogram.max = data['max']
+        return histogram
+
+
+class ScrapeMetrics:
+    """一次爬取的效能統計：各階段耗時、WebDriver 指令次數與延遲、傳輸位元組
+
+    可輸出為 JSON 報告（to_dict / save_report）或 Prometheus 文字格式（to_prometheus）。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        """清除統計，開始新的一次爬取"""
+        with self._lock:
+            self.started_at = datetime.now()
+            self._started = time.perf_counter()
+            self._finished = None
+            self.phases = {}  # {階段: LatencyHistogram}
+            self.commands = {}  # {(指令, 腳本名稱): LatencyHistogram}
+            self.errors = {}  # {(指令, 腳本名稱): 失敗次數}
+            self.counters = {}  # {名稱: 數值}
+
+    @contextmanager
+    def phase(self, name):
+        """計時一個爬取階段；同名階段巢狀呼叫時只計算最外層"""
+        active = getattr(self._local, 'active', None)
+        if active is None:
+            active = self._local.active = set()
+        if name in active:
+            yield
+            return
+        active.add(name)
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            active.discard(name)
+            self.observe_phase(name, time.perf_counter() - started_at)
+
+    def observe_phase(self, name, seconds):
+        with self._lock:
+            self.phases.setdefault(name, LatencyHistogram()).observe(seconds)
+
+    def record_command(self, command, script, seconds, error=False):
+        key = (command, script or "")
+        with self._lock:
+            self.commands.setdefault(key, LatencyHistogram()).observe(seconds)
+            if error:
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def finish(self):
+        """記錄爬取結束時間，之後報告的總耗時不再增加"""
+        self._finished = time.perf_counter()
+
+    @property
+    def _ended(self):
+        return self._finished if self._finished is not None else time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return self._ended - self._started
+
+    def merge(self, other):
+        """併入另一份統計（例如並行工作者各自的統計）"""
+        with self._lock:
+            for name, histogram in other.phases.items():
+                self.phases.setdefault(name, LatencyHistogram(histogram.buckets)).merge(histogram)
+            for key, histogram in other.commands.items():
+                self.commands.setdefault(key, LatencyHistogram(histogram.buckets)).merge(histogram)
+            for key, value in other.errors.items():
+                self.errors[key] = self.errors.get(key, 0) + value
+            for name, value in other.counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            ended = max(self._ended, other._ended)
+            self._started = min(self._started, other._started)
+            self._finished = ended
+            self.started_at = min(self.started_at, other.started_at)
+        return self
+
+    @classmethod
+    def combine(cls, metrics_list):
+        """合併多份統計，總耗時為最早開始到最晚結束"""
+        metrics_list = [metrics for metrics in metrics_list if metrics is not None]
+        combined = cls()
+        if metrics_list:
+            first = metrics_list[0]
+            combined.started_at, combined._started, combined._finished = first.started_at, first._started, first._ended
+        for metrics in metrics_list:
+            combined.merge(metrics)
+        return combined
+
+    def to_dict(self):
+        """JSON 報告內容"""
+        with self._lock:
+            return {
+                'started_at': self.started_at.isoformat(),
+                'elapsed_seconds': round(self.elapsed, 3),
+                'phases': {name: histogram.to_dict() for name, histogram in self.phases.items()},
+                'commands': [
+                    dict(histogram.to_dict(), command=command, script=script,
+                         errors=self.errors.get((command, script), 0))
+                    for (command, script), histogram in sorted(self.commands.items())
+                ],
+                'counters': dict(self.counters),
+            }
+
+    @classmethod
+    def from_dict(cls, report):
+        """由 JSON 報告還原（例如常駐服務回傳的統計），以便合併或輸出"""
+        metrics = cls()
+        metrics.started_at = datetime.fromisoformat(report['started_at'])
+        metrics._finished = time.perf_counter()
+        metrics._started = metrics._finished - report.get('elapsed_seconds', 0)
+        metrics.phases = {name: LatencyHistogram.from_dict(data) for name, data in report['phases'].items()}
+        for data in report['commands']:
+            key = (data['command'], data['script'])
+            metrics.commands[key] = LatencyHistogram.from_dict(data)
+            if data.get('errors'):
+                metrics.errors[key] = data['errors']
+        metrics.counters = dict(report.get('counters', {}))
+        return metrics
+
+    def save_report(self, filename=None, extra=None):
+        """將統計存成 JSON 報告，返回檔名
+        :param extra: 額外寫入報告的資訊（例如粉絲專頁網址、貼文數）
+        """
+        if not filename:
+            filename = f"facebook_metrics_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json"
+        report = self.to_dict()
+        if extra:
+            report.update(extra)
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return filename
+
+    def to_prometheus(self, prefix="facebook_scraper", labels=None):
+        """Prometheus 文字格式（可由 node_exporter textfile collector 或 /metrics 端點提供）"""
+        def format_labels(values):
+            merged = dict(labels or {}, **values)
+            if not merged:
+                return ""
+            return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in merged.items()) + "}"
+
+        def histogram_lines(name, histogram, values):
+            lines = []
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{format_labels(dict(values, le=repr(float(bound))))} {cumulative}")
+            lines.append(f"{name}_bucket{format_labels(dict(values, le='+Inf'))} {histogram.count}")
+            lines.append(f"{name}_sum{format_labels(values)} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{format_labels(values)} {histogram.count}")
+            return lines
+
+        with self._lock:
+            lines = [
+                f"# HELP {prefix}_phase_seconds 爬取各階段耗時",
+                f"# TYPE {prefix}_phase_seconds histogram",
+            ]
+            for name, histogram in sorted(self.phases.items()):
+                lines.extend(histogram_lines(f"{prefix}_phase_seconds", histogram, {'phase': name}))
+
+            lines += [
+                f"# HELP {prefix}_webdriver_command_seconds WebDriver 指令延遲",
+                f"# TYPE {prefix}_webdriver_command_seconds histogram",
+            ]
+            for (command, script), histogram in sorted(self.commands.items()):
+                lines.extend(histogram_lines(f"{prefix}_webdriver_command_seconds", histogram,
+                                             {'command': command, 'script': script}))
+
+            lines += [
+                f"# HELP {prefix}_webdriver_command_errors_total WebDriver 指令失敗次數",
+                f"# TYPE {prefix}_webdriver_command_errors_total counter",
+            ]
+            for (command, script), value in sorted(self.errors.items()):
+                lines.append(f"{prefix}_webdriver_command_errors_total"
+                             f"{format_labels({'command': command, 'script': script})} {value}")
+
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines.append(f"{prefix}_{name}_total{format_labels({})} {value}")
+        return "\n".join(lines) + "\n"
+
+    def save_prometheus(self, filename, labels=None):
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus(labels=labels))
+        return filename
+
+    def summary_lines(self, top_commands=5):
+        """簡短的文字摘要（終端機與圖形界面共用）"""
+        return format_summary(self.to_dict(), top_commands)
+
+
+def format_summary(report, top_commands=5):
+    """將 JSON 報告整理成數行文字：各階段耗時占比、最耗時的指令與傳輸量"""
+    elapsed = report.get('elapsed_seconds') or 0
+    lines = [f"總耗時 {elapsed:.1f} 秒"]
+    phases = sorted(report['phases'].items(), key=lambda item: item[1]['sum'], reverse=True)
+    for name, data in phases:
+        share = f"（{data['sum'] / elapsed * 100:.0f}%）" if elapsed else ""
+        lines.append(f"  {name:<15} {data['sum']:8.2f} 秒{share}  {data['count']} 次，p95 {data['p95']} 秒")
+
+    commands = sorted(report['commands'], key=lambda item: item['sum'], reverse=True)
+    total_commands = sum(item['count'] for item in commands)
+    if commands:
+        lines.append(f"WebDriver 指令 {total_commands} 次：")
+    for data in commands[:top_commands]:
+        label = f"{data['command']}[{data['script']}]" if data['script'] else data['command']
+        errors = f"，失敗 {data['errors']} 次" if data.get('errors') else ""
+        lines.append(f"  {label:<32} {data['count']} 次，共 {data['sum']:.2f} 秒，p95 {data['p95']} 秒{errors}")
+
+    counters = report.get('counters', {})
+    if counters.get('page_source_bytes') or counters.get('script_result_bytes'):
+        lines.append(f"傳輸：page_source {format_bytes(counters.get('page_source_bytes', 0))}"
+                     f"（{counters.get('page_source_calls', 0)} 次），"
+                     f"腳本回傳 {format_bytes(counters.get('script_result_bytes', 0))}")
+    return lines
+
+
+def format_bytes(size):
+    if size >= 1024 * 1024:
+        return f"{size / 1024 / 1024:.1f} MB"
+    return f"{size / 1024:.1f} KB"
+
+
+def measure_phase(name):
+    """方法裝飾器：以 self.metrics 計時整個方法（self.metrics 為 None 時不計時）"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metrics = getattr(self, 'metrics', None)
+            if metrics is None:
+                return method(self, *args, **kwargs)
+            with metrics.phase(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def browser_memory_bytes(driver):
+    """瀏覽器所有行程（驅動程式行程及其子行程）的記憶體用量（RSS），需要 psutil，無法取得時返回 None"""
+    try:
+        import psutil
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+        return sum(proc.memory_info().rss for proc in processes)
+    except Exception:
+        return None
+
+
+def is_instrumented(driver):
+    """driver 或其包裝的 driver 是否已是 InstrumentedDriver"""
+    while driver is not None:
+        if isinstance(driver, InstrumentedDriver):
+            return True
+        driver = driver.__dict__.get('_driver') if hasattr(driver, '__dict__') else None
+    return False
+
+
+# Selenium 指令名稱（WebDriver.execute 的 driver_command）對應到報告中的指令名稱，
+# 其餘指令（clickElement、actions、getCurrentUrl 等）轉為 snake_case
+WEBDRIVER_COMMAND_NAMES = {
+    "executeScript": "execute_script",
+    "w3cExecuteScript": "execute_script",
+    "executeAsyncScript": "execute_async_script",
+    "w3cExecuteScriptAsync": "execute_async_script",
+    "getPageSource": "page_source",
+    "executeCdpCommand": "execute_cdp_cmd",
+    "getAllCookies": "get_cookies",
+    "getCookies": "get_cookies",
+}
+
+
+def webdriver_command_name(driver_command):
+    name = WEBDRIVER_COMMAND_NAMES.get(driver_command)
+    if name is None:
+        name = "".join("_" + char.lower() if char.isupper() else char for char in driver_command)
+        WEBDRIVER_COMMAND_NAMES[driver_command] = name
+    return name
+
+
+def webdriver_command_label(command, params):
+    """指令的第二層名稱：腳本名稱、CDP 方法或記錄類型"""
+    if not params:
+        return None
+    if command in ("execute_script", "execute_async_script"):
+        return script_label(params.get("script", ""))
+    if command == "execute_cdp_cmd":
+        return params.get("cmd")
+    if command == "get_log":
+        return params.get("type")
+    return None
+
+
+class CommandTimer:
+    """取代 WebDriver 實例的 execute（所有指令的唯一出口），記錄每個指令的次數與延遲
+
+    ActionChains.perform、WebElement.click / is_displayed、current_url、switch_to 等
+    不經過 InstrumentedDriver 方法的指令也會經過這裡。同一個瀏覽器只安裝一次；
+    多個 InstrumentedDriver 共用同一個瀏覽器時（分頁多工），記錄到最近一個使用中的統計。
+    """
+
+    def __init__(self, driver):
+        self._execute = driver.execute
+        self.metrics = None
+        driver.execute = self
+
+    @classmethod
+    def install(cls, driver):
+        """為最內層（實際送出指令）的 WebDriver 安裝計時器，沒有 execute 的替身驅動程式返回 None"""
+        while '_driver' in getattr(driver, '__dict__', {}):
+            driver = driver.__dict__['_driver']
+        execute = getattr(driver, 'execute', None)
+        if isinstance(execute, cls):
+            return execute
+        if not callable(execute):
+            return None
+        return cls(driver)
+
+    def __call__(self, driver_command, params=None):
+        metrics = self.metrics
+        if metrics is None:
+            return self._execute(driver_command, params)
+        command = webdriver_command_name(driver_command)
+        label = webdriver_command_label(command, params)
+        started_at = time.perf_counter()
+        try:
+            response = self._execute(driver_command, params)
+        except Exception:
+            metrics.record_command(command, label, time.perf_counter() - started_at, error=True)
+            raise
+        metrics.record_command(command, label, time.perf_counter() - started_at)
+        return response
+
+
+class InstrumentedDriver:
+    """包裝 WebDriver，記錄每個指令的次數、延遲與 page_source 傳輸量
+
+    指令的延遲在 WebDriver.execute 計時（CommandTimer），因此透過元素、ActionChains 或
+    直接轉交的屬性送出的指令也會計入；沒有 execute 的替身驅動程式（重播、測試）改為在本類別的方法計時。
+    其餘屬性與方法直接轉交給原本的 WebDriver。
+    """
+
+    def __init__(self, driver, metrics):
+        self._driver = driver
+        self.metrics = metrics
+        self._timer = CommandTimer.install(driver)
+
+    def __getattr__(self, name):
+        timer = self.__dict__.get('_timer')
+        if timer is not None:
+            timer.metrics = self.metrics
+        return getattr(self._driver, name)
+
+    def _call(self, command, script, function, *args, **kwargs):
+        if self._timer is not None:
+            self._timer.metrics = self.metrics
+            return function(*args, **kwargs)
+        started_at = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        except Exception:
+            self.metrics.record_command(command, script, time.perf_counter() - started_at, error=True)
+            raise
+        self.metrics.record_command(command, script, time.perf_counter() - started_at)
+        return result
+
+    @property
+    def page_source(self):
+        source = self._call("page_source", None, lambda: self._driver.page_source)
+        self.metrics.increment("page_source_calls")
+        self.metrics.increment("page_source_bytes", payload_bytes(source))
+        return source
+
+    def execute_script(self, script, *args):
+        result = self._call("execute_script", script_label(script), self._driver.execute_script, script, *args)
+        transferred = payload_bytes(result)
+        if transferred:
+            self.metrics.increment("script_result_bytes", transferred)
+        return result
+
+    def execute_async_script(self, script, *args):
+        return self._call("execute_async_script", script_label(script),
+                          self._driver.execute_async_script, script, *args)
+
+    def execute_cdp_cmd(self, cmd, params):
+        return self._call("execute_cdp_cmd", cmd, self._driver.execute_cdp_cmd, cmd, params)
+
+    def get_log(self, log_type):
+        return self._call("get_log", log_type, self._driver.get_log, log_type)
+
+    def get(self, url):
+        return self._call("get", None, self._driver.get, url)
+
+    def find_element(self, *args, **kwargs):
+        return self._call("find_element", None, self._driver.find_element, *args, **kwargs)
+
+    def find_elements(self, *args, **kwargs):
+        return self._call("find_elements", None, self._driver.find_elements, *args, **kwargs)
+
+    def get_cookie(self, name):
+        return self._call("get_cookie", None, self._driver.get_cookie, name)
+
+    def get_cookies(self):
+        return self._call("get_cookies", None, self._driver.get_cookies)
+
+    def add_cookie(self, cookie):
+        return self._call("add_cookie", None, self._driver.add_cookie, cookie)
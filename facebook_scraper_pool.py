@@ -0,0 +1,205 @@
+import queue
+import threading
+
+from facebook_fan_page_scraper import FacebookPageScraper
+from facebook_scraper_metrics import ScrapeMetrics
+from facebook_scraper_logging import get_logger
+
+logger = get_logger("pool")
+
+# 工作者沿用主要爬蟲的設定
+WORKER_SETTINGS = ("lean_mode", "auto_save_interval", "cookie_file", "cookie_vault_dir",
+                   "cookie_expiry_days", "login_timeout", "fast_typing",
+                   "incremental_extraction", "parser_engine", "extraction_fields",
+                   "extraction_engine", "use_output_journal", "journal_compress",
+                   "use_see_more_expander", "instrument_webdriver", "since_last_run",
+                   "checkpoint_dir", "known_posts_to_stop", "post_since", "post_until",
+                   "window_posts_to_stop")
+
+
+def copy_settings(source, target):
+    """將 source 爬蟲的設定複製到 target"""
+    for attribute in WORKER_SETTINGS:
+        setattr(target, attribute, getattr(source, attribute))
+
+
+class ScraperWorkerPool:
+    """多個瀏覽器並行爬取多個粉絲專頁
+
+    第一個工作者先完成登入並保存 Cookie，其餘工作者直接載入同一份登入狀態，
+    不會各自以帳號密碼登入。每個工作者擁有自己的 FacebookPageScraper 與瀏覽器，
+    從共用佇列取出粉絲專頁依序爬取，結果依專頁彙整，進度合併後回報。
+    """
+
+    def __init__(self, primary_scraper, workers=2, status_callback=None, save_callback=None):
+        """
+        :param primary_scraper: 第一個工作者使用的爬蟲（負責登入），其餘工作者複製其設定
+        :param workers: 並行的瀏覽器數量
+        :param status_callback: 狀態訊息回調函數 (message)
+        :param save_callback: 自動保存狀態回調函數 (message)
+        """
+        self.primary_scraper = primary_scraper
+        self.workers = max(1, int(workers))
+        self.status_callback = status_callback
+        self.save_callback = save_callback
+        self.scrapers = []
+        self.results = {}
+        self.is_running = False
+        self._page_progress = {}
+        self._page_counts = {}
+        self._lock = threading.Lock()
+
+    def _status(self, message):
+        # 有狀態回調（例如圖形界面）時由呼叫端顯示，避免同一訊息在記錄中重複出現
+        if self.status_callback:
+            self.status_callback(message)
+        else:
+            logger.info("%s", message)
+
+    def _create_worker_scraper(self):
+        """建立與主要爬蟲設定相同的工作者爬蟲"""
+        primary = self.primary_scraper
+        scraper = FacebookPageScraper(primary.email, primary.password, primary.use_edge)
+        copy_settings(primary, scraper)
+        scraper.save_callback = self.save_callback
+        return scraper
+
+    def start(self, worker_count=None):
+        """啟動瀏覽器並登入：主要爬蟲先登入保存Cookie，其餘工作者共用登入狀態
+        :param worker_count: 要啟動的瀏覽器數量，None 表示 self.workers
+        """
+        worker_count = self.workers if worker_count is None else worker_count
+        primary = self.primary_scraper
+        primary.save_callback = self.save_callback
+
+        self._status("正在初始化瀏覽器...")
+        if not primary.initialize_driver():
+            self._status("瀏覽器初始化失敗")
+            return False
+
+        self._status("正在登入Facebook...")
+        if not primary.login():
+            self._status("Facebook登入失敗")
+            return False
+        self.scrapers = [primary]
+
+        # 主要爬蟲登入時已保存Cookie，確保檔案為最新狀態供其他工作者載入
+        primary.save_cookies()
+
+        def start_worker(index):
+            scraper = self._create_worker_scraper()
+            if not scraper.initialize_driver():
+                self._status(f"⚠️ 工作者 {index + 1} 瀏覽器初始化失敗")
+                return
+            if not scraper.login_with_cookies():
+                self._status(f"⚠️ 工作者 {index + 1} 無法使用共用登入狀態，將不參與爬取")
+                scraper.close()
+                return
+            with self._lock:
+                self.scrapers.append(scraper)
+
+        threads = [threading.Thread(target=start_worker, args=(index,), daemon=True)
+                   for index in range(1, worker_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self._status(f"✅ 已啟動 {len(self.scrapers)} 個並行瀏覽器")
+        return True
+
+    def _report_progress(self, page_url, progress, count, progress_callback):
+        """合併各專頁進度：總進度為各專頁進度平均，數量為各專頁完整貼文數總和"""
+        with self._lock:
+            self._page_progress[page_url] = progress
+            self._page_counts[page_url] = count
+            total_progress = sum(self._page_progress.values()) / len(self._page_progress)
+            total_count = sum(self._page_counts.values())
+        if progress_callback:
+            progress_callback(total_progress, total_count)
+
+    def _worker_loop(self, scraper, pages, total_pages, max_posts, progress_callback):
+        while self.is_running:
+            try:
+                index, page_url = pages.get_nowait()
+            except queue.Empty:
+                return
+
+            self._status(f"正在爬取第 {index + 1}/{total_pages} 個粉絲專頁...")
+            try:
+                if not scraper.navigate_to_page(page_url):
+                    self._status(f"無法前往粉絲專頁: {page_url}")
+                    continue
+
+                posts = scraper.scrape_posts(
+                    max_posts,
+                    progress_callback=lambda progress, count: self._report_progress(
+                        page_url, progress, count, progress_callback)
+                )
+                with self._lock:
+                    self.results[page_url] = posts
+                self._report_progress(page_url, 100, len(posts), progress_callback)
+                self._status(f"已完成第 {index + 1} 個粉絲專頁，共爬取 {len(posts)} 篇貼文")
+            except Exception as e:
+                self._status(f"爬取粉絲專頁 {page_url} 時發生錯誤: {e}")
+
+    def run(self, page_urls, max_posts, progress_callback=None):
+        """並行爬取所有粉絲專頁
+        :return: {粉絲專頁網址: 貼文列表}，依輸入順序排列
+        """
+        self.is_running = True
+        self.results = {}
+        self._page_progress = {page_url: 0 for page_url in page_urls}
+        self._page_counts = {page_url: 0 for page_url in page_urls}
+
+        if not self.scrapers and not self.start(min(self.workers, len(page_urls))):
+            self.is_running = False
+            return {}
+
+        pages = queue.Queue()
+        for index, page_url in enumerate(page_urls):
+            pages.put((index, page_url))
+
+        threads = [threading.Thread(target=self._worker_loop,
+                                    args=(scraper, pages, len(page_urls), max_posts, progress_callback),
+                                    daemon=True)
+                   for scraper in self.scrapers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.is_running = False
+        for scraper in self.scrapers:
+            scraper.close_output_journal()
+
+        return {page_url: self.results[page_url] for page_url in page_urls if page_url in self.results}
+
+    @property
+    def partial_files(self):
+        """所有工作者產生的部分檔案與日誌"""
+        files = []
+        for scraper in self.scrapers:
+            files.extend(scraper.partial_files)
+        return files
+
+    @property
+    def metrics(self):
+        """所有工作者的效能統計合併結果"""
+        return ScrapeMetrics.combine(scraper.metrics for scraper in self.scrapers)
+
+    def stop(self):
+        """停止所有工作者"""
+        self.is_running = False
+        for scraper in list(self.scrapers):
+            scraper.stop_scraping_process()
+
+    def close(self, keep_primary=True):
+        """關閉工作者的瀏覽器（預設保留主要爬蟲，由呼叫端自行關閉）"""
+        for scraper in self.scrapers:
+            if keep_primary and scraper is self.primary_scraper:
+                continue
+            try:
+                scraper.close()
+            except Exception as e:
+                logger.warning("關閉工作者瀏覽器時發生錯誤: %s", e)
@@ -0,0 +1,475 @@
+"""Facebook 粉絲專頁爬蟲本機常駐服務
+
+服務啟動時就先開好瀏覽器並完成登入，之後透過本機 HTTP API 接收爬取工作，
+每個工作直接使用已登入的瀏覽器，不需重新啟動瀏覽器與登入。
+
+啟動服務：
+    python facebook_scraper_service.py serve --email you@example.com --workers 2
+
+送出工作（薄客戶端）：
+    python facebook_scraper_service.py scrape https://www.facebook.com/cnn --max-posts 20 --output cnn.csv
+
+API：
+    GET  /health                 服務狀態
+    POST /jobs                   {"page_url": ..., "max_posts": ...} 建立工作
+    GET  /jobs/<id>              查詢工作（完成後包含 posts 與 metrics 效能統計；已結束的工作保留 --job-ttl 秒）
+    GET  /metrics                所有已完成工作的效能統計（Prometheus 文字格式）
+    POST /jobs/<id>/cancel       取消工作
+    POST /shutdown               關閉服務
+"""
+import argparse
+import csv
+import getpass
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from facebook_columnar_export import columnar_format, write_posts
+from facebook_fan_page_scraper import FacebookPageScraper
+from facebook_output_journal import FIELDNAMES
+from facebook_post_window import PostTimeWindow
+from facebook_scraper_pool import ScraperWorkerPool
+from facebook_scraper_metrics import ScrapeMetrics
+from facebook_scraper_logging import get_logger, setup_logging
+from facebook_time_parser import OUTPUT_FORMAT
+
+logger = get_logger("service")
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_JOB_TTL = 3600  # 已結束的工作保留多久（秒）供查詢結果
+DEFAULT_MAX_FINISHED_JOBS = 100  # 最多保留幾個已結束的工作
+
+
+class ScrapeJob:
+    """單一爬取工作"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, page_url, max_posts, since=None, until=None):
+        self.id = str(next(self._ids))
+        self.page_url = page_url
+        self.max_posts = max_posts
+        self.since = since  # 時間範圍（YYYY-MM-DD [HH:MM] 字串），None 表示不限制
+        self.until = until
+        self.status = "queued"  # queued / running / done / failed / cancelled
+        self.progress = 0.0
+        self.count = 0
+        self.posts = []
+        self.partial_files = []
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.first_post_at = None
+        self.finished_at = None
+        self.metrics = None  # 完成後的效能統計報告
+        self.scraper = None
+
+    @property
+    def is_finished(self):
+        return self.status in ("done", "failed", "cancelled") and self.scraper is None
+
+    def to_dict(self, include_posts=True):
+        data = {
+            "id": self.id,
+            "page_url": self.page_url,
+            "max_posts": self.max_posts,
+            "since": self.since,
+            "until": self.until,
+            "status": self.status,
+            "progress": self.progress,
+            "count": self.count,
+            "partial_files": self.partial_files,
+            "error": self.error,
+            "queue_seconds": (self.started_at - self.created_at) if self.started_at else None,
+            "time_to_first_post": (self.first_post_at - self.created_at) if self.first_post_at else None,
+            "duration": (self.finished_at - self.created_at) if self.finished_at else None,
+            "metrics": self.metrics,
+        }
+        if include_posts:
+            data["posts"] = self.posts
+        return data
+
+
+class ScraperService:
+    """保持多個已登入瀏覽器待命的爬取服務"""
+
+    def __init__(self, scraper, workers=1, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                 job_ttl=DEFAULT_JOB_TTL, max_finished_jobs=DEFAULT_MAX_FINISHED_JOBS):
+        """
+        :param scraper: 主要爬蟲（負責登入），其餘待命瀏覽器複製其設定
+        :param workers: 待命的瀏覽器數量
+        :param job_ttl: 已結束的工作（含貼文）保留的秒數，之後查詢會得到 404
+        :param max_finished_jobs: 最多保留的已結束工作數，超過時先移除最早結束的
+        """
+        self.pool = ScraperWorkerPool(scraper, workers=workers)
+        self.host = host
+        self.port = port
+        self.jobs = {}
+        self.job_ttl = job_ttl
+        self.max_finished_jobs = max_finished_jobs
+        self._queue = queue.Queue()
+        self._threads = []
+        self._server = None
+        self._lock = threading.Lock()
+        self.metrics = ScrapeMetrics()  # 服務啟動以來所有工作的累計效能統計
+        self.is_running = False
+
+    def start(self):
+        """啟動瀏覽器、登入並開始接受工作"""
+        logger.info("🔥 正在預熱瀏覽器並登入...")
+        if not self.pool.start():
+            return False
+
+        self.is_running = True
+        for scraper in self.pool.scrapers:
+            thread = threading.Thread(target=self._worker_loop, args=(scraper,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        logger.info("✅ 爬取服務已啟動：http://%s:%s（%s 個待命瀏覽器）", self.host, self.port, len(self.pool.scrapers))
+        return True
+
+    def serve_forever(self):
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """停止所有工作並關閉瀏覽器"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        for _ in self._threads:
+            self._queue.put(None)
+        self.pool.stop()
+        self.pool.close(keep_primary=False)
+        if self._server:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+        logger.info("爬取服務已關閉")
+
+    def submit(self, page_url, max_posts, since=None, until=None):
+        PostTimeWindow(since, until)  # 送出前驗證日期格式，錯誤時拋出 ValueError
+        job = ScrapeJob(page_url, max_posts, since, until)
+        with self._lock:
+            self._evict_finished_jobs()
+            self.jobs[job.id] = job
+        self._queue.put(job)
+        return job
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return False
+        if job.status == "queued":
+            job.status = "cancelled"
+            job.finished_at = time.time()
+        elif job.status == "running" and job.scraper:
+            job.scraper.stop_scraping_process()
+        return True
+
+    def get_job(self, job_id):
+        with self._lock:
+            self._evict_finished_jobs()
+            return self.jobs.get(job_id)
+
+    def _evict_finished_jobs(self):
+        """移除超過保留時間或數量上限的已結束工作，常駐服務的記憶體不會隨工作數增加"""
+        now = time.time()
+        finished = sorted((job for job in self.jobs.values() if job.is_finished),
+                          key=lambda job: job.finished_at or job.created_at)
+        excess = len(finished) - self.max_finished_jobs
+        for index, job in enumerate(finished):
+            if index < excess or now - (job.finished_at or job.created_at) > self.job_ttl:
+                del self.jobs[job.id]
+
+    def health(self):
+        with self._lock:
+            statuses = [job.status for job in self.jobs.values()]
+        return {
+            "workers": len(self.pool.scrapers),
+            "queued": statuses.count("queued"),
+            "running": statuses.count("running"),
+            "finished": len(statuses) - statuses.count("queued") - statuses.count("running"),
+        }
+
+    def _ensure_driver(self, scraper):
+        """確認瀏覽器仍可使用，否則重新啟動並以共用登入狀態登入"""
+        try:
+            scraper.driver.current_url
+            return True
+        except Exception:
+            logger.warning("⚠️ 待命瀏覽器已失效，重新啟動中...")
+            try:
+                scraper.close()
+            except Exception:
+                pass
+            return scraper.initialize_driver() and scraper.login_with_cookies()
+
+    def _worker_loop(self, scraper):
+        while self.is_running:
+            job = self._queue.get()
+            if job is None:
+                return
+            if job.status == "cancelled":
+                continue
+            self._run_job(scraper, job)
+
+    def _run_job(self, scraper, job):
+        job.status = "running"
+        job.started_at = time.time()
+        job.scraper = scraper
+
+        def on_progress(progress, count):
+            job.progress = progress
+            job.count = count
+            if count > 0 and job.first_post_at is None:
+                job.first_post_at = time.time()
+
+        try:
+            scraper.reset_run_state()
+            if not self._ensure_driver(scraper):
+                raise RuntimeError("瀏覽器無法使用")
+            if not scraper.navigate_to_page(job.page_url):
+                raise RuntimeError(f"無法前往粉絲專頁: {job.page_url}")
+
+            job.posts = scraper.scrape_posts(job.max_posts, progress_callback=on_progress,
+                                             since=job.since, until=job.until)
+            scraper.close_output_journal()
+            # 使用絕對路徑，客戶端不論在哪個目錄都能合併這些檔案
+            job.partial_files = [os.path.abspath(path) for path in scraper.partial_files]
+            job.count = len(job.posts)
+            job.progress = 100.0
+            job.status = "cancelled" if scraper.stop_scraping else "done"
+            if job.posts and job.first_post_at is None:
+                job.first_post_at = time.time()
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error("❌ 工作 %s 失敗: %s", job.id, e)
+        finally:
+            job.finished_at = time.time()
+            job.scraper = None
+            scraper.metrics.finish()
+            job.metrics = scraper.metrics.to_dict()
+            self.metrics.merge(scraper.metrics)
+
+    def _make_handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_text(self, status, text):
+                body = text.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_json(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if not length:
+                    return {}
+                return json.loads(self.rfile.read(length).decode("utf-8"))
+
+            def do_GET(self):
+                path, _, query = self.path.partition("?")
+                parts = path.strip("/").split("/")
+                if parts == ["health"]:
+                    self._send(200, service.health())
+                elif parts == ["metrics"]:
+                    self._send_text(200, service.metrics.to_prometheus())
+                elif len(parts) == 2 and parts[0] == "jobs":
+                    job = service.get_job(parts[1])
+                    if job is None:
+                        self._send(404, {"error": "找不到工作"})
+                    else:
+                        self._send(200, job.to_dict(include_posts="posts=0" not in query))
+                else:
+                    self._send(404, {"error": "未知的路徑"})
+
+            def do_POST(self):
+                parts = self.path.strip("/").split("/")
+                try:
+                    if parts == ["jobs"]:
+                        data = self._read_json()
+                        page_url = data.get("page_url")
+                        if not page_url or "facebook.com" not in page_url:
+                            self._send(400, {"error": "請提供有效的粉絲專頁網址"})
+                            return
+                        job = service.submit(page_url, int(data.get("max_posts", 10)),
+                                             data.get("since"), data.get("until"))
+                        self._send(202, job.to_dict(include_posts=False))
+                    elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel":
+                        if service.cancel(parts[1]):
+                            self._send(200, {"id": parts[1], "cancelled": True})
+                        else:
+                            self._send(404, {"error": "找不到工作"})
+                    elif parts == ["shutdown"]:
+                        self._send(200, {"shutdown": True})
+                        service.shutdown()
+                    else:
+                        self._send(404, {"error": "未知的路徑"})
+                except ValueError as e:
+                    self._send(400, {"error": str(e)})
+
+        return Handler
+
+
+class ScraperServiceClient:
+    """本機爬取服務的薄客戶端"""
+
+    def __init__(self, base_url=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def health(self):
+        response = requests.get(f"{self.base_url}/health", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def is_available(self):
+        try:
+            self.health()
+            return True
+        except requests.RequestException:
+            return False
+
+    def metrics(self):
+        """服務的累計效能統計（Prometheus 文字格式）"""
+        response = requests.get(f"{self.base_url}/metrics", timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def submit(self, page_url, max_posts, since=None, until=None):
+        """送出爬取工作，since / until 可為 date、datetime 或 YYYY-MM-DD [HH:MM] 字串"""
+        payload = {"page_url": page_url, "max_posts": max_posts}
+        for key, value in (("since", since), ("until", until)):
+            if value is not None:
+                payload[key] = value.strftime(OUTPUT_FORMAT) if isinstance(value, datetime) else str(value)
+        response = requests.post(f"{self.base_url}/jobs",
+                                 json=payload,
+                                 timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["id"]
+
+    def get(self, job_id, include_posts=True):
+        suffix = "" if include_posts else "?posts=0"
+        response = requests.get(f"{self.base_url}/jobs/{job_id}{suffix}", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def cancel(self, job_id):
+        response = requests.post(f"{self.base_url}/jobs/{job_id}/cancel", timeout=self.timeout)
+        return response.ok
+
+    def wait(self, job_id, poll_interval=1.0, progress_callback=None, should_stop=None):
+        """等待工作完成並返回結果（包含 posts）
+        :param progress_callback: 進度回調函數 (progress, count)
+        :param should_stop: 返回 True 時取消工作
+        """
+        while True:
+            job = self.get(job_id, include_posts=False)
+            if progress_callback:
+                progress_callback(job["progress"], job["count"])
+            if job["status"] in ("done", "failed", "cancelled"):
+                return self.get(job_id)
+            if should_stop and should_stop():
+                self.cancel(job_id)
+            time.sleep(poll_interval)
+
+
+def write_posts_csv(posts, filename):
+    if columnar_format(filename):
+        write_posts(posts, filename)
+        return
+    with open(filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES, extrasaction='ignore')
+        writer.writeheader()
+        for post in posts:
+            writer.writerow(post)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Facebook 粉絲專頁爬蟲本機常駐服務")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="啟動常駐服務")
+    serve_parser.add_argument("--email", required=True)
+    serve_parser.add_argument("--password", default=os.environ.get("FB_PASSWORD"),
+                              help="Facebook密碼（預設讀取環境變數 FB_PASSWORD，未設定時會詢問）")
+    serve_parser.add_argument("--chrome", action="store_true", help="使用 Chrome 而非 Edge")
+    serve_parser.add_argument("--workers", type=int, default=1)
+    serve_parser.add_argument("--lean", action="store_true", help="精簡模式：無頭、不載入圖片影片字型")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--job-ttl", type=int, default=DEFAULT_JOB_TTL,
+                              help="已結束的工作結果保留秒數")
+    serve_parser.add_argument("--max-jobs", type=int, default=DEFAULT_MAX_FINISHED_JOBS,
+                              help="最多保留的已結束工作數")
+    serve_parser.add_argument("--log-level", default=None, help="記錄等級（DEBUG、INFO、WARNING），預設 INFO")
+    serve_parser.add_argument("--log-json", help="另外將記錄以 JSON Lines 格式寫入此檔案")
+
+    scrape_parser = subparsers.add_parser("scrape", help="送出爬取工作並等待結果")
+    scrape_parser.add_argument("page_url")
+    scrape_parser.add_argument("--max-posts", type=int, default=10)
+    scrape_parser.add_argument("--since", help="只爬取此日期之後的貼文（YYYY-MM-DD 或 YYYY-MM-DD HH:MM）")
+    scrape_parser.add_argument("--until", help="只爬取此日期之前的貼文（只有日期時包含當天）")
+    scrape_parser.add_argument("--output", help="輸出CSV檔案（.parquet / .arrow 為欄位式檔案）")
+    scrape_parser.add_argument("--server", default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        setup_logging(level=args.log_level, json_path=args.log_json)
+        password = args.password or getpass.getpass("Facebook密碼: ")
+        scraper = FacebookPageScraper(args.email, password, use_edge=not args.chrome)
+        scraper.lean_mode = args.lean
+        service = ScraperService(scraper, workers=args.workers, host=args.host, port=args.port,
+                                 job_ttl=args.job_ttl, max_finished_jobs=args.max_jobs)
+        if service.start():
+            service.serve_forever()
+        else:
+            service.shutdown()
+            scraper.close()
+    else:
+        client = ScraperServiceClient(args.server)
+        job_id = client.submit(args.page_url, args.max_posts, args.since, args.until)
+        print(f"已送出工作 {job_id}，等待結果...")
+        job = client.wait(job_id, progress_callback=lambda progress, count: print(
+            f"\r進度 {progress:.1f}%（{count} 篇）", end="", flush=True))
+        print()
+        if job["status"] != "done":
+            print(f"❌ 工作未完成：{job['status']} {job.get('error') or ''}")
+            return
+        print(f"✅ 共取得 {len(job['posts'])} 篇貼文，首篇貼文耗時 {job['time_to_first_post'] or 0:.1f} 秒")
+        if args.output:
+            write_posts_csv(job["posts"], args.output)
+            print(f"資料已儲存至: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
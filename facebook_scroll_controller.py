@@ -0,0 +1,130 @@
+import math
+
+
+# 取得捲動狀態：[文件總高度, 目前捲動位置, 視窗高度]
+SCROLL_METRICS_SCRIPT = """
+var root = document.scrollingElement || document.documentElement;
+return [root.scrollHeight, window.scrollY || root.scrollTop || 0, window.innerHeight];
+"""
+
+
+class AdaptiveScrollController:
+    """依每輪新增貼文數調整捲動距離與步長的捲動控制器
+
+    - 有新貼文時維持或縮小距離，讓每篇貼文都有機會在可視範圍內展開「查看更多」
+    - 沒有新貼文時逐步加大距離與步長，更快到達尚未載入的位置
+    - 文件高度連續多輪不變且已到底部，判定為動態消息結束
+    - 連續多輪沒有新貼文但仍未到底，先要求等待載入一次，仍無進展才判定為載入停滯
+    - 捲動輪數上限依目標貼文數推算，而非固定 50 次
+    每一輪的決策都記錄在 decisions，方便檢視與調整參數。
+    """
+
+    def __init__(self, target_posts, initial_distance=600, min_distance=300, max_distance=2400,
+                 min_step=80, max_step=400, steps_per_round=5, min_yield_per_round=0.5,
+                 min_rounds=20, stall_rounds=5, end_rounds=3, log=print):
+        """
+        :param target_posts: 目標貼文數
+        :param initial_distance: 第一輪捲動距離（px）
+        :param steps_per_round: 每輪大約分成幾步捲動（每步都會擷取並展開貼文）
+        :param min_yield_per_round: 推算輪數上限時假設每輪最少新增的貼文數
+        :param min_rounds: 輪數上限的下限
+        :param stall_rounds: 連續多少輪沒有新貼文視為載入停滯
+        :param end_rounds: 已到底部且文件高度連續多少輪不變視為動態消息結束
+        :param log: 決策記錄輸出函數，None 表示不輸出
+        """
+        self.target_posts = target_posts
+        self.min_distance = min_distance
+        self.max_distance = max_distance
+        self.min_step = min_step
+        self.max_step = max_step
+        self.steps_per_round = steps_per_round
+        self.stall_rounds = stall_rounds
+        self.end_rounds = end_rounds
+        self.log = log
+
+        self.max_rounds = max(min_rounds, math.ceil(target_posts / min_yield_per_round) + 10)
+        self.distance = initial_distance
+        self.step = self._step_for(initial_distance)
+        self.rounds = 0
+        self.stop_reason = None
+        self.decisions = []
+
+        self._zero_yield_rounds = 0
+        self._unchanged_height_rounds = 0
+        self._last_height = None
+        self._waited_for_stall = False
+
+    def _step_for(self, distance):
+        return int(min(self.max_step, max(self.min_step, distance / self.steps_per_round)))
+
+    def has_budget(self):
+        """是否還可以繼續捲動"""
+        if self.stop_reason is None and self.rounds >= self.max_rounds:
+            self.stop_reason = "budget_exhausted"
+            self._log(f"已達捲動輪數上限 {self.max_rounds}（依目標 {self.target_posts} 篇推算）")
+        return self.stop_reason is None
+
+    def record_round(self, new_posts, scroll_height=None, scroll_top=None, viewport_height=None):
+        """記錄一輪捲動的結果並決定下一輪
+
+        :param new_posts: 本輪新增的貼文數
+        :return: "continue"（繼續）、"wait"（先等待動態消息載入再繼續）或 "stop"（停止，原因見 stop_reason）
+        """
+        self.rounds += 1
+        previous_distance = self.distance
+
+        at_bottom = (scroll_height is not None and scroll_top is not None and viewport_height is not None
+                     and scroll_top + viewport_height >= scroll_height - 50)
+        if scroll_height is not None and scroll_height == self._last_height:
+            self._unchanged_height_rounds += 1
+        else:
+            self._unchanged_height_rounds = 0
+        self._last_height = scroll_height
+
+        if new_posts > 0:
+            self._zero_yield_rounds = 0
+            self._waited_for_stall = False
+            if new_posts >= self.steps_per_round:
+                # 貼文密集：縮小距離，避免貼文一閃而過來不及展開
+                self.distance *= 0.8
+            elif new_posts < 2:
+                self.distance *= 1.2
+        else:
+            self._zero_yield_rounds += 1
+            # 沒有新貼文：加大距離，盡快觸發下一批載入
+            self.distance *= 1.6
+
+        self.distance = int(min(self.max_distance, max(self.min_distance, self.distance)))
+        self.step = self._step_for(self.distance)
+
+        decision = "continue"
+        if at_bottom and self._unchanged_height_rounds >= self.end_rounds:
+            decision = "stop"
+            self.stop_reason = "end_of_feed"
+        elif self._zero_yield_rounds >= self.stall_rounds:
+            if not self._waited_for_stall:
+                decision = "wait"
+                self._waited_for_stall = True
+            elif self._zero_yield_rounds >= self.stall_rounds * 2:
+                decision = "stop"
+                self.stop_reason = "stalled"
+
+        record = {
+            'round': self.rounds,
+            'new_posts': new_posts,
+            'scroll_height': scroll_height,
+            'at_bottom': at_bottom,
+            'distance': self.distance,
+            'step': self.step,
+            'decision': decision,
+            'reason': self.stop_reason,
+        }
+        self.decisions.append(record)
+        self._log(f"第 {self.rounds}/{self.max_rounds} 輪：新增 {new_posts} 篇，"
+                  f"距離 {previous_distance}→{self.distance}px，步長 {self.step}px，決策 {decision}"
+                  + (f"（{self.stop_reason}）" if self.stop_reason else ""))
+        return decision
+
+    def _log(self, message):
+        if self.log:
+            self.log(f"📐 捲動控制：{message}")
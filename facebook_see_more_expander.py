@@ -0,0 +1,214 @@
+from facebook_post_store import TRUNCATION_MARKERS
+from facebook_wait_engine import POST_CONTAINER_SELECTOR
+
+
+# 在頁面上安裝常駐的「查看更多」展開器（每個頁面只安裝一次）：
+#   - 安裝時掃描現有的貼文容器一次，之後由 MutationObserver 只處理新加入或內容有變動的容器
+#   - 只在貼文容器內尋找文字完全符合的按鈕，使用 textContent 不會觸發版面重排
+#   - 被點擊的按鈕標記 data-fps-clicked（與等待引擎共用），文字改變或從頁面移除即視為已展開
+#   - 點擊後一段時間仍未展開會重試，超過次數則計為失敗
+#   - 暫停時不點擊，只記錄待處理的容器，恢復後再處理（options.paused 可在安裝時即暫停）
+INSTALL_EXPANDER_SCRIPT = """
+var markers = arguments[0];
+var containerSelector = arguments[1];
+var options = arguments[2] || {};
+
+if (window.__fpsExpander && window.__fpsExpander.observer) {
+    return window.__fpsExpander.stats();
+}
+
+var expander = window.__fpsExpander = {
+    clicked: 0, expanded: 0, failed: 0, scanned: 0, paused: !!options.paused,
+    dirty: new Set(), deferred: new Set(), pending: [], handled: new WeakSet(),
+    scheduled: false, observer: null
+};
+
+function isMarker(element) {
+    return markers.indexOf((element.textContent || '').trim()) !== -1;
+}
+
+function scanContainer(container) {
+    expander.scanned++;
+    if (expander.paused) {
+        expander.deferred.add(container);
+        return;
+    }
+    var candidates = container.querySelectorAll('[role="button"], span, a');
+    for (var i = 0; i < candidates.length; i++) {
+        var element = candidates[i];
+        if (expander.handled.has(element) || !isMarker(element)) continue;
+        if (element.querySelector('[role="button"]')) continue;  // 只點擊最內層的按鈕
+        var rect = element.getBoundingClientRect();
+        if (rect.width === 0 || rect.height === 0) continue;
+        expander.handled.add(element);
+        element.setAttribute('data-fps-clicked', '1');
+        try {
+            element.click();
+            expander.clicked++;
+            expander.pending.push({element: element, clickedAt: Date.now(), attempts: 1});
+        } catch (e) {
+            expander.failed++;
+        }
+    }
+}
+
+function checkPending() {
+    var now = Date.now();
+    var stillPending = [];
+    for (var i = 0; i < expander.pending.length; i++) {
+        var item = expander.pending[i];
+        if (!item.element.isConnected || !isMarker(item.element)) {
+            expander.expanded++;
+            continue;
+        }
+        if (now - item.clickedAt > options.retry_ms) {
+            if (item.attempts >= options.max_attempts) {
+                expander.failed++;
+                continue;
+            }
+            try { item.element.click(); } catch (e) {}
+            item.attempts++;
+            item.clickedAt = now;
+        }
+        stillPending.push(item);
+    }
+    expander.pending = stillPending;
+}
+
+expander.flush = function() {
+    var containers = Array.from(expander.dirty);
+    expander.dirty.clear();
+    expander.scheduled = false;
+    for (var i = 0; i < containers.length; i++) {
+        if (containers[i].isConnected) scanContainer(containers[i]);
+    }
+    checkPending();
+};
+
+expander.stats = function() {
+    return {
+        clicked: expander.clicked, expanded: expander.expanded, failed: expander.failed,
+        pending: expander.pending.length, deferred: expander.deferred.size,
+        scanned: expander.scanned, paused: expander.paused
+    };
+};
+
+expander.setPaused = function(paused) {
+    expander.paused = !!paused;
+    if (!expander.paused) {
+        expander.deferred.forEach(function(container) { expander.dirty.add(container); });
+        expander.deferred.clear();
+        expander.flush();
+    }
+    return expander.stats();
+};
+
+function markDirty(container) {
+    expander.dirty.add(container);
+    if (!expander.scheduled) {
+        expander.scheduled = true;
+        setTimeout(expander.flush, options.debounce_ms);
+    }
+}
+
+expander.observer = new MutationObserver(function(records) {
+    for (var i = 0; i < records.length; i++) {
+        var target = records[i].target;
+        var owner = (target.nodeType === 1 ? target : target.parentElement);
+        owner = owner && owner.closest(containerSelector);
+        if (owner) markDirty(owner);
+
+        var added = records[i].addedNodes;
+        for (var j = 0; j < added.length; j++) {
+            var node = added[j];
+            if (node.nodeType !== 1 || owner) continue;
+            if (node.matches(containerSelector)) {
+                markDirty(node);
+            } else if (node.firstElementChild) {
+                var inner = node.querySelectorAll(containerSelector);
+                for (var k = 0; k < inner.length; k++) markDirty(inner[k]);
+            }
+        }
+    }
+});
+expander.observer.observe(document.documentElement, {childList: true, subtree: true});
+
+var existing = document.querySelectorAll(containerSelector);
+for (var i = 0; i < existing.length; i++) expander.dirty.add(existing[i]);
+expander.flush();
+var stats = expander.stats();
+stats.fresh = true;
+return stats;
+"""
+
+# 處理尚未處理的容器並回傳計數器；頁面重新載入導致展開器不存在時回傳 null
+POLL_EXPANDER_SCRIPT = """
+var expander = window.__fpsExpander;
+if (!expander || !expander.observer) return null;
+expander.flush();
+return expander.stats();
+"""
+
+SET_EXPANDER_PAUSED_SCRIPT = """
+var expander = window.__fpsExpander;
+if (!expander || !expander.observer) return null;
+return expander.setPaused(arguments[0]);
+"""
+
+
+class SeeMoreExpander:
+    """常駐在頁面上的「查看更多」自動展開器
+
+    取代每一步都對整份文件執行 querySelectorAll('span, div, a') 並讀取 innerText 的做法：
+    展開器每個頁面只安裝一次，只掃描新加入的貼文容器，Python 端只需輪詢計數器。
+    """
+
+    def __init__(self, driver, markers=TRUNCATION_MARKERS, container_selector=POST_CONTAINER_SELECTOR,
+                 debounce_ms=50, retry_ms=2000, max_attempts=3):
+        """
+        :param debounce_ms: DOM 變動後延遲多久再批次處理（毫秒）
+        :param retry_ms: 點擊後多久仍未展開就重試（毫秒）
+        :param max_attempts: 每個按鈕最多點擊次數
+        """
+        self.driver = driver
+        self.markers = list(markers)
+        self.container_selector = container_selector
+        self.options = {'debounce_ms': debounce_ms, 'retry_ms': retry_ms, 'max_attempts': max_attempts}
+        self.last_stats = None
+        self._reported_clicks = 0
+
+    def install(self, paused=False):
+        """安裝展開器（已安裝時只回傳計數器）
+        :param paused: 安裝後先暫停（例如動態消息頂端的貼文晚於時間範圍時）
+        """
+        stats = self.driver.execute_script(
+            INSTALL_EXPANDER_SCRIPT, self.markers, self.container_selector, dict(self.options, paused=bool(paused)))
+        if stats.get('fresh'):
+            # 新頁面：計數器從頭開始
+            self._reported_clicks = 0
+        self.last_stats = stats
+        return stats
+
+    def poll(self):
+        """處理待處理的容器並取得計數器 {clicked, expanded, failed, pending, deferred, scanned, paused}"""
+        stats = self.driver.execute_script(POLL_EXPANDER_SCRIPT)
+        if stats is None:
+            stats = self.install()
+        self.last_stats = stats
+        return stats
+
+    def take_new_clicks(self):
+        """自上次呼叫以來新點擊的數量"""
+        stats = self.poll()
+        new_clicks = max(0, stats['clicked'] - self._reported_clicks)
+        self._reported_clicks = stats['clicked']
+        return new_clicks, stats
+
+    def set_paused(self, paused):
+        """暫停或恢復自動展開（恢復時會處理暫停期間出現的貼文）"""
+        stats = self.driver.execute_script(SET_EXPANDER_PAUSED_SCRIPT, bool(paused))
+        if stats is None:
+            self.install()
+            stats = self.driver.execute_script(SET_EXPANDER_PAUSED_SCRIPT, bool(paused))
+        self.last_stats = stats
+        return stats
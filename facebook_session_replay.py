@@ -0,0 +1,360 @@
+"""Facebook 爬取過程錄製與重播
+
+錄製真實瀏覽器在 scrape_posts 期間的 page_source、execute_script 結果
+（network 擷取引擎另外錄製效能記錄與 DevTools 指令的結果），
+之後可在沒有瀏覽器與網路的環境下，以相同資料重新執行 scrape_posts，
+用於重現問題、比較效能與檢查輸出是否改變。
+
+錄製（需要瀏覽器與帳號）：
+    python facebook_session_replay.py record https://www.facebook.com/cnn session.jsonl.gz --email you@example.com --max-posts 20
+
+重播並計時：
+    python facebook_session_replay.py replay session.jsonl.gz --repeat 3 --output replay.csv
+"""
+import argparse
+import csv
+import getpass
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from datetime import datetime
+
+from facebook_fan_page_scraper import FacebookPageScraper
+from facebook_output_journal import FIELDNAMES
+from facebook_post_store import post_identity
+from facebook_time_parser import FacebookTimeParser
+from facebook_scraper_logging import get_logger
+
+logger = get_logger("replay")
+
+
+SESSION_FORMAT = "facebook-scraper-session"
+SESSION_VERSION = 1
+
+
+def script_key(kind, script=None):
+    """呼叫的比對鍵：腳本內容去除數字後的雜湊（滾動距離等數值每次不同）"""
+    if script is None:
+        return kind
+    normalized = re.sub(r"\d+", "0", script)
+    return f"{kind}:{hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12]}"
+
+
+def to_jsonable(value):
+    """將腳本回傳值轉為可寫入 JSON 的資料（網頁元素等無法序列化的物件記為 None）"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): to_jsonable(item) for key, item in value.items()}
+    return None
+
+
+class RecordingDriver:
+    """包裝真實的 WebDriver，將 page_source 與腳本結果依序寫入錄製檔
+
+    其餘屬性與方法直接轉交給原本的 WebDriver。
+    """
+
+    def __init__(self, driver, path, metadata=None):
+        self._driver = driver
+        self.path = path
+        self.event_count = 0
+        self._file = gzip.open(path, 'wt', encoding='utf-8') if path.endswith(".gz") \
+            else open(path, 'w', encoding='utf-8')
+        header = {
+            'format': SESSION_FORMAT,
+            'version': SESSION_VERSION,
+            'recorded_at': datetime.now().isoformat(),
+        }
+        header.update(metadata or {})
+        self._write(header)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _record(self, kind, script, result, started_at):
+        self.event_count += 1
+        self._write({
+            'seq': self.event_count,
+            'key': script_key(kind, script),
+            'kind': kind,
+            'elapsed': round(time.perf_counter() - started_at, 4),
+            'result': to_jsonable(result),
+        })
+        return result
+
+    @property
+    def page_source(self):
+        started_at = time.perf_counter()
+        return self._record('page_source', None, self._driver.page_source, started_at)
+
+    def execute_script(self, script, *args):
+        started_at = time.perf_counter()
+        return self._record('script', script, self._driver.execute_script(script, *args), started_at)
+
+    def execute_async_script(self, script, *args):
+        started_at = time.perf_counter()
+        return self._record('async_script', script,
+                            self._driver.execute_async_script(script, *args), started_at)
+
+    def execute_cdp_cmd(self, cmd, params):
+        started_at = time.perf_counter()
+        return self._record('cdp', cmd, self._driver.execute_cdp_cmd(cmd, params), started_at)
+
+    def get_log(self, log_type):
+        started_at = time.perf_counter()
+        return self._record('log', log_type, self._driver.get_log(log_type), started_at)
+
+    def close_recording(self):
+        """結束錄製並返回原本的 WebDriver"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return self._driver
+
+
+class ReplayDriver:
+    """以錄製檔取代瀏覽器的 WebDriver
+
+    每種呼叫（依腳本內容區分）各自依錄製順序回傳結果；某種呼叫的錄製結果用完後重複回傳最後一個，
+    並記錄在 misses。simulate_latency 為 True 時依錄製時的耗時等待，重現原本的時間特性。
+    """
+
+    def __init__(self, path, simulate_latency=False):
+        self.path = path
+        self.simulate_latency = simulate_latency
+        self.metadata = {}
+        self.misses = 0
+        self.calls = 0
+        self.current_url = "https://www.facebook.com/"
+        self._events = {}
+        self._last = {}
+        self._load()
+
+    def _load(self):
+        opener = gzip.open if self.path.endswith(".gz") else open
+        with opener(self.path, 'rt', encoding='utf-8') as f:
+            for line_number, line in enumerate(f):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if line_number == 0:
+                    if record.get('format') != SESSION_FORMAT:
+                        raise ValueError(f"{self.path} 不是爬取過程錄製檔")
+                    self.metadata = record
+                    continue
+                self._events.setdefault(record['key'], []).append(record)
+        for events in self._events.values():
+            events.reverse()  # 以 pop() 依序取出
+        if self.metadata.get('page_url'):
+            self.current_url = self.metadata['page_url']
+
+    @property
+    def event_count(self):
+        return sum(len(events) for events in self._events.values())
+
+    def _next(self, kind, script=None, default=None, repeat_last=True):
+        self.calls += 1
+        key = script_key(kind, script)
+        events = self._events.get(key)
+        if events:
+            record = events.pop()
+            self._last[key] = record
+        else:
+            self.misses += 1
+            record = self._last.get(key) if repeat_last else None
+            if record is None:
+                return default
+        if self.simulate_latency:
+            time.sleep(record['elapsed'])
+        return record['result']
+
+    @property
+    def page_source(self):
+        return self._next('page_source', default="<html><body></body></html>")
+
+    def execute_script(self, script, *args):
+        return self._next('script', script)
+
+    def execute_async_script(self, script, *args):
+        return self._next('async_script', script, default={'ok': True})
+
+    def execute_cdp_cmd(self, cmd, params):
+        return self._next('cdp', cmd, default={})
+
+    def get_log(self, log_type):
+        # 記錄只讀取一次，用完後不重複回傳最後一批（否則同一回應會被重複取回）
+        return self._next('log', log_type, default=[], repeat_last=False)
+
+    def get(self, url):
+        self.current_url = url
+
+    def get_cookie(self, name):
+        return None
+
+    def get_cookies(self):
+        return []
+
+    def find_elements(self, *args, **kwargs):
+        return []
+
+    def quit(self):
+        pass
+
+
+def record_session(scraper, page_url, max_posts, path):
+    """前往粉絲專頁並在錄製中執行 scrape_posts（scraper 需已登入）"""
+    if not scraper.navigate_to_page(page_url):
+        raise RuntimeError(f"無法前往粉絲專頁: {page_url}")
+
+    recorder = RecordingDriver(scraper.driver, path, metadata={
+        'page_url': page_url,
+        'max_posts': max_posts,
+        'settings': {
+            'incremental_extraction': scraper.incremental_extraction,
+            'parser_engine': scraper.parser_engine,
+            'extraction_engine': scraper.extraction_engine,
+            'use_see_more_expander': scraper.use_see_more_expander,
+        },
+    })
+    scraper.driver = recorder
+    try:
+        posts = scraper.scrape_posts(max_posts)
+    finally:
+        scraper.driver = recorder.close_recording()
+    logger.info("🎬 已錄製 %s 筆呼叫至: %s", recorder.event_count, path)
+    return posts
+
+
+def replay_session(path, max_posts=None, simulate_latency=False, seed=0):
+    """以錄製檔重播一次 scrape_posts，返回 (貼文, 耗時秒數, ReplayDriver)"""
+    driver = ReplayDriver(path, simulate_latency=simulate_latency)
+    metadata = driver.metadata
+    scraper = FacebookPageScraper("", "")
+    scraper.driver = driver
+    for attribute, value in metadata.get('settings', {}).items():
+        setattr(scraper, attribute, value)
+    # 相對時間（例如「3小時」）以錄製當時為基準解析，輸出才可重現
+    recorded_at = datetime.fromisoformat(metadata['recorded_at'])
+    scraper.time_parser = FacebookTimeParser(now=lambda: recorded_at)
+
+    random.seed(seed)
+    started_at = time.perf_counter()
+    try:
+        posts = scraper.scrape_posts(max_posts or metadata.get('max_posts', 10))
+        elapsed = time.perf_counter() - started_at
+    finally:
+        # 重播產生的自動保存檔案不保留
+        scraper.cleanup_partial_files()
+    return posts, elapsed, driver
+
+
+def diff_posts(expected, actual):
+    """比較兩組貼文（忽略 scraped_at），返回差異描述列表"""
+    def comparable(posts):
+        return {post_identity(post): {field: str(post.get(field, '')) for field in FIELDNAMES
+                                      if field != 'scraped_at'}
+                for post in posts}
+
+    expected_posts = comparable(expected)
+    actual_posts = comparable(actual)
+    differences = []
+    for key in expected_posts.keys() - actual_posts.keys():
+        differences.append(f"缺少貼文: {key}")
+    for key in actual_posts.keys() - expected_posts.keys():
+        differences.append(f"多出貼文: {key}")
+    for key in expected_posts.keys() & actual_posts.keys():
+        for field, value in expected_posts[key].items():
+            if actual_posts[key][field] != value:
+                differences.append(f"欄位不同 {key} {field}: {value!r} → {actual_posts[key][field]!r}")
+    return differences
+
+
+def read_posts_csv(filename):
+    with open(filename, 'r', newline='', encoding='utf-8-sig') as csvfile:
+        return list(csv.DictReader(csvfile))
+
+
+def write_posts_csv(posts, filename):
+    with open(filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES, extrasaction='ignore')
+        writer.writeheader()
+        for post in posts:
+            writer.writerow(post)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Facebook 爬取過程錄製與重播")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="錄製真實的爬取過程（需要瀏覽器與帳號）")
+    record_parser.add_argument("page_url")
+    record_parser.add_argument("session", help="錄製檔（.jsonl 或 .jsonl.gz）")
+    record_parser.add_argument("--email", required=True)
+    record_parser.add_argument("--password", default=os.environ.get("FB_PASSWORD"),
+                               help="Facebook密碼（預設讀取環境變數 FB_PASSWORD，未設定時會詢問）")
+    record_parser.add_argument("--max-posts", type=int, default=20)
+    record_parser.add_argument("--chrome", action="store_true", help="使用 Chrome 而非 Edge")
+    record_parser.add_argument("--output", help="同時將爬取結果存成CSV，作為重播比對的基準")
+
+    replay_parser = subparsers.add_parser("replay", help="以錄製檔重播並計時（不需瀏覽器）")
+    replay_parser.add_argument("session")
+    replay_parser.add_argument("--max-posts", type=int, help="預設使用錄製時的數量")
+    replay_parser.add_argument("--repeat", type=int, default=1)
+    replay_parser.add_argument("--realtime", action="store_true", help="依錄製時的耗時等待每次呼叫")
+    replay_parser.add_argument("--output", help="將重播結果存成CSV")
+    replay_parser.add_argument("--expect", help="與基準CSV比對，有差異時列出")
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        password = args.password or getpass.getpass("Facebook密碼: ")
+        scraper = FacebookPageScraper(args.email, password, use_edge=not args.chrome)
+        try:
+            if not scraper.initialize_driver() or not scraper.login():
+                print("❌ 無法啟動瀏覽器或登入")
+                return
+            posts = record_session(scraper, args.page_url, args.max_posts, args.session)
+            if args.output:
+                write_posts_csv(posts, args.output)
+                print(f"基準結果已儲存至: {args.output}")
+        finally:
+            scraper.cleanup_partial_files()
+            scraper.close()
+        return
+
+    timings = []
+    posts = []
+    driver = None
+    for _ in range(args.repeat):
+        posts, elapsed, driver = replay_session(args.session, args.max_posts, args.realtime)
+        timings.append(elapsed)
+
+    print(f"\n⏱️ 重播 {args.repeat} 次：最快 {min(timings):.3f} 秒，平均 {sum(timings) / len(timings):.3f} 秒，"
+          f"{len(posts)} 篇貼文，{driver.calls} 次呼叫（{driver.misses} 次超出錄製內容）")
+
+    if args.output:
+        write_posts_csv(posts, args.output)
+        print(f"重播結果已儲存至: {args.output}")
+
+    if args.expect:
+        differences = diff_posts(read_posts_csv(args.expect), posts)
+        if differences:
+            print(f"❌ 與基準結果有 {len(differences)} 處差異：")
+            for difference in differences[:50]:
+                print(f"  {difference}")
+        else:
+            print("✅ 與基準結果一致")
+
+
+if __name__ == '__main__':
+    main()
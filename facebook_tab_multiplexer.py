@@ -0,0 +1,264 @@
+import time
+from collections import deque
+
+from facebook_fan_page_scraper import FacebookPageScraper
+from facebook_scrape_steps import scrape_steps, SETTLE, WAIT_COMMANDS
+from facebook_scraper_metrics import InstrumentedDriver, ScrapeMetrics, browser_memory_bytes, format_bytes
+from facebook_scraper_pool import copy_settings
+from facebook_scraper_logging import get_logger
+
+logger = get_logger("tabs")
+
+
+class _Tab:
+    """一個粉絲專頁分頁：視窗代號、使用同一個瀏覽器的分頁爬蟲與其爬取步驟"""
+
+    def __init__(self, page_url, index, handle, scraper):
+        self.page_url = page_url
+        self.index = index
+        self.handle = handle
+        self.scraper = scraper
+        self.steps = None
+        self.turns = 0
+
+
+class TabMultiplexer:
+    """在同一個瀏覽器中以多個分頁輪流爬取多個粉絲專頁
+
+    每個粉絲專頁一個分頁，排程器依序切換分頁，每次只執行一步（捲動一次、展開並擷取），
+    捲動後立即換下一個分頁，讓 Facebook 在背景呈現新貼文的同時處理其他分頁。
+    所有分頁共用一個瀏覽器行程與登入狀態，每個專頁的記憶體成本遠低於一個專頁一個瀏覽器。
+    每個分頁有自己的 FacebookPageScraper（共用驅動程式），貼文、展開器、等待引擎、
+    效能統計與自動保存檔案互不影響。
+    """
+
+    def __init__(self, primary_scraper, max_tabs=None, status_callback=None, save_callback=None):
+        """
+        :param primary_scraper: 已啟動瀏覽器並登入的爬蟲，分頁沿用其設定與驅動程式
+        :param max_tabs: 同時開啟的分頁數，None 表示 primary_scraper.tabs_per_browser
+        :param status_callback: 狀態訊息回調函數 (message)
+        :param save_callback: 自動保存狀態回調函數 (message)
+        """
+        self.primary_scraper = primary_scraper
+        self.max_tabs = max(1, int(max_tabs or primary_scraper.tabs_per_browser))
+        self.status_callback = status_callback
+        self.save_callback = save_callback
+        self.settle_timeout = 0.8  # 輪回某分頁時等待其呈現的上限（其他分頁執行期間通常已完成）
+        self.wait_timeout = 1.0  # 輪回某分頁時等待動態消息載入或網路請求完成的上限，避免阻塞其他分頁
+        self.memory_interval = 5.0  # 取樣瀏覽器記憶體的間隔（秒）
+        self.scrapers = []
+        self.results = {}
+        self.stats = {}
+        self.is_running = False
+        self._page_progress = {}
+        self._page_counts = {}
+        self._home_handle = None
+        self._max_posts = 0
+        self._progress_callback = None
+        self._last_memory_sample = 0.0
+
+    def _status(self, message):
+        if self.status_callback:
+            self.status_callback(message)
+        else:
+            logger.info("%s", message)
+
+    @property
+    def driver(self):
+        """未經 InstrumentedDriver 包裝的驅動程式（每個分頁爬蟲各自包裝，指令統計才會分開）"""
+        driver = self.primary_scraper.driver
+        while isinstance(driver, InstrumentedDriver):
+            driver = driver._driver
+        return driver
+
+    def _create_tab_scraper(self):
+        primary = self.primary_scraper
+        scraper = FacebookPageScraper(primary.email, primary.password, primary.use_edge)
+        copy_settings(primary, scraper)
+        if scraper.extraction_engine == "network":
+            # 效能記錄由同一個瀏覽器的所有分頁共用，讀取後無法再分給其他分頁
+            logger.warning("⚠️ 分頁多工不支援 network 擷取引擎，改用瀏覽器端擷取")
+            scraper.extraction_engine = "js"
+        scraper.save_callback = self.save_callback
+        scraper.driver = self.driver
+        scraper.instrument_driver()
+        self.scrapers.append(scraper)
+        return scraper
+
+    def _open_tab(self, page_url, index, reuse_handle=None):
+        """開啟（或重複使用）一個分頁並前往粉絲專頁，失敗時返回 None"""
+        driver = self.driver
+        if reuse_handle is not None:
+            driver.switch_to.window(reuse_handle)
+        else:
+            driver.switch_to.new_window('tab')
+        scraper = self._create_tab_scraper()
+        if scraper.lean_mode:
+            # DevTools 設定只作用於目前的分頁
+            scraper.apply_lean_devtools_settings()
+        tab = _Tab(page_url, index, driver.current_window_handle, scraper)
+        if not scraper.navigate_to_page(page_url):
+            self._status(f"無法前往粉絲專頁: {page_url}")
+            self._close_tab(tab)
+            return None
+        tab.steps = self._scrape_steps(tab)
+        return tab
+
+    def _close_tab(self, tab):
+        """關閉分頁；第一個視窗保留給下一個專頁使用（關閉最後一個視窗會結束瀏覽器）"""
+        tab.scraper.close_output_journal()
+        if tab.handle == self._home_handle:
+            return
+        try:
+            self.driver.switch_to.window(tab.handle)
+            self.driver.close()
+            self.driver.switch_to.window(self._home_handle)
+        except Exception as e:
+            logger.warning("關閉分頁時發生錯誤: %s", e)
+
+    def _report_progress(self, page_url, progress, count, progress_callback):
+        self._page_progress[page_url] = progress
+        self._page_counts[page_url] = count
+        if progress_callback:
+            progress_callback(sum(self._page_progress.values()) / len(self._page_progress),
+                              sum(self._page_counts.values()))
+
+    def _sample_memory(self, open_tabs, force=False):
+        now = time.perf_counter()
+        if not force and now - self._last_memory_sample < self.memory_interval:
+            return
+        self._last_memory_sample = now
+        memory = browser_memory_bytes(self.driver)
+        if memory is None:
+            return
+        if memory > self.stats.get('peak_browser_bytes', 0):
+            self.stats['peak_browser_bytes'] = memory
+            self.stats['tabs_at_peak'] = open_tabs
+
+    def _scrape_steps(self, tab):
+        """單一分頁的爬取流程（facebook_scrape_steps.scrape_steps），每次等待頁面前 yield 讓出給其他分頁
+
+        返回（StopIteration.value）最終的完整貼文列表。
+        """
+        scraper = tab.scraper
+        label = tab.page_url
+        progress_callback = self._progress_callback
+        steps = scrape_steps(
+            scraper, self._max_posts,
+            lambda progress, count: self._report_progress(label, progress, count, progress_callback),
+            label=f"[{tab.index + 1}] {label}", log_extra={'tab': tab.index})
+        result = None
+        while True:
+            try:
+                command = steps.send(result)
+            except StopIteration as stop:
+                return stop.value
+            if command[0] in WAIT_COMMANDS:
+                # 換其他分頁執行，此分頁同時載入並呈現新貼文；輪回時只需短暫確認
+                yield
+                limit = self.settle_timeout if command[0] == SETTLE else self.wait_timeout
+                command = (command[0], min(command[1], limit))
+            result = scraper.execute_scrape_step(*command)
+
+    def run(self, page_urls, max_posts, progress_callback=None):
+        """以分頁輪流爬取所有粉絲專頁（primary_scraper 需已啟動瀏覽器並登入）
+
+        :return: {粉絲專頁網址: 貼文列表}，依輸入順序排列
+        """
+        self.is_running = True
+        self.results = {}
+        self.stats = {}
+        self._max_posts = max_posts
+        self._progress_callback = progress_callback
+        self._page_progress = {page_url: 0 for page_url in page_urls}
+        self._page_counts = {page_url: 0 for page_url in page_urls}
+        self._home_handle = self.driver.current_window_handle
+        started_at = time.perf_counter()
+
+        pending = deque(enumerate(page_urls))
+        active = deque()
+        turns = 0
+        max_open = 0
+        while pending or active:
+            if self.primary_scraper.stop_scraping:
+                # 停止時不再開啟新分頁，已開啟的分頁各自結束並保存目前的貼文
+                pending.clear()
+            # 補滿分頁：第一個分頁使用目前的視窗
+            while pending and len(active) < self.max_tabs:
+                index, page_url = pending.popleft()
+                home_in_use = any(tab.handle == self._home_handle for tab in active)
+                self._status(f"正在開啟第 {index + 1}/{len(page_urls)} 個粉絲專頁分頁...")
+                tab = self._open_tab(page_url, index, None if home_in_use else self._home_handle)
+                if tab is not None:
+                    active.append(tab)
+            max_open = max(max_open, len(active))
+            if not active:
+                break
+
+            tab = active.popleft()
+            try:
+                if self.driver.current_window_handle != tab.handle:
+                    self.driver.switch_to.window(tab.handle)
+                if self.primary_scraper.stop_scraping:
+                    tab.scraper.stop_scraping = True
+                next(tab.steps)
+                tab.turns += 1
+                turns += 1
+                active.append(tab)
+            except StopIteration as finished:
+                posts = finished.value or []
+                self.results[tab.page_url] = posts
+                self._report_progress(tab.page_url, 100, len(posts), progress_callback)
+                self._status(f"已完成第 {tab.index + 1} 個粉絲專頁，共爬取 {len(posts)} 篇貼文")
+                self._close_tab(tab)
+            except Exception as e:
+                self._status(f"爬取粉絲專頁 {tab.page_url} 時發生錯誤: {e}")
+                self._close_tab(tab)
+            self._sample_memory(len(active))
+
+        for tab in active:
+            self._close_tab(tab)
+        self.is_running = False
+
+        elapsed = time.perf_counter() - started_at
+        total_posts = sum(len(posts) for posts in self.results.values())
+        self.stats.update({
+            'pages': len(self.results),
+            'tabs': max_open,
+            'turns': turns,
+            'posts': total_posts,
+            'elapsed_seconds': round(elapsed, 3),
+            'posts_per_minute': round(total_posts / elapsed * 60, 1) if elapsed > 0 else 0.0,
+        })
+        if self.stats.get('peak_browser_bytes'):
+            self.stats['bytes_per_page'] = self.stats['peak_browser_bytes'] // max(1, self.stats['tabs_at_peak'])
+        self._log_summary()
+        return {page_url: self.results[page_url] for page_url in page_urls if page_url in self.results}
+
+    def _log_summary(self):
+        stats = self.stats
+        message = (f"📈 分頁多工：{stats['pages']} 個專頁（同時 {stats['tabs']} 個分頁），共 {stats['posts']} 篇貼文，"
+                   f"{stats['elapsed_seconds']:.1f} 秒，{stats['posts_per_minute']} 篇/分鐘")
+        if stats.get('peak_browser_bytes'):
+            message += (f"，瀏覽器記憶體尖峰 {format_bytes(stats['peak_browser_bytes'])}"
+                        f"（每個專頁約 {format_bytes(stats['bytes_per_page'])}）")
+        self._status(message)
+
+    @property
+    def partial_files(self):
+        """所有分頁產生的部分檔案與日誌"""
+        files = []
+        for scraper in self.scrapers:
+            files.extend(scraper.partial_files)
+        return files
+
+    @property
+    def metrics(self):
+        """所有分頁的效能統計合併結果"""
+        return ScrapeMetrics.combine(scraper.metrics for scraper in self.scrapers)
+
+    def stop(self):
+        """停止爬取：不再開啟新分頁，已開啟的分頁在下一步結束"""
+        self.primary_scraper.stop_scraping_process()
+        for scraper in self.scrapers:
+            scraper.stop_scraping_process()
@@ -0,0 +1,210 @@
+import re
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from facebook_scraper_logging import get_logger
+
+logger = get_logger("time_parser")
+
+
+OUTPUT_FORMAT = "%Y-%m-%d %H:%M"
+
+# 相對時間單位（中英文）對應的 timedelta 參數
+RELATIVE_UNITS = {
+    "秒": "seconds", "分鐘": "minutes", "小時": "hours", "天": "days", "週": "weeks",
+    "s": "seconds", "sec": "seconds", "secs": "seconds", "second": "seconds", "seconds": "seconds",
+    "m": "minutes", "min": "minutes", "mins": "minutes", "minute": "minutes", "minutes": "minutes",
+    "h": "hours", "hr": "hours", "hrs": "hours", "hour": "hours", "hours": "hours",
+    "d": "days", "day": "days", "days": "days",
+    "w": "weeks", "wk": "weeks", "wks": "weeks", "week": "weeks", "weeks": "weeks",
+}
+
+MONTH_NAMES = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3,
+    "apr": 4, "april": 4, "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7,
+    "aug": 8, "august": 8, "sep": 9, "sept": 9, "september": 9, "oct": 10, "october": 10,
+    "nov": 11, "november": 11, "dec": 12, "december": 12,
+}
+
+_ZH_CLOCK = r'(?:\s*(上午|下午)?\s*(\d{1,2}):(\d{2}))'
+_EN_CLOCK = r'(?:\s*(?:at\s+)?(\d{1,2}):(\d{2})\s*([AaPp][Mm])?)'
+_MONTH_NAME = r'(' + "|".join(sorted(MONTH_NAMES, key=len, reverse=True)) + r')\.?'
+
+
+def _to_24_hour(hour, period):
+    """將12小時制轉為24小時制，period 可為 上午/下午 或 AM/PM"""
+    period = period.upper() if period else None
+    if period in ("下午", "PM") and hour != 12:
+        return hour + 12
+    if period in ("上午", "AM") and hour == 12:
+        return 0
+    return hour
+
+
+def _clock(hour, minute, period):
+    hour = _to_24_hour(int(hour), period) if hour else 0
+    return hour, int(minute) if minute else 0
+
+
+def _guess_year(month, day, now):
+    # 如果日期晚於今天，應該是去年的貼文
+    if month > now.month or (month == now.month and day > now.day):
+        return now.year - 1
+    return now.year
+
+
+def _relative(match, now):
+    number = int(match.group(1))
+    unit = RELATIVE_UNITS[match.group(2).lower()]
+    return now - timedelta(**{unit: number})
+
+
+def _second_precision(name, match):
+    """以秒為單位的相對時間（例如「30秒」）：同一分鐘內不同時刻解析會落在不同分鐘，結果不能以參考時間區間快取"""
+    return name in ("relative", "relative_en") and RELATIVE_UNITS[match.group(2).lower()] == "seconds"
+
+
+def _just_now(match, now):
+    return now
+
+
+def _yesterday_zh(match, now):
+    yesterday = now - timedelta(days=1)
+    if match.group(2) is None:
+        # 沒有具體時間，設為昨天同一時刻
+        return yesterday
+    hour, minute = _clock(match.group(2), match.group(3), match.group(1))
+    return yesterday.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+
+def _yesterday_en(match, now):
+    yesterday = now - timedelta(days=1)
+    if match.group(1) is None:
+        return yesterday
+    hour, minute = _clock(match.group(1), match.group(2), match.group(3))
+    return yesterday.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+
+def _full_date_zh(match, now):
+    year, month, day = int(match.group(1)), int(match.group(2)), int(match.group(3))
+    hour, minute = _clock(match.group(5), match.group(6), match.group(4))
+    return datetime(year, month, day, hour, minute)
+
+
+def _month_day_zh(match, now):
+    month, day = int(match.group(1)), int(match.group(2))
+    hour, minute = _clock(match.group(4), match.group(5), match.group(3))
+    return datetime(_guess_year(month, day, now), month, day, hour, minute)
+
+
+def _month_day_en(match, now):
+    month = MONTH_NAMES[match.group(1).lower()]
+    day = int(match.group(2))
+    year = int(match.group(3)) if match.group(3) else _guess_year(month, day, now)
+    hour, minute = _clock(match.group(4), match.group(5), match.group(6))
+    return datetime(year, month, day, hour, minute)
+
+
+def _time_only_zh(match, now):
+    hour, minute = _clock(match.group(2), match.group(3), match.group(1))
+    return now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+
+def _time_only_en(match, now):
+    hour, minute = _clock(match.group(1), match.group(2), match.group(3))
+    return now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+
+# 時間格式規則表：依序嘗試，第一個符合的規則決定結果
+TIME_RULES = (
+    ("relative", re.compile(
+        r'(\d+)\s*(小時|分鐘|秒|天|週)'), _relative),
+    ("relative_en", re.compile(
+        r'^(\d+)\s*(' + "|".join(sorted((u for u in RELATIVE_UNITS if u.isascii()), key=len, reverse=True))
+        + r')\b', re.IGNORECASE), _relative),
+    ("just_now", re.compile(r'剛剛|^just now$', re.IGNORECASE), _just_now),
+    ("yesterday", re.compile(r'昨天' + _ZH_CLOCK + '?'), _yesterday_zh),
+    ("yesterday_en", re.compile(r'^yesterday' + _EN_CLOCK + '?', re.IGNORECASE), _yesterday_en),
+    ("full_date", re.compile(
+        r'(\d{4})年(\d{1,2})月(\d{1,2})日' + _ZH_CLOCK + '?'), _full_date_zh),
+    ("month_day", re.compile(
+        r'(\d{1,2})月(\d{1,2})日' + _ZH_CLOCK + '?'), _month_day_zh),
+    ("month_day_en", re.compile(
+        r'^' + _MONTH_NAME + r'\s+(\d{1,2})(?:,?\s+(\d{4}))?' + _EN_CLOCK + '?', re.IGNORECASE), _month_day_en),
+    ("time_only", re.compile(r'(上午|下午)(\d{1,2}):(\d{2})'), _time_only_zh),
+    ("time_only_en", re.compile(r'^(\d{1,2}):(\d{2})\s*([AaPp][Mm])$'), _time_only_en),
+)
+
+
+class FacebookTimeParser:
+    """Facebook 時間字串解析引擎
+
+    使用預先編譯的規則表（中英文格式共用同一套流程），並以
+    (時間字串, 參考時間區間) 為鍵的有限大小快取避免重複解析相同字串。
+    以秒為單位的相對時間不快取，結果只取決於參考時間，與快取歷史無關。
+    """
+
+    def __init__(self, now=None, cache_size=4096, bucket_seconds=60):
+        """
+        :param now: 返回目前時間的函數，預設為 datetime.now；測試時可注入固定時間
+        :param cache_size: 快取最多保留的項目數
+        :param bucket_seconds: 參考時間區間長度（秒），同一區間內的相同字串共用快取結果
+        """
+        self.now = now or datetime.now
+        self.cache_size = cache_size
+        self.bucket_seconds = bucket_seconds
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, time_string, now=None):
+        """將Facebook各種時間格式轉換為統一格式 YYYY-MM-DD HH:MM，無法解析時返回原始字串"""
+        if not time_string or time_string == "未知時間":
+            return "未知時間"
+
+        reference = now or self.now()
+        key = (time_string, int(reference.timestamp() // self.bucket_seconds))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        result, cacheable = self._parse_uncached(time_string, reference)
+        if cacheable:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def parse_many(self, time_strings, now=None):
+        """批次解析一整欄時間字串，整批使用同一個參考時間"""
+        reference = now or self.now()
+        return [self.parse(time_string, reference) for time_string in time_strings]
+
+    def cache_info(self):
+        """快取統計資訊"""
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self._cache), "max_size": self.cache_size}
+
+    def clear_cache(self):
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+    def _parse_uncached(self, time_string, now):
+        """:return: (解析結果, 是否可快取)"""
+        text = time_string.strip()
+        try:
+            for name, pattern, handler in TIME_RULES:
+                match = pattern.search(text)
+                if match:
+                    return handler(match, now).strftime(OUTPUT_FORMAT), not _second_precision(name, match)
+
+            # 如果都不匹配，返回原始字串
+            logger.warning("⚠️ 無法解析時間格式: %s", text)
+            return text, True
+
+        except Exception as e:
+            logger.warning("解析時間時發生錯誤: %s, 原始時間: %s", e, text)
+            return text, True
@@ -0,0 +1,181 @@
+import time
+
+from facebook_post_store import TRUNCATION_MARKERS
+
+
+POST_CONTAINER_SELECTOR = 'div[class="x1n2onr6 x1ja2u2z"]'
+
+# 在頁面上安裝（只安裝一次）：
+#   - MutationObserver 記錄最後一次DOM變動時間與新增的貼文容器數量
+#   - 包裝 fetch 與 XMLHttpRequest，記錄進行中的請求數與最後一次網路活動時間
+# 接著在瀏覽器端輪詢指定條件，條件成立或逾時才回傳，整個等待只需要一次 WebDriver 往返。
+WAIT_SCRIPT = """
+var kind = arguments[0];
+var options = arguments[1] || {};
+var done = arguments[arguments.length - 1];
+var selector = options.container_selector;
+
+var state = window.__fpsWait;
+if (!state || !state.observer) {
+    state = window.__fpsWait = {
+        containers: 0, lastMutation: Date.now(), pending: 0, lastNetwork: Date.now(), observer: null
+    };
+    state.observer = new MutationObserver(function(records) {
+        state.lastMutation = Date.now();
+        for (var i = 0; i < records.length; i++) {
+            var added = records[i].addedNodes;
+            for (var j = 0; j < added.length; j++) {
+                var node = added[j];
+                if (node.nodeType !== 1) continue;
+                if (node.matches(selector)) {
+                    state.containers++;
+                } else if (node.firstElementChild) {
+                    state.containers += node.querySelectorAll(selector).length;
+                }
+            }
+        }
+    });
+    state.observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+
+    var requestStarted = function() { state.pending++; state.lastNetwork = Date.now(); };
+    var requestFinished = function() { state.pending = Math.max(0, state.pending - 1); state.lastNetwork = Date.now(); };
+    if (window.fetch && !window.fetch.__fpsWrapped) {
+        var originalFetch = window.fetch;
+        window.fetch = function() {
+            requestStarted();
+            return originalFetch.apply(this, arguments).then(function(response) {
+                requestFinished(); return response;
+            }, function(error) {
+                requestFinished(); throw error;
+            });
+        };
+        window.fetch.__fpsWrapped = true;
+    }
+    if (!XMLHttpRequest.prototype.__fpsWrapped) {
+        var originalSend = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function() {
+            requestStarted();
+            this.addEventListener('loadend', requestFinished);
+            return originalSend.apply(this, arguments);
+        };
+        XMLHttpRequest.prototype.__fpsWrapped = true;
+    }
+}
+
+var markers = options.markers || [];
+function pendingExpansions() {
+    var clicked = document.querySelectorAll('[data-fps-clicked]');
+    var pending = 0;
+    for (var i = 0; i < clicked.length; i++) {
+        var text = (clicked[i].textContent || '').trim();
+        if (markers.indexOf(text) !== -1) {
+            pending++;
+        } else {
+            clicked[i].removeAttribute('data-fps-clicked');
+        }
+    }
+    return pending;
+}
+
+var started = Date.now();
+var baseline = state.containers;
+var timeout = options.timeout_ms;
+
+function check() {
+    var now = Date.now();
+    var domQuiet = now - Math.max(state.lastMutation, started) >= options.quiet_ms;
+    var networkIdle = state.pending === 0 && now - Math.max(state.lastNetwork, started) >= options.idle_ms;
+    if (kind === 'settle') return state.containers > baseline || (domQuiet && state.pending === 0);
+    if (kind === 'growth') return state.containers > baseline;
+    if (kind === 'expansion') return pendingExpansions() === 0 && domQuiet;
+    if (kind === 'network') return networkIdle;
+    if (kind === 'selector') return !!document.querySelector(options.selector);
+    return true;
+}
+
+(function poll() {
+    var satisfied = check();
+    var elapsed = Date.now() - started;
+    if (satisfied || elapsed >= timeout) {
+        done({ok: satisfied, elapsed_ms: elapsed, containers: state.containers, pending: state.pending});
+        return;
+    }
+    setTimeout(poll, options.poll_ms);
+})();
+"""
+
+
+class WaitEngine:
+    """以頁面實際訊號取代固定 sleep 的等待引擎
+
+    每種等待都有上限時間：條件成立就立即返回，逾時則照常繼續，
+    因此爬取速度取決於 Facebook 的呈現速度，而不是固定的等待時間總和。
+    腳本執行失敗（例如瀏覽器不支援非同步腳本）時退回固定等待，行為與過去相同。
+    """
+
+    def __init__(self, driver, markers=TRUNCATION_MARKERS,
+                 container_selector=POST_CONTAINER_SELECTOR, poll_ms=30,
+                 quiet_ms=150, idle_ms=300):
+        """
+        :param markers: 「查看更多」按鈕文字，用於判斷點擊後是否已展開
+        :param poll_ms: 瀏覽器端檢查條件的間隔（毫秒）
+        :param quiet_ms: DOM 多久沒有變動視為穩定（毫秒）
+        :param idle_ms: 網路多久沒有活動視為閒置（毫秒）
+        """
+        self.driver = driver
+        self.markers = list(markers)
+        self.container_selector = container_selector
+        self.poll_ms = poll_ms
+        self.quiet_ms = quiet_ms
+        self.idle_ms = idle_ms
+        self.stats = {}  # {種類: {'count', 'seconds', 'timeouts'}}
+
+    def _wait(self, kind, timeout, fallback_sleep, **options):
+        started_at = time.perf_counter()
+        options.update({
+            'timeout_ms': int(timeout * 1000),
+            'poll_ms': self.poll_ms,
+            'quiet_ms': self.quiet_ms,
+            'idle_ms': self.idle_ms,
+            'markers': self.markers,
+            'container_selector': self.container_selector,
+        })
+        try:
+            result = self.driver.execute_async_script(WAIT_SCRIPT, kind, options)
+            satisfied = bool(result and result.get('ok'))
+        except Exception:
+            time.sleep(fallback_sleep)
+            satisfied = False
+
+        elapsed = time.perf_counter() - started_at
+        entry = self.stats.setdefault(kind, {'count': 0, 'seconds': 0.0, 'timeouts': 0})
+        entry['count'] += 1
+        entry['seconds'] += elapsed
+        if not satisfied:
+            entry['timeouts'] += 1
+        return satisfied
+
+    def wait_for_scroll_settle(self, timeout=0.8):
+        """滾動後等待：出現新的貼文容器，或DOM穩定且沒有進行中的請求"""
+        return self._wait('settle', timeout, 0.3)
+
+    def wait_for_feed_growth(self, timeout=3.0):
+        """等待動態消息出現新的貼文容器"""
+        return self._wait('growth', timeout, 1.0)
+
+    def wait_for_expansion(self, timeout=1.5):
+        """點擊「查看更多」後等待所有被點擊的貼文展開且DOM穩定"""
+        return self._wait('expansion', timeout, 0.5)
+
+    def wait_for_network_idle(self, timeout=2.0):
+        """等待沒有進行中的請求且網路閒置一段時間"""
+        return self._wait('network', timeout, 1.0)
+
+    def wait_for_selector(self, selector, timeout=10.0):
+        """等待頁面出現符合選擇器的元素"""
+        return self._wait('selector', timeout, 2.0, selector=selector)
+
+    def summary(self):
+        """各種等待的次數、總耗時與逾時次數"""
+        return {kind: dict(entry, seconds=round(entry['seconds'], 3))
+                for kind, entry in self.stats.items()}
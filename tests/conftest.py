@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# 模組都放在專案根目錄，讓測試可直接 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from facebook_scraper_logging import shutdown_logging  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def flush_logging():
+    # 記錄輸出綁定在 pytest 擷取的 stdout，需在擷取關閉前停止背景執行緒
+    yield
+    shutdown_logging()
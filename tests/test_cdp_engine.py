@@ -0,0 +1,38 @@
+"""非同步 DevTools 引擎：對替身端點（facebook_cdp_standin.py）同時爬取多個粉絲專頁"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("websockets")
+
+from facebook_cdp_engine import scrape_many  # noqa: E402
+from facebook_cdp_standin import StandInDevTools  # noqa: E402
+from facebook_post_store import is_truncated_text, post_identity  # noqa: E402
+
+
+async def scrape_standin(urls, max_posts):
+    standin = await StandInDevTools(port=0, post_count=120, latency=0.01).start()
+    try:
+        results, scrapers = await scrape_many(urls, max_posts=max_posts, endpoint=standin.url, concurrency=2,
+                                              cookies=[{'name': 'c_user', 'value': '1'}])
+    finally:
+        await standin.stop()
+    return standin, results, scrapers
+
+
+def test_scrape_many_against_standin(tmp_path, monkeypatch):
+    # 爬取結果的 CSV 與日誌寫在目前目錄
+    monkeypatch.chdir(tmp_path)
+    urls = [f"https://www.facebook.com/page{i}" for i in range(3)]
+    standin, results, scrapers = asyncio.run(scrape_standin(urls, max_posts=30))
+
+    assert list(results) == urls
+    assert standin.cookies and standin.cookies[0]['name'] == "c_user"
+    for url in urls:
+        posts = results[url]
+        assert len(posts) == 30
+        # 只輸出完整貼文，且不重複
+        assert not any(is_truncated_text(post['post_text']) for post in posts)
+        assert len({post_identity(post) for post in posts}) == 30
+        assert all(post['post_time'] != "未知時間" for post in posts)
+        assert scrapers[url].scraped_posts == posts
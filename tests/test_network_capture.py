@@ -0,0 +1,83 @@
+"""網路回應解碼：以錄製的 GraphQL 回應（tests/fixtures/feed_graphql.jsonl）驗證欄位"""
+import json
+import os
+from datetime import datetime
+
+from facebook_fan_page_scraper import FacebookPageScraper
+from facebook_network_capture import FeedResponseDecoder, decode_fixture, iter_json_payloads, load_fixture
+from facebook_post_store import PostStore
+from facebook_time_parser import OUTPUT_FORMAT
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "feed_graphql.jsonl")
+
+
+def local_time(epoch):
+    return datetime.fromtimestamp(epoch).strftime(OUTPUT_FORMAT)
+
+
+def test_fixture_body_is_guarded_multi_chunk_response():
+    header, responses = load_fixture(FIXTURE)
+    assert header['format'] == "facebook-network-responses"
+    body = responses[0]['body']
+    assert body.startswith("for (;;);")
+    assert len(list(iter_json_payloads(body))) == 3
+
+
+def test_decode_fixture_fields():
+    posts, decoder = decode_fixture(FIXTURE)
+    assert decoder.payloads == 3
+    assert [post['post_url'] for post in posts] == [
+        "https://www.facebook.com/testpage/posts/pfbid-a",
+        "https://www.facebook.com/permalink.php?story_fbid=1002&id=1",
+    ]
+
+    first, second = posts
+    # 完整內文（JSON 的 \u 跳脫已解碼，不含截斷）
+    assert first['post_text'].startswith("測試粉絲專頁的第一篇貼文，")
+    assert first['post_text'].endswith("（完）")
+    assert first['post_time'] == local_time(1792310400)
+    assert (first['likes'], first['comments'], first['shares']) == ("1234", "67", "5")
+
+    # 互動數在後續的 @defer 片段才傳來，依貼文 ID 合併
+    assert second['post_text'] == "第二篇貼文 Second post"
+    assert second['post_time'] == local_time(1792224000)
+    assert (second['likes'], second['comments'], second['shares']) == ("42", "3", "0")
+
+
+def test_shared_story_is_not_listed_or_mixed_in():
+    posts, decoder = decode_fixture(FIXTURE)
+    assert len(decoder) == 2
+    assert not any("被分享的原始貼文" in post['post_text'] for post in posts)
+    # 分享的原始貼文的時間與連結不會取代外層貼文的欄位
+    assert posts[0]['post_url'] != "https://www.facebook.com/otherpage/posts/pfbid-shared"
+
+
+def test_embedded_document_json_and_field_subset():
+    story = {"__typename": "Story", "id": "S:1", "post_id": "1",
+             "message": {"text": "首頁內嵌的貼文"}, "creation_time": 1700000000,
+             "url": "https://www.facebook.com/testpage/posts/1"}
+    html = ('<html><body><script type="application/json" data-sjs>'
+            + json.dumps({"require": [[{"__bbox": {"result": {"data": {"node": story}}}}]]})
+            + "</script></body></html>")
+    posts = FeedResponseDecoder(fields=['post_text', 'post_time']).decode([{'url': "", 'body': html}])
+    assert len(posts) == 1
+    assert posts[0]['post_text'] == "首頁內嵌的貼文"
+    assert posts[0]['post_time'] == local_time(1700000000)
+    assert 'likes' not in posts[0]
+
+
+def test_decoded_posts_stay_complete_in_post_store():
+    # 第一篇貼文的內文本身含有「查看更多」字樣，仍是網路回應中的完整內文
+    posts, _ = decode_fixture(FIXTURE)
+    assert "查看更多" in posts[0]['post_text']
+
+    store = PostStore()
+    store.merge(posts, complete=True)
+    assert store.complete_posts() == posts
+    assert store.truncated_posts() == []
+
+    scraper = FacebookPageScraper("", "")
+    scraper.extraction_engine = "network"
+    merged = scraper.smart_merge_posts(PostStore(), posts)
+    assert merged.complete_posts() == posts
+    assert merged.unsaved_complete_count == 2
@@ -0,0 +1,36 @@
+"""OutputJournal：緩衝寫入、定期寫入與當機修復"""
+from facebook_output_journal import OutputJournal
+
+
+def post(index):
+    return {'post_text': f"第 {index} 篇", 'likes': "1", 'comments': "0", 'shares': "0",
+            'post_time': "2026-10-18 12:00", 'post_url': "", 'scraped_at': "2026-10-18 12:30:00"}
+
+
+def test_flush_if_due_writes_buffer_after_interval(tmp_path, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("facebook_output_journal.time.monotonic", lambda: clock[0])
+    path = str(tmp_path / "journal.jsonl")
+    journal = OutputJournal(path, flush_interval=5.0).open()
+
+    journal.append(post(1))
+    assert journal.flush_if_due() is False
+    assert list(OutputJournal.read_records(path)) == []
+
+    # 之後沒有新的貼文附加，只有爬取迴圈每輪呼叫
+    clock[0] += 5.0
+    assert journal.flush_if_due() is True
+    assert [record['post_text'] for record in OutputJournal.read_records(path)] == ["第 1 篇"]
+    assert journal.flush_if_due() is False
+    journal.close()
+
+
+def test_recover_truncates_partial_last_record(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    with OutputJournal(path) as journal:
+        journal.append_many([post(1), post(2)])
+    with open(path, 'ab') as f:
+        f.write(b'{"post_text": "incomplete')
+
+    assert OutputJournal.recover(path) == len(b'{"post_text": "incomplete')
+    assert [record['post_text'] for record in OutputJournal.read_records(path)] == ["第 1 篇", "第 2 篇"]
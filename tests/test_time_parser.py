@@ -0,0 +1,84 @@
+"""FacebookTimeParser：以固定的參考時間驗證各種時間格式"""
+from datetime import datetime
+
+import pytest
+
+from facebook_time_parser import FacebookTimeParser
+
+NOW = datetime(2026, 10, 18, 15, 30, 45)
+
+
+@pytest.fixture
+def parser():
+    return FacebookTimeParser(now=lambda: NOW)
+
+
+@pytest.mark.parametrize("text, expected", [
+    # 中文相對時間
+    ("剛剛", "2026-10-18 15:30"),
+    ("5分鐘", "2026-10-18 15:25"),
+    ("3小時", "2026-10-18 12:30"),
+    ("2天", "2026-10-16 15:30"),
+    ("1週", "2026-10-11 15:30"),
+    ("3 週", "2026-09-27 15:30"),
+    # 英文相對時間
+    ("just now", "2026-10-18 15:30"),
+    ("45m", "2026-10-18 14:45"),
+    ("2 hrs", "2026-10-18 13:30"),
+    ("4d", "2026-10-14 15:30"),
+    ("2w", "2026-10-04 15:30"),
+    ("1 week", "2026-10-11 15:30"),
+    # 昨天
+    ("昨天", "2026-10-17 15:30"),
+    ("昨天 下午3:05", "2026-10-17 15:05"),
+    ("昨天上午12:10", "2026-10-17 00:10"),
+    ("Yesterday at 9:15 PM", "2026-10-17 21:15"),
+    ("yesterday", "2026-10-17 15:30"),
+    # 完整日期需在「月日」規則之前比對，否則年份會被忽略
+    ("2023年3月5日", "2023-03-05 00:00"),
+    ("2023年12月25日 下午2:30", "2023-12-25 14:30"),
+    # 月日：晚於今天的日期屬於去年
+    ("10月1日", "2026-10-01 00:00"),
+    ("10月20日 上午9:00", "2025-10-20 09:00"),
+    ("12月31日下午11:59", "2025-12-31 23:59"),
+    # 英文月日
+    ("October 3 at 8:00 AM", "2026-10-03 08:00"),
+    ("Dec 24", "2025-12-24 00:00"),
+    ("Mar 5, 2024 at 1:02 PM", "2024-03-05 13:02"),
+    # 只有時間（今天）
+    ("下午2:00", "2026-10-18 14:00"),
+    ("7:45 AM", "2026-10-18 07:45"),
+])
+def test_parse_formats(parser, text, expected):
+    assert parser.parse(text) == expected
+
+
+@pytest.mark.parametrize("text", ["未知時間", ""])
+def test_unknown_time(parser, text):
+    assert parser.parse(text) == "未知時間"
+
+
+def test_unparseable_text_is_returned_unchanged(parser):
+    assert parser.parse("某個無法辨識的時間") == "某個無法辨識的時間"
+
+
+@pytest.mark.parametrize("text, first, second, expected", [
+    # 同一分鐘內的兩個時刻解析相同的秒數字串，結果不受先前快取影響
+    ("30秒", datetime(2026, 10, 18, 12, 0, 0), datetime(2026, 10, 18, 12, 0, 59), ("11:59", "12:00")),
+    ("45 secs", datetime(2026, 10, 18, 12, 0, 10), datetime(2026, 10, 18, 12, 0, 50), ("11:59", "12:00")),
+    ("20s", datetime(2026, 10, 18, 12, 0, 30), datetime(2026, 10, 18, 12, 0, 5), ("12:00", "11:59")),
+])
+def test_seconds_relative_time_within_one_minute(parser, text, first, second, expected):
+    results = [parser.parse(text, now=first), parser.parse(text, now=second)]
+    assert [result.split(" ")[1] for result in results] == list(expected)
+    assert parser.parse(text, now=second) == FacebookTimeParser().parse(text, now=second)
+
+
+def test_cache_is_keyed_by_reference_time(parser):
+    assert parser.parse("1小時") == "2026-10-18 14:30"
+    assert parser.parse("1小時") == "2026-10-18 14:30"
+    assert parser.cache_info()['hits'] == 1
+    # 不同的參考時間不使用快取結果
+    later = datetime(2026, 10, 18, 18, 0)
+    assert parser.parse("1小時", now=later) == "2026-10-18 17:00"
+    assert parser.parse_many(["剛剛", "昨天"], now=later) == ["2026-10-18 18:00", "2026-10-17 18:00"]